@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+End-to-end delivery benchmark for a scheduled burst.
+
+Points ``DailyMessageBot`` at the local fake Discord server, configures N
+guilds for the same minute, runs the scheduler loop through that minute and
+measures messages per second and how late each message lands after the
+minute boundary.
+
+Usage:
+    python -m benchmarks.burst --guilds 500 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from discord.http import Route
+
+from benchmarks.fake_discord import API_PREFIX, FakeDiscordOptions, FakeDiscordServer
+from bot.core.bot import DailyMessageBot
+from bot.utils.clock import Clock
+
+GUILD_ID_BASE = 300000000000000000
+CHANNEL_ID_BASE = 400000000000000000
+
+# Seconds the messages are pre-warmed ahead of the boundary
+PREWARM_SECONDS = 2.0
+
+# Seconds of scheduler loop run before the pre-warm stage starts
+LEAD_SECONDS = 1.0
+
+
+class BenchmarkBot(DailyMessageBot):
+    """DailyMessageBot without cogs, command sync or a gateway connection."""
+
+    async def setup_hook(self):
+        pass
+
+    async def wait_until_ready(self):
+        pass
+
+
+class ShiftedClock(Clock):
+    """Wall clock moved by a fixed offset, so a chosen minute starts soon."""
+
+    def __init__(self, offset: timedelta):
+        self.offset = offset
+
+    def now(self) -> datetime:
+        return datetime.utcnow() + self.offset
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def write_burst_configs(path: Path, guild_count: int, send_time: str) -> Dict[int, int]:
+    """Write N enabled guild configs due at ``send_time``; return channel→guild."""
+    configs = {}
+    channels = {}
+    for i in range(guild_count):
+        guild_id = GUILD_ID_BASE + i
+        channel_id = CHANNEL_ID_BASE + i
+        channels[channel_id] = guild_id
+        configs[str(guild_id)] = {
+            "channel_id": channel_id,
+            "time": send_time,
+            "message": f"Good morning, guild #{i}!",
+            "enabled": True,
+        }
+
+    path.write_text(json.dumps(configs))
+    return channels
+
+
+async def run_burst(
+    guild_count: int,
+    options: Optional[FakeDiscordOptions] = None,
+    send_time: str = "07:00",
+    prewarm: bool = True,
+) -> dict:
+    """Run one burst and return the collected measurements."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "server_configs.json"
+        channels = write_burst_configs(config_path, guild_count, send_time)
+
+        server = FakeDiscordServer(channels, options)
+        base_url = await server.start()
+
+        original_base = Route.BASE
+        Route.BASE = base_url + API_PREFIX
+        bot = BenchmarkBot(config_file_path=str(config_path))
+        try:
+            await bot.login("fake-token")
+            await bot.config_manager.wait_until_loaded()
+            server.reset_stats()
+
+            hour, minute = map(int, send_time.split(":"))
+            fire_time = datetime.utcnow().replace(
+                hour=hour, minute=minute, second=0, microsecond=0
+            )
+
+            # Start the clock shortly before the minute, so the loop's first
+            # boundary is the burst
+            scheduler = bot.scheduler
+            scheduler.prewarm_seconds = PREWARM_SECONDS if prewarm else 0
+            lead = timedelta(seconds=scheduler.prewarm_seconds + LEAD_SECONDS)
+            scheduler.clock = ShiftedClock(fire_time - lead - datetime.utcnow())
+            boundary = time.monotonic() + (fire_time - scheduler.clock.now()).total_seconds()
+
+            # Count only the burst's requests, not the pre-warm's channel fetches
+            check_and_send = scheduler._check_and_send_messages
+            burst_done = asyncio.Event()
+            finished = boundary
+
+            async def check_and_send_burst(current_time: datetime):
+                nonlocal finished
+                server.reset_stats()
+                try:
+                    await check_and_send(current_time)
+                finally:
+                    finished = time.monotonic()
+                    burst_done.set()
+
+            scheduler._check_and_send_messages = check_and_send_burst  # type: ignore[method-assign]
+            await scheduler.start()
+            await burst_done.wait()
+            await scheduler.stop()
+            elapsed = finished - boundary
+        finally:
+            await bot.close()
+            Route.BASE = original_base
+            await server.stop()
+
+    lateness = [message.received_at - boundary for message in server.messages]
+    delivered = len(server.messages)
+    return {
+        "guilds": guild_count,
+        "delivered": delivered,
+        "elapsed_s": elapsed,
+        "messages_per_s": delivered / elapsed if elapsed else 0.0,
+        "lateness_p50_s": percentile(lateness, 50),
+        "lateness_p90_s": percentile(lateness, 90),
+        "lateness_p99_s": percentile(lateness, 99),
+        "lateness_max_s": max(lateness, default=0.0),
+        "http_requests": server.request_count,
+        "rate_limited": server.rate_limited_count,
+        "injected_errors": server.error_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a scheduled burst")
+    parser.add_argument("--guilds", type=int, default=200, help="Guilds due in the burst")
+    parser.add_argument("--time", default="07:00", help="Scheduled time (HH:MM)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Max response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of failed sends")
+    parser.add_argument("--error-status", type=int, default=500, help="Status for failed sends")
+    parser.add_argument("--global-limit", type=int, default=50, help="Global requests per second")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--no-prewarm", action="store_true", help="Skip the pre-warm stage")
+    args = parser.parse_args()
+
+    options = FakeDiscordOptions(
+        global_limit=args.global_limit,
+        latency_max=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    results = asyncio.run(
+        run_burst(args.guilds, options, args.time, prewarm=not args.no_prewarm)
+    )
+
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:>16}: {value:.3f}")
+        else:
+            print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
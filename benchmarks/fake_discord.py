@@ -0,0 +1,331 @@
+"""
+Local stand-in for the Discord REST API.
+
+Implements just enough of the v10 HTTP API for ``DailyMessageBot`` to log in,
+fetch channels and create messages, while emitting the per-route and global
+rate-limit headers (and 429 responses) that discord.py reacts to. Latency and
+error injection are configurable so delivery can be load-tested locally.
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+API_PREFIX = "/api/v10"
+BOT_USER_ID = 100000000000000001
+
+
+@dataclass
+class FakeDiscordOptions:
+    """Behaviour knobs for the fake Discord server."""
+
+    # Per-channel message-create bucket (Discord uses 5 per 5 seconds)
+    route_limit: int = 5
+    route_window: float = 5.0
+    # Global bucket shared by every route for the bot token
+    global_limit: int = 50
+    global_window: float = 1.0
+    # Artificial response latency, uniformly drawn from [min, max] seconds
+    latency_min: float = 0.0
+    latency_max: float = 0.0
+    # Fraction of message-create calls answered with ``error_status``
+    error_rate: float = 0.0
+    error_status: int = 500
+    # Channels answering 403 / unknown channel IDs answer 404
+    forbidden_channels: Set[int] = field(default_factory=set)
+    seed: Optional[int] = None
+
+
+@dataclass
+class ReceivedMessage:
+    """A message accepted by the fake server."""
+
+    channel_id: int
+    content: str
+    received_at: float
+
+
+def _json_response(
+    payload: dict, status: int = 200, headers: Optional[Dict[str, str]] = None
+) -> web.Response:
+    """Build a JSON response with the bare content type discord.py expects."""
+    response_headers = {"Content-Type": "application/json"}
+    response_headers.update(headers or {})
+    return web.Response(
+        body=json.dumps(payload).encode(), status=status, headers=response_headers
+    )
+
+
+class _Window:
+    """Fixed-window request counter mirroring a Discord rate-limit bucket."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.count = 0
+        self.reset_at = 0.0
+
+    def hit(self, now: float) -> Tuple[bool, int, float]:
+        """Register a request; return (allowed, remaining, reset_after)."""
+        if now >= self.reset_at:
+            self.count = 0
+            self.reset_at = now + self.window
+
+        reset_after = self.reset_at - now
+        if self.count >= self.limit:
+            return False, 0, reset_after
+
+        self.count += 1
+        return True, self.limit - self.count, reset_after
+
+
+class FakeDiscordServer:
+    """
+    An aiohttp application serving a small subset of the Discord REST API.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[int, int],
+        options: Optional[FakeDiscordOptions] = None,
+    ):
+        """
+        Args:
+            channels: Mapping of channel ID to the guild ID that owns it
+            options: Rate-limit, latency and error-injection settings
+        """
+        self.channels = channels
+        self.options = options or FakeDiscordOptions()
+        self.messages: List[ReceivedMessage] = []
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.error_count = 0
+
+        self._random = random.Random(self.options.seed)
+        self._global = _Window(self.options.global_limit, self.options.global_window)
+        self._routes: Dict[int, _Window] = {}
+        self._next_message_id = 200000000000000000
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+        self.app = web.Application()
+        self.app.router.add_get(f"{API_PREFIX}/users/@me", self._get_current_user)
+        self.app.router.add_get(
+            f"{API_PREFIX}/oauth2/applications/@me", self._get_application
+        )
+        self.app.router.add_get(
+            f"{API_PREFIX}/channels/{{channel_id}}", self._get_channel
+        )
+        self.app.router.add_post(
+            f"{API_PREFIX}/channels/{{channel_id}}/messages", self._create_message
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL (without the API prefix)."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_stats(self):
+        """Forget received messages and counters."""
+        self.messages.clear()
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.error_count = 0
+
+    async def _simulate_latency(self):
+        options = self.options
+        if options.latency_max > 0:
+            await asyncio.sleep(
+                self._random.uniform(options.latency_min, options.latency_max)
+            )
+
+    def _check_global(self, now: float) -> Optional[web.Response]:
+        allowed, _, reset_after = self._global.hit(now)
+        if allowed:
+            return None
+
+        self.rate_limited_count += 1
+        return self._too_many_requests(reset_after, is_global=True)
+
+    def _too_many_requests(
+        self, retry_after: float, is_global: bool, headers: Optional[dict] = None
+    ) -> web.Response:
+        response_headers = dict(headers or {})
+        response_headers.update(
+            {
+                "Retry-After": f"{retry_after:.3f}",
+                "X-RateLimit-Scope": "global" if is_global else "user",
+                # discord.py treats a 429 without Via as a Cloudflare ban
+                "Via": "1.1 google",
+            }
+        )
+        if is_global:
+            response_headers["X-RateLimit-Global"] = "true"
+
+        return _json_response(
+            {
+                "message": "You are being rate limited.",
+                "retry_after": round(retry_after, 3),
+                "global": is_global,
+            },
+            status=429,
+            headers=response_headers,
+        )
+
+    @staticmethod
+    def _route_headers(
+        window: _Window, remaining: int, reset_after: float
+    ) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(window.limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": "fake-message-create",
+        }
+
+    def _channel_payload(self, channel_id: int) -> dict:
+        return {
+            "id": str(channel_id),
+            "type": 0,
+            "guild_id": str(self.channels[channel_id]),
+            "name": f"channel-{channel_id}",
+            "position": 0,
+            "permission_overwrites": [],
+            "nsfw": False,
+            "parent_id": None,
+        }
+
+    @staticmethod
+    def _user_payload() -> dict:
+        return {
+            "id": str(BOT_USER_ID),
+            "username": "FakeBot",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+            "bot": True,
+        }
+
+    @staticmethod
+    def _not_found() -> web.Response:
+        return _json_response(
+            {"message": "Unknown Channel", "code": 10003}, status=404
+        )
+
+    async def _get_current_user(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await self._simulate_latency()
+        return _json_response(self._user_payload())
+
+    async def _get_application(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await self._simulate_latency()
+        return _json_response(
+            {
+                "id": str(BOT_USER_ID),
+                "name": "FakeBot",
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": self._user_payload(),
+                "verify_key": "",
+                "flags": 0,
+            }
+        )
+
+    async def _get_channel(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await self._simulate_latency()
+
+        limited = self._check_global(time.monotonic())
+        if limited is not None:
+            return limited
+
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.channels:
+            return self._not_found()
+
+        return _json_response(self._channel_payload(channel_id))
+
+    async def _create_message(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        await self._simulate_latency()
+
+        now = time.monotonic()
+        limited = self._check_global(now)
+        if limited is not None:
+            return limited
+
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.channels:
+            return self._not_found()
+
+        window = self._routes.get(channel_id)
+        if window is None:
+            window = _Window(self.options.route_limit, self.options.route_window)
+            self._routes[channel_id] = window
+
+        allowed, remaining, reset_after = window.hit(now)
+        headers = self._route_headers(window, remaining, reset_after)
+        if not allowed:
+            self.rate_limited_count += 1
+            return self._too_many_requests(reset_after, is_global=False, headers=headers)
+
+        if channel_id in self.options.forbidden_channels:
+            return _json_response(
+                {"message": "Missing Permissions", "code": 50013},
+                status=403,
+                headers=headers,
+            )
+
+        if self.options.error_rate and self._random.random() < self.options.error_rate:
+            self.error_count += 1
+            return _json_response(
+                {"message": "Injected failure", "code": 0},
+                status=self.options.error_status,
+                headers=headers,
+            )
+
+        payload = await request.json()
+        content = payload.get("content") or ""
+        self.messages.append(ReceivedMessage(channel_id, content, time.monotonic()))
+
+        self._next_message_id += 1
+        return _json_response(
+            {
+                "id": str(self._next_message_id),
+                "channel_id": str(channel_id),
+                "guild_id": str(self.channels[channel_id]),
+                "author": self._user_payload(),
+                "content": content,
+                "timestamp": "2024-01-01T07:00:00.000000+00:00",
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            },
+            headers=headers,
+        )
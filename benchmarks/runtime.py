@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Compare runtime profiles.
+
+Runs the same workloads under each runtime profile (event loop and JSON
+codec) and reports:
+
+- scheduler tick latency: time for ``MessageScheduler`` to deliver one
+  minute's due messages to in-memory channels
+- gateway event throughput: gateway dispatch frames decoded the way
+  discord.py's gateway decodes them and dispatched through
+  ``discord.Client.dispatch`` to an event handler per second. discord.py
+  decodes with orjson whenever it is installed, whatever the profile, so
+  this is measured with each decoder discord.py can use
+- config save and load: encoding and decoding the configuration file with
+  ``ConfigManager``
+
+Usage:
+    python -m benchmarks.runtime --guilds 10000
+    python -m benchmarks.runtime --profiles standard performance --format json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, cast
+
+import discord
+
+from benchmarks.burst import percentile
+from benchmarks.simulate import SimulationBot, synthetic_configs
+from bot.core.runtime import RUNTIME_PROFILES, get_json_codec, install_event_loop
+from bot.core.scheduler import MessageScheduler
+from bot.utils.clock import VirtualClock
+from bot.utils.config_manager import ConfigManager
+from bot.utils.json_codec import JsonCodec
+
+if TYPE_CHECKING:
+    from bot.core.bot import DailyMessageBot
+
+
+@dataclass
+class ProfileResult:
+    """Measurements for one runtime profile."""
+
+    profile: str
+    event_loop: str
+    codec: str
+    tick_ms: List[float] = field(default_factory=list)
+    events_per_second: Dict[str, float] = field(default_factory=dict)
+    save_ms: Dict[str, float] = field(default_factory=dict)
+    load_ms: Dict[str, float] = field(default_factory=dict)
+
+    def format(self) -> str:
+        """Render the result as text."""
+        lines = [
+            f"Profile {self.profile} ({self.event_loop} event loop, {self.codec} codec)",
+            f"  Scheduler tick: p50={percentile(self.tick_ms, 50):.1f}ms "
+            f"p99={percentile(self.tick_ms, 99):.1f}ms",
+        ]
+        for decoder, rate in self.events_per_second.items():
+            lines.append(f"  Gateway events ({decoder} decoder): {rate:,.0f}/s")
+        for file_format in self.save_ms:
+            lines.append(
+                f"  Config {file_format}: save={self.save_ms[file_format]:.1f}ms "
+                f"load={self.load_ms[file_format]:.1f}ms"
+            )
+        return "\n".join(lines)
+
+
+async def _write_configs(path: Path, guild_count: int):
+    """Write synthetic configs to ``path`` as a JSON config file."""
+    manager = ConfigManager(str(path))
+    await manager.wait_until_loaded()
+    configs = synthetic_configs(guild_count, seed=1)
+    await manager.set_many({int(guild_id): config for guild_id, config in configs.items()})
+
+
+async def measure_scheduler_ticks(
+    config_path: Path, codec: JsonCodec, ticks: int, guilds_per_tick: int
+) -> List[float]:
+    """
+    Time delivery ticks of ``guilds_per_tick`` due guilds each.
+
+    Sent dates are reset before every tick, so all of its guilds are due.
+    """
+    clock = VirtualClock(datetime(2024, 1, 1))
+    bot = SimulationBot(str(config_path), clock, codec)
+    await bot.config_manager.wait_until_loaded()
+    # SimulationBot provides the parts of the bot the scheduler uses
+    scheduler = MessageScheduler(cast("DailyMessageBot", bot), prewarm_seconds=0, clock=clock)
+
+    # Point the first guilds at one minute so each tick has a known load
+    configs = await bot.config_manager.get_all_configs()
+    due = sorted(configs)[:guilds_per_tick]
+    await bot.config_manager.update_many(
+        {guild_id: {"time": "09:00", "enabled": True} for guild_id in due}
+    )
+
+    fire_time = datetime(2024, 1, 1, 9, 0)
+    durations = []
+    for _ in range(ticks):
+        scheduler.last_sent_dates.clear()
+        started = time.perf_counter()
+        await scheduler._check_and_send_messages(fire_time)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def _gateway_frames(count: int) -> List[str]:
+    """Build GUILD_ROLE_UPDATE dispatch frames as the gateway hands them to the decoder."""
+    frames = []
+    for seq in range(count):
+        payload = {
+            "op": 0,
+            "s": seq,
+            "t": "GUILD_ROLE_UPDATE",
+            "d": {
+                "guild_id": str(1000 + seq % 500),
+                "role": {
+                    "id": str(900000 + seq),
+                    "name": f"role-{seq}",
+                    "color": 0,
+                    "hoist": False,
+                    "position": seq % 50,
+                    "permissions": "2048",
+                    "managed": False,
+                    "mentionable": True,
+                },
+            },
+        }
+        frames.append(json.dumps(payload, separators=(",", ":")))
+    return frames
+
+
+def gateway_decoders() -> Dict[str, Callable[..., Any]]:
+    """The JSON decoders discord.py's gateway can use here, by name."""
+    decoders: Dict[str, Callable[..., Any]] = {"json": json.loads}
+    if discord.utils.HAS_ORJSON:
+        decoders["orjson"] = discord.utils._from_json
+    return decoders
+
+
+async def measure_gateway_throughput(decoder: Callable[..., Any], event_count: int) -> float:
+    """
+    Decode and dispatch gateway frames; return events handled per second.
+
+    Frames are decoded by ``discord.utils._from_json``, the function the
+    gateway calls, set to ``decoder`` for the run.
+    """
+    frames = _gateway_frames(event_count)
+    handled = 0
+    finished = asyncio.get_running_loop().create_future()
+
+    async def on_benchmark_event(data):
+        nonlocal handled
+        handled += 1
+        if handled == event_count:
+            finished.set_result(None)
+
+    async with discord.Client(intents=discord.Intents.none()) as client:
+        client.on_benchmark_event = on_benchmark_event  # type: ignore[attr-defined]
+
+        installed = discord.utils._from_json
+        discord.utils._from_json = decoder
+        try:
+            started = time.perf_counter()
+            for frame in frames:
+                message = discord.utils._from_json(frame)
+                client.dispatch("benchmark_event", message["d"])
+            await finished
+            elapsed = time.perf_counter() - started
+        finally:
+            discord.utils._from_json = installed
+
+    return event_count / elapsed
+
+
+async def measure_config_io(
+    config_path: Path, codec: JsonCodec, file_format: str, rounds: int
+) -> Dict[str, float]:
+    """Time full configuration saves and loads (median of ``rounds``, in ms)."""
+    manager = ConfigManager(str(config_path), file_format=file_format, json_codec=codec)
+    await manager.wait_until_loaded()
+
+    saves, loads = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await manager._save_configs()
+        saves.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await manager._load_configs()
+        loads.append((time.perf_counter() - started) * 1000)
+
+    return {"save": statistics.median(saves), "load": statistics.median(loads)}
+
+
+async def run_profile(
+    profile: str,
+    event_loop: str,
+    guild_count: int,
+    ticks: int,
+    guilds_per_tick: int,
+    event_count: int,
+    rounds: int,
+) -> ProfileResult:
+    """Run every workload under the current event loop with the profile's codec."""
+    codec = get_json_codec(profile)
+    result = ProfileResult(profile=profile, event_loop=event_loop, codec=codec.name)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "source.json"
+        await _write_configs(source, guild_count)
+
+        tick_path = Path(tmp_dir) / "ticks.json"
+        tick_path.write_bytes(source.read_bytes())
+        result.tick_ms = await measure_scheduler_ticks(
+            tick_path, codec, ticks, min(guilds_per_tick, guild_count)
+        )
+
+        for name, decoder in gateway_decoders().items():
+            result.events_per_second[name] = await measure_gateway_throughput(decoder, event_count)
+
+        for file_format in ConfigManager.FILE_FORMATS:
+            io_path = Path(tmp_dir) / f"io.{file_format}"
+            io_path.write_bytes(source.read_bytes())
+            timings = await measure_config_io(io_path, codec, file_format, rounds)
+            result.save_ms[file_format] = timings["save"]
+            result.load_ms[file_format] = timings["load"]
+
+    return result
+
+
+def run_profiles(profiles: List[str], **options) -> List[ProfileResult]:
+    """Run the workloads once per profile, each on a fresh event loop."""
+    results = []
+    try:
+        for profile in profiles:
+            event_loop = install_event_loop(profile)
+            results.append(asyncio.run(run_profile(profile, event_loop, **options)))
+    finally:
+        install_event_loop("standard")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare runtime profiles")
+    parser.add_argument(
+        "--profiles", nargs="+", choices=RUNTIME_PROFILES, default=list(RUNTIME_PROFILES)
+    )
+    parser.add_argument("--guilds", type=int, default=10000, help="Configured guilds")
+    parser.add_argument("--ticks", type=int, default=20, help="Scheduler ticks to time")
+    parser.add_argument("--guilds-per-tick", type=int, default=1000, help="Guilds due per tick")
+    parser.add_argument("--events", type=int, default=50000, help="Gateway events to dispatch")
+    parser.add_argument("--rounds", type=int, default=5, help="Config save/load rounds")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    args = parser.parse_args()
+
+    results = run_profiles(
+        args.profiles,
+        guild_count=args.guilds,
+        ticks=args.ticks,
+        guilds_per_tick=args.guilds_per_tick,
+        event_count=args.events,
+        rounds=args.rounds,
+    )
+
+    if args.format == "json":
+        print(json.dumps([result.__dict__ for result in results], indent=2))
+    else:
+        print("\n\n".join(result.format() for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Replay scheduling in accelerated virtual time.
+
+Runs the real ``MessageScheduler`` loop against a virtual clock and fake
+channels for one or more days, then reports sends per minute, the peak depth
+of the pre-warmed ready queue, and any duplicate or missed sends. Each send
+can be given a virtual duration, so long bursts overrun the minute as they
+would against Discord.
+
+Usage:
+    python -m benchmarks.simulate --config data/server_configs.json --days 2
+    python -m benchmarks.simulate --synthetic 10000 --days 1 --send-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from bot.core.scheduler import MessageScheduler
+from bot.utils.clock import VirtualClock
+from bot.utils.config_manager import ConfigManager
+from bot.utils.json_codec import JsonCodec
+from bot.utils.message_packing import pack_messages
+from bot.utils.templates import TemplateCache
+from bot.utils.time_utils import parse_time_string
+
+# Popular send times get most of the synthetic guilds
+PEAK_TIMES = ["07:00", "08:00", "09:00", "12:00", "18:00"]
+
+
+@dataclass
+class SimulationReport:
+    """Outcome of a simulation run."""
+
+    start: datetime
+    days: int
+    sends_per_minute: Counter = field(default_factory=Counter)
+    queue_depth_per_minute: Counter = field(default_factory=Counter)
+    duplicates: List[Tuple[int, date, int]] = field(default_factory=list)
+    missed: List[Tuple[int, date]] = field(default_factory=list)
+
+    @property
+    def total_sends(self) -> int:
+        return sum(self.sends_per_minute.values())
+
+    @property
+    def peak_queue_depth(self) -> int:
+        return max(self.queue_depth_per_minute.values(), default=0)
+
+    def format(self, top: int = 10) -> str:
+        """Render the report as text."""
+        lines = [
+            f"Simulated {self.days} day(s) from {self.start:%Y-%m-%d %H:%M} UTC",
+            f"Total sends: {self.total_sends}",
+            f"Peak ready-queue depth: {self.peak_queue_depth}",
+            f"Duplicate sends: {len(self.duplicates)}",
+            f"Missed sends: {len(self.missed)}",
+            "",
+            f"Busiest minutes (top {top}):",
+        ]
+        for minute, count in self.sends_per_minute.most_common(top):
+            depth = self.queue_depth_per_minute.get(minute, 0)
+            lines.append(f"  {minute:%Y-%m-%d %H:%M}  sends={count:<6} queue={depth}")
+
+        for guild_id, day, count in self.duplicates[:top]:
+            lines.append(f"DUPLICATE guild {guild_id} on {day}: {count} sends")
+        for guild_id, day in self.missed[:top]:
+            lines.append(f"MISSED guild {guild_id} on {day}")
+        return "\n".join(lines)
+
+
+class SimulatedChannel:
+    """Channel stand-in that records sends at virtual time."""
+
+    def __init__(self, bot: "SimulationBot", channel_id: int):
+        self.bot = bot
+        self.id = channel_id
+        self.guild = None
+        # Fire time and guild IDs of each upcoming send, queued by the scheduler
+        self.carrying: Deque[Tuple[datetime, List[int]]] = deque()
+
+    async def send(self, content: str = "", **kwargs):
+        started = self.bot.clock.now()
+        if self.bot.send_latency > 0:
+            await self.bot.clock.sleep(self.bot.send_latency)
+        fire_time, guild_ids = self.carrying.popleft() if self.carrying else (started, [])
+        self.bot.sends.append((self.id, guild_ids, fire_time, self.bot.clock.now()))
+
+
+class SimulationBot:
+    """The parts of ``DailyMessageBot`` the scheduler relies on."""
+
+    def __init__(
+        self,
+        config_file_path: str,
+        clock: VirtualClock,
+        json_codec: Optional[JsonCodec] = None,
+        send_latency: float = 0,
+    ):
+        self.clock = clock
+        self.config_manager = ConfigManager(config_file_path, json_codec=json_codec)
+        self.templates = TemplateCache()
+        # Virtual seconds each send takes
+        self.send_latency = send_latency
+        # (channel ID, guild IDs carried, fire time, time the send finished)
+        self.sends: List[Tuple[int, List[int], datetime, datetime]] = []
+        self.closed = False
+        self._channels: Dict[int, SimulatedChannel] = {}
+
+    async def wait_until_ready(self):
+        pass
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def get_channel(self, channel_id: int) -> SimulatedChannel:
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = SimulatedChannel(self, channel_id)
+        return channel
+
+    async def fetch_channel(self, channel_id: int) -> SimulatedChannel:
+        return self.get_channel(channel_id)
+
+
+class SimulationScheduler(MessageScheduler):
+    """
+    Scheduler that records the ready-queue depth of every pre-warm, and the
+    guilds each send to a channel carries.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue_depths: Counter = Counter()
+
+    async def _prewarm(self, fire_time: datetime):
+        await super()._prewarm(fire_time)
+        self.queue_depths[fire_time] = len(self._ready)
+
+    async def _deliver_channel(self, batch, current_time: datetime):
+        # The channel's sends follow the same packing as the scheduler's
+        channel = batch[0].channel
+        channel.carrying.clear()
+        for _, members in pack_messages([staged.content for staged in batch]):
+            channel.carrying.append((current_time, [batch[i].guild_id for i in members]))
+        await super()._deliver_channel(batch, current_time)
+
+
+def synthetic_configs(guild_count: int, seed: Optional[int] = None) -> Dict[str, dict]:
+    """Generate guild configs clustered around popular send times."""
+    rng = random.Random(seed)
+    configs = {}
+    for i in range(guild_count):
+        if rng.random() < 0.7:
+            send_time = rng.choice(PEAK_TIMES)
+        else:
+            send_time = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+        configs[str(1000 + i)] = {
+            "channel_id": 500000 + i,
+            "time": send_time,
+            "message": "Good morning!",
+            "enabled": rng.random() < 0.9,
+        }
+    return configs
+
+
+def _expected_guilds(configs: Dict[int, dict]) -> Dict[int, time]:
+    """Get the send time of every guild the scheduler should send to."""
+    expected = {}
+    for guild_id, config in configs.items():
+        scheduled = parse_time_string(config.get("time", "07:00"))
+        if config.get("enabled") and config.get("channel_id") and scheduled:
+            expected[guild_id] = scheduled
+    return expected
+
+
+async def run_simulation(
+    config_file_path: str,
+    days: int = 1,
+    start: Optional[datetime] = None,
+    prewarm_seconds: float = 15,
+    send_latency: float = 0,
+) -> SimulationReport:
+    """
+    Run the scheduler over ``days`` days of virtual time.
+
+    Args:
+        config_file_path: Guild configuration file (any format ConfigManager
+            reads); it is copied, never modified
+        days: Number of days to simulate
+        start: Virtual start time (defaults to today's midnight UTC)
+        prewarm_seconds: Pre-warm lead time passed to the scheduler
+        send_latency: Virtual seconds each send takes
+
+    Returns:
+        The simulation report
+    """
+    if start is None:
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=days)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        working_copy = Path(tmp_dir) / "server_configs.json"
+        shutil.copyfile(config_file_path, working_copy)
+
+        clock = VirtualClock(start)
+        bot = SimulationBot(str(working_copy), clock, send_latency=send_latency)
+        await bot.config_manager.wait_until_loaded()
+        scheduler = SimulationScheduler(bot, prewarm_seconds=prewarm_seconds, clock=clock)
+
+        configs = await bot.config_manager.get_all_configs()
+
+        await scheduler.start()
+        await clock.run_until(end)
+        bot.closed = True
+        await scheduler.stop()
+
+    report = SimulationReport(start=start, days=days)
+    report.queue_depth_per_minute = scheduler.queue_depths
+
+    sends_per_guild_day: Counter = Counter()
+    for _, guild_ids, fire_time, sent_at in bot.sends:
+        report.sends_per_minute[sent_at.replace(second=0, microsecond=0)] += 1
+        # A send finishing after midnight still counts for its scheduled day
+        for guild_id in guild_ids:
+            sends_per_guild_day[(guild_id, fire_time.date())] += 1
+
+    for (guild_id, day), count in sorted(sends_per_guild_day.items()):
+        if count > 1:
+            report.duplicates.append((guild_id, day, count))
+
+    expected = _expected_guilds(configs)
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).date()
+        for guild_id, scheduled in sorted(expected.items()):
+            fire_time = datetime.combine(day, scheduled)
+            if start <= fire_time < end and not sends_per_guild_day[(guild_id, day)]:
+                report.missed.append((guild_id, day))
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate scheduling in virtual time")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--config", help="Guild configuration file to replay")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic guilds")
+    parser.add_argument("--days", type=int, default=1, help="Days to simulate")
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--prewarm-seconds", type=float, default=15, help="Pre-warm lead time")
+    parser.add_argument("--send-latency", type=float, default=0, help="Virtual seconds per send")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for synthetic configs")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d") if args.start else None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = args.config
+        if args.synthetic is not None:
+            config_path = str(Path(tmp_dir) / "synthetic.json")
+            Path(config_path).write_text(json.dumps(synthetic_configs(args.synthetic, args.seed)))
+
+        report = asyncio.run(
+            run_simulation(config_path, args.days, start, args.prewarm_seconds, args.send_latency)
+        )
+
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Administration cog for bulk configuration import/export and delivery statistics."""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import aiohttp
+import discord
+from discord import app_commands, Interaction
+from discord.ext import commands
+
+from bot.utils.config_transfer import read_import, write_export
+from bot.utils.delivery_history import format_latencies
+
+if TYPE_CHECKING:
+    from bot.core.bot import DailyMessageBot
+
+logger = logging.getLogger(__name__)
+
+# Rejected lines listed in an import summary
+MAX_REPORTED_ERRORS = 10
+
+# Servers listed in the delivery summary
+MAX_FAILING_GUILDS = 5
+
+
+async def is_bot_owner(interaction: "Interaction[DailyMessageBot]") -> bool:
+    """Allow only the application owner (or team members)."""
+    return await interaction.client.is_owner(interaction.user)
+
+
+class AdminCog(commands.Cog):
+    """Cog containing bot-wide administration commands."""
+
+    def __init__(self, bot: "DailyMessageBot"):
+        self.bot = bot
+
+    @app_commands.command(
+        name="exportconfigs",
+        description="Export all server configurations as a JSON Lines file.",
+    )
+    @app_commands.check(is_bot_owner)
+    async def export_configs(self, interaction: Interaction):
+        """Slash command to export every guild configuration."""
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        fd, tmp_name = tempfile.mkstemp(suffix=".ndjson")
+        os.close(fd)
+        path = Path(tmp_name)
+        try:
+            configs = await self.bot.config_manager.get_all_configs()
+            count = await write_export(sorted(configs.items()), path)
+
+            await interaction.followup.send(
+                f"📦 Exported **{count}** server configurations.",
+                file=discord.File(path, filename="configs.ndjson"),
+                ephemeral=True,
+            )
+            logger.info(f"Exported {count} configurations for {interaction.user}")
+
+        except Exception as e:
+            logger.error(f"Error in export_configs: {e}")
+            await interaction.followup.send(
+                "❌ An error occurred while exporting the configurations.",
+                ephemeral=True,
+            )
+        finally:
+            path.unlink(missing_ok=True)
+
+    @app_commands.command(
+        name="importconfigs",
+        description="Import server configurations from a JSON Lines file.",
+    )
+    @app_commands.describe(
+        file="A .ndjson file with one configuration per line, as produced by /exportconfigs"
+    )
+    @app_commands.check(is_bot_owner)
+    async def import_configs(
+        self, interaction: Interaction, file: discord.Attachment
+    ):
+        """Slash command to apply configurations from an uploaded file."""
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        try:
+            # Stream the attachment line by line instead of reading it whole
+            async with aiohttp.ClientSession() as session:
+                async with session.get(file.url) as response:
+                    response.raise_for_status()
+                    updates, errors = await read_import(response.content)
+
+            if updates:
+                await self.bot.config_manager.update_many(updates)
+                for guild_id in updates:
+                    self.bot.templates.invalidate(guild_id)
+
+            lines = [f"✅ Applied configurations for **{len(updates)}** servers."]
+            if errors:
+                lines.append(f"⚠️ Skipped **{len(errors)}** invalid lines:")
+                for line_number, error in errors[:MAX_REPORTED_ERRORS]:
+                    lines.append(f"• Line {line_number}: {error}")
+                if len(errors) > MAX_REPORTED_ERRORS:
+                    lines.append(f"… and {len(errors) - MAX_REPORTED_ERRORS} more.")
+
+            await interaction.followup.send("\n".join(lines), ephemeral=True)
+            logger.info(
+                f"Imported {len(updates)} configurations ({len(errors)} rejected lines)"
+            )
+
+        except Exception as e:
+            logger.error(f"Error in import_configs: {e}")
+            await interaction.followup.send(
+                "❌ An error occurred while importing the configurations.",
+                ephemeral=True,
+            )
+
+    @app_commands.command(
+        name="deliverystats",
+        description="Summarize recent deliveries across all servers.",
+    )
+    @app_commands.check(is_bot_owner)
+    async def delivery_stats(self, interaction: Interaction):
+        """Slash command to show bot-wide delivery latency and failures."""
+        try:
+            history = self.bot.delivery_history
+            stats, failing = history.summary(MAX_FAILING_GUILDS)
+
+            embed = discord.Embed(
+                title="📈 Delivery Statistics",
+                description=(
+                    f"Last {history.size} deliveries of **{len(history)}** servers"
+                ),
+                color=discord.Color.blue(),
+            )
+            failure_rate = stats.failures / stats.count if stats.count else 0
+            embed.add_field(name="Deliveries", value=str(stats.count), inline=True)
+            embed.add_field(
+                name="Failed", value=f"{stats.failures} ({failure_rate:.1%})", inline=True
+            )
+            embed.add_field(name="Latency", value=format_latencies(stats), inline=False)
+            if failing:
+                lines = []
+                for guild_id, failures in failing:
+                    guild = self.bot.get_guild(guild_id)
+                    name = guild.name if guild else str(guild_id)
+                    lines.append(f"• {name}: {failures} failed")
+                embed.add_field(
+                    name="Most Failures", value="\n".join(lines), inline=False
+                )
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in delivery_stats: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while summarizing deliveries.", ephemeral=True
+            )
+
+    @export_configs.error
+    @import_configs.error
+    @delivery_stats.error
+    async def command_error_handler(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ):
+        """Handle command errors."""
+        if isinstance(error, app_commands.CheckFailure):
+            await interaction.response.send_message(
+                "❌ Only the bot owner can use this command.", ephemeral=True
+            )
+        else:
+            logger.error(f"Command error: {error}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "❌ An unexpected error occurred.", ephemeral=True
+                )
+
+
+async def setup(bot: "DailyMessageBot"):
+    """Set up the cog."""
+    await bot.add_cog(AdminCog(bot))
@@ -0,0 +1,157 @@
+"""Attachment cog for files sent with the daily message."""
+
+import logging
+from typing import TYPE_CHECKING, List
+
+import aiohttp
+import discord
+from discord import app_commands, Interaction
+from discord.ext import commands
+
+from bot.utils.attachments import MAX_ATTACHMENTS, AttachmentError
+
+if TYPE_CHECKING:
+    from bot.core.bot import DailyMessageBot
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the download per chunk
+CHUNK_SIZE = 64 * 1024
+
+
+@app_commands.guild_only()
+class AttachmentCog(commands.GroupCog, group_name="attachment"):
+    """Cog containing the /attachment commands (not available in DMs)."""
+
+    def __init__(self, bot: "DailyMessageBot"):
+        self.bot = bot
+        super().__init__()
+
+    async def _attachments(self, guild_id: int) -> List[str]:
+        config = await self.bot.config_manager.get_config(guild_id)
+        return list(config.get("attachments") or [])
+
+    @app_commands.command(name="add", description="Attach a file to the daily message.")
+    @app_commands.describe(file="Image or file to send with every daily message")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def add(self, interaction: Interaction, file: discord.Attachment):
+        """Slash command to store a file and attach it to the server's message."""
+        assert interaction.guild_id is not None
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        try:
+            attachments = await self._attachments(interaction.guild_id)
+            if len(attachments) >= MAX_ATTACHMENTS:
+                await interaction.followup.send(
+                    f"❌ A daily message can carry at most {MAX_ATTACHMENTS} files.",
+                    ephemeral=True,
+                )
+                return
+
+            # Stream the download to disk instead of reading it whole
+            async with aiohttp.ClientSession() as session:
+                async with session.get(file.url) as response:
+                    response.raise_for_status()
+                    stored = await self.bot.attachment_store.add(
+                        response.content.iter_chunked(CHUNK_SIZE),
+                        file.filename,
+                        file.content_type,
+                    )
+
+            if stored.digest not in attachments:
+                await self.bot.config_manager.update_config(
+                    interaction.guild_id, {"attachments": attachments + [stored.digest]}
+                )
+
+            await interaction.followup.send(
+                f"✅ `{stored.filename}` will be sent with the daily message.",
+                ephemeral=True,
+            )
+            logger.info(f"Attachment {stored.digest} added for guild {interaction.guild_id}")
+
+        except AttachmentError as e:
+            await interaction.followup.send(f"❌ Cannot attach this file: {e}.", ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in attachment add: {e}")
+            await interaction.followup.send(
+                "❌ An error occurred while saving the file.", ephemeral=True
+            )
+
+    @app_commands.command(name="list", description="List the files sent with the daily message.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def list_attachments(self, interaction: Interaction):
+        """Slash command to list the server's attachments."""
+        assert interaction.guild_id is not None
+        try:
+            lines = []
+            for number, digest in enumerate(await self._attachments(interaction.guild_id), 1):
+                stored = self.bot.attachment_store.get(digest)
+                if stored is None:
+                    lines.append(f"{number}. ⚠️ missing file `{digest[:12]}`")
+                else:
+                    lines.append(f"{number}. `{stored.filename}` ({stored.size / 1024:.0f} KB)")
+
+            await interaction.response.send_message(
+                "📎 **Attachments**\n" + "\n".join(lines) if lines else "No files are attached.",
+                ephemeral=True,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in attachment list: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while listing the files.", ephemeral=True
+            )
+
+    @app_commands.command(name="remove", description="Stop sending a file with the daily message.")
+    @app_commands.describe(number="The file's number in /attachment list")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def remove(self, interaction: Interaction, number: int):
+        """Slash command to detach one file."""
+        assert interaction.guild_id is not None
+        try:
+            attachments = await self._attachments(interaction.guild_id)
+            if not 1 <= number <= len(attachments):
+                await interaction.response.send_message(
+                    "❌ No such file. Use `/attachment list` to see the numbers.",
+                    ephemeral=True,
+                )
+                return
+
+            # The file itself is deleted once no server references it
+            digest = attachments.pop(number - 1)
+            await self.bot.config_manager.update_config(
+                interaction.guild_id, {"attachments": attachments}
+            )
+
+            await interaction.response.send_message("✅ File removed.", ephemeral=True)
+            logger.info(f"Attachment {digest} removed for guild {interaction.guild_id}")
+
+        except Exception as e:
+            logger.error(f"Error in attachment remove: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while removing the file.", ephemeral=True
+            )
+
+    @add.error
+    @list_attachments.error
+    @remove.error
+    async def command_error_handler(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ):
+        """Handle command errors."""
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message(
+                "❌ You don't have permission to use this command. You need 'Manage Server' permission.",
+                ephemeral=True,
+            )
+        else:
+            logger.error(f"Command error: {error}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "❌ An unexpected error occurred.", ephemeral=True
+                )
+
+
+async def setup(bot: "DailyMessageBot"):
+    """Set up the cog."""
+    await bot.add_cog(AttachmentCog(bot))
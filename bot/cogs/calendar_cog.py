@@ -0,0 +1,289 @@
+"""Skip calendar cog: shared holiday calendars and per-server skip dates."""
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from discord import app_commands, Interaction
+from discord.ext import commands
+
+from bot.cogs.admin_cog import is_bot_owner
+from bot.utils.calendars import Calendar, CalendarError, parse_date, parse_dates, parse_weekdays
+
+if TYPE_CHECKING:
+    from bot.core.bot import DailyMessageBot
+
+logger = logging.getLogger(__name__)
+
+# Calendars listed in autocomplete suggestions
+MAX_CHOICES = 25
+
+
+@app_commands.guild_only()
+class CalendarCog(commands.GroupCog, group_name="calendar"):
+    """Cog containing the /calendar commands (not available in DMs)."""
+
+    def __init__(self, bot: "DailyMessageBot"):
+        self.bot = bot
+        super().__init__()
+
+    @property
+    def store(self):
+        return self.bot.calendar_store
+
+    async def calendar_autocomplete(
+        self, interaction: Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggest calendar names starting with the typed text."""
+        names = [name for name in self.store.names() if name.startswith(current.lower())]
+        return [app_commands.Choice(name=name, value=name) for name in names[:MAX_CHOICES]]
+
+    async def _update_dates(self, guild_id: int, add_to: Optional[str], text: str) -> str:
+        """
+        Move a date into one of a guild's override lists, or out of both.
+
+        Past dates are dropped from the lists while they are rewritten.
+        """
+        day = parse_date(text).isoformat()
+        today = datetime.utcnow().date().isoformat()
+        config = await self.bot.config_manager.get_config(guild_id)
+
+        updates: Dict[str, List[str]] = {}
+        for key in ("skip_dates", "send_dates"):
+            dates = {d for d in config.get(key) or () if d >= today and d != day}
+            if key == add_to:
+                dates.add(day)
+            updates[key] = sorted(dates)
+
+        await self.bot.config_manager.update_config(guild_id, updates)
+        return day
+
+    @app_commands.command(
+        name="show", description="Show this server's skip calendars and dates."
+    )
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def show(self, interaction: Interaction):
+        """Slash command to list calendars, overrides and the next send date."""
+        assert interaction.guild_id is not None
+        try:
+            config = await self.bot.config_manager.get_config(interaction.guild_id)
+            subscribed = config.get("calendars") or []
+
+            lines = ["📅 **Skip calendars**"]
+            for name in self.store.names():
+                marker = "✅" if name in subscribed else "▫️"
+                lines.append(f"{marker} `{name}`: {self.store.get(name).describe()}")
+            for name in subscribed:
+                if self.store.get(name) is None:
+                    lines.append(f"⚠️ `{name}`: no longer exists")
+            if len(lines) == 1:
+                lines.append("No calendars have been defined yet.")
+
+            lines.append(f"**Skipped dates:** {', '.join(config.get('skip_dates') or []) or 'none'}")
+            lines.append(f"**Forced send dates:** {', '.join(config.get('send_dates') or []) or 'none'}")
+
+            next_send = self.bot.scheduler.next_send_time(
+                interaction.guild_id, config, datetime.utcnow()
+            )
+            lines.append(
+                f"**Next send:** {next_send:%Y-%m-%d %H:%M} UTC" if next_send
+                else "**Next send:** none scheduled"
+            )
+
+            await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in calendar show: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while retrieving the calendars.", ephemeral=True
+            )
+
+    @app_commands.command(
+        name="subscribe", description="Skip daily messages on a calendar's days."
+    )
+    @app_commands.describe(name="Calendar to follow")
+    @app_commands.autocomplete(name=calendar_autocomplete)
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def subscribe(self, interaction: Interaction, name: str):
+        """Slash command to subscribe the server to a calendar."""
+        assert interaction.guild_id is not None
+        try:
+            if self.store.get(name) is None:
+                await interaction.response.send_message(
+                    f"❌ Unknown calendar `{name}`. Use `/calendar show` to list them.",
+                    ephemeral=True,
+                )
+                return
+
+            config = await self.bot.config_manager.get_config(interaction.guild_id)
+            calendars = config.get("calendars") or []
+            if name not in calendars:
+                await self.bot.config_manager.update_config(
+                    interaction.guild_id, {"calendars": calendars + [name]}
+                )
+
+            await interaction.response.send_message(
+                f"✅ Daily messages will be skipped on `{name}` days.", ephemeral=True
+            )
+            logger.info(f"Guild {interaction.guild_id} subscribed to calendar {name}")
+
+        except Exception as e:
+            logger.error(f"Error in calendar subscribe: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while updating the calendars.", ephemeral=True
+            )
+
+    @app_commands.command(
+        name="unsubscribe", description="Stop skipping a calendar's days."
+    )
+    @app_commands.describe(name="Calendar to stop following")
+    @app_commands.autocomplete(name=calendar_autocomplete)
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def unsubscribe(self, interaction: Interaction, name: str):
+        """Slash command to unsubscribe the server from a calendar."""
+        assert interaction.guild_id is not None
+        try:
+            config = await self.bot.config_manager.get_config(interaction.guild_id)
+            calendars = config.get("calendars") or []
+            if name not in calendars:
+                await interaction.response.send_message(
+                    f"❌ This server does not follow `{name}`.", ephemeral=True
+                )
+                return
+
+            await self.bot.config_manager.update_config(
+                interaction.guild_id,
+                {"calendars": [c for c in calendars if c != name]},
+            )
+            await interaction.response.send_message(
+                f"✅ No longer skipping `{name}` days.", ephemeral=True
+            )
+            logger.info(f"Guild {interaction.guild_id} unsubscribed from calendar {name}")
+
+        except Exception as e:
+            logger.error(f"Error in calendar unsubscribe: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while updating the calendars.", ephemeral=True
+            )
+
+    @app_commands.command(name="skip", description="Skip the daily message on a date.")
+    @app_commands.describe(date="Date to skip (YYYY-MM-DD)")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def skip(self, interaction: Interaction, date: str):
+        """Slash command to add a skip date for the server."""
+        await self._override(interaction, "skip_dates", date, "✅ No daily message will be sent on `{}`.")
+
+    @app_commands.command(
+        name="send", description="Send the daily message on a date its calendars skip."
+    )
+    @app_commands.describe(date="Date to send on (YYYY-MM-DD)")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def send(self, interaction: Interaction, date: str):
+        """Slash command to force a send date for the server."""
+        await self._override(interaction, "send_dates", date, "✅ The daily message will be sent on `{}`.")
+
+    @app_commands.command(name="clear", description="Remove a date's skip or send override.")
+    @app_commands.describe(date="Date to clear (YYYY-MM-DD)")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def clear(self, interaction: Interaction, date: str):
+        """Slash command to drop a date override for the server."""
+        await self._override(interaction, None, date, "✅ `{}` follows the server's calendars again.")
+
+    async def _override(self, interaction: Interaction, key: Optional[str], date: str, reply: str):
+        assert interaction.guild_id is not None
+        try:
+            day = await self._update_dates(interaction.guild_id, key, date)
+            await interaction.response.send_message(reply.format(day), ephemeral=True)
+            logger.info(f"Date override {key or 'cleared'} for {day} in guild {interaction.guild_id}")
+        except CalendarError as e:
+            await interaction.response.send_message(f"❌ Invalid date: {e}.", ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in calendar date override: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while updating the dates.", ephemeral=True
+            )
+
+    @app_commands.command(
+        name="define", description="Create or replace a shared skip calendar."
+    )
+    @app_commands.describe(
+        name="Calendar name",
+        weekdays="Weekdays to skip, e.g. sat,sun",
+        dates="Dates to skip: YYYY-MM-DD once, or MM-DD every year, comma-separated",
+    )
+    @app_commands.check(is_bot_owner)
+    async def define(
+        self, interaction: Interaction, name: str, weekdays: str = "", dates: str = ""
+    ):
+        """Slash command to define a calendar shared by all servers."""
+        try:
+            name = name.strip().lower()
+            one_off, annual = parse_dates(dates)
+            calendar = Calendar(name, parse_weekdays(weekdays), one_off, annual)
+            await self.store.define(calendar)
+
+            await interaction.response.send_message(
+                f"✅ Calendar `{name}` saved: {calendar.describe()}.", ephemeral=True
+            )
+            logger.info(f"Calendar {name} defined by {interaction.user}")
+
+        except CalendarError as e:
+            await interaction.response.send_message(f"❌ Invalid calendar: {e}.", ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in calendar define: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while saving the calendar.", ephemeral=True
+            )
+
+    @app_commands.command(name="delete", description="Delete a shared skip calendar.")
+    @app_commands.describe(name="Calendar to delete")
+    @app_commands.autocomplete(name=calendar_autocomplete)
+    @app_commands.check(is_bot_owner)
+    async def delete(self, interaction: Interaction, name: str):
+        """Slash command to delete a shared calendar."""
+        try:
+            if await self.store.remove(name):
+                message = f"✅ Calendar `{name}` deleted."
+                logger.info(f"Calendar {name} deleted by {interaction.user}")
+            else:
+                message = f"❌ Unknown calendar `{name}`."
+            await interaction.response.send_message(message, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in calendar delete: {e}")
+            await interaction.response.send_message(
+                "❌ An error occurred while deleting the calendar.", ephemeral=True
+            )
+
+    @show.error
+    @subscribe.error
+    @unsubscribe.error
+    @skip.error
+    @send.error
+    @clear.error
+    @define.error
+    @delete.error
+    async def command_error_handler(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ):
+        """Handle command errors."""
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message(
+                "❌ You don't have permission to use this command. You need 'Manage Server' permission.",
+                ephemeral=True,
+            )
+        elif isinstance(error, app_commands.CheckFailure):
+            await interaction.response.send_message(
+                "❌ Only the bot owner can use this command.", ephemeral=True
+            )
+        else:
+            logger.error(f"Command error: {error}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "❌ An unexpected error occurred.", ephemeral=True
+                )
+
+
+async def setup(bot: "DailyMessageBot"):
+    """Set up the cog."""
+    await bot.add_cog(CalendarCog(bot))
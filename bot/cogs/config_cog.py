@@ -1,12 +1,15 @@
 """Configuration cog for Discord bot commands and interactions."""
 
 import logging
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 import discord
 from discord import app_commands, ui, Interaction
 from discord.ext import commands
 
+from bot.utils.delivery_history import format_latencies
+from bot.utils.templates import TemplateError, build_context, compile_template
 from bot.utils.time_utils import parse_time_string
 
 if TYPE_CHECKING:
@@ -50,15 +53,40 @@ class SettingsModal(ui.Modal):
                 )
                 return
 
-            # Save configuration
-            config = {
+            # Validate and compile the message template
+            roles = (
+                {role.name: role.id for role in interaction.guild.roles}
+                if interaction.guild
+                else None
+            )
+            try:
+                template = compile_template(message, roles)
+            except TemplateError as e:
+                await interaction.response.send_message(
+                    f"❌ Invalid message template: {e}.",
+                    ephemeral=True,
+                )
+                return
+
+            # Keep the day counter running across edits
+            current_config = await self.bot.config_manager.get_config(self.guild_id)
+            start_date = (
+                current_config.get("start_date")
+                or datetime.utcnow().date().isoformat()
+            )
+
+            # Merge into the configuration, so settings made by other
+            # commands (calendars, dates, attachments) are kept
+            updates = {
                 "channel_id": channel_id,
                 "time": time_str,
-                "message": message,
+                "message": template.source,
                 "enabled": True,
+                "start_date": start_date,
             }
 
-            await self.bot.config_manager.set_config(self.guild_id, config)
+            await self.bot.config_manager.update_config(self.guild_id, updates)
+            self.bot.templates.put(self.guild_id, template)
 
             await interaction.response.send_message(
                 f"✅ **Settings updated!**\n"
@@ -80,7 +108,7 @@ class SettingsModal(ui.Modal):
         """Set up form fields with current configuration."""
         current_config = await self.bot.config_manager.get_config(self.guild_id)
 
-        self.channel_id_input = ui.TextInput(
+        self.channel_id_input: "ui.TextInput[SettingsModal]" = ui.TextInput(
             label="Target Channel ID",
             placeholder="Enter the ID of the channel for daily messages",
             default=(
@@ -90,16 +118,19 @@ class SettingsModal(ui.Modal):
             ),
         )
 
-        self.time_input = ui.TextInput(
+        self.time_input: "ui.TextInput[SettingsModal]" = ui.TextInput(
             label="Send Time (UTC, 24-hour format)",
             placeholder="e.g., 07:00 for 10:00 MSK",
             default=current_config.get("time", "07:00"),
         )
 
-        self.message_input = ui.TextInput(
+        self.message_input: "ui.TextInput[SettingsModal]" = ui.TextInput(
             label="Daily Message Content",
             style=discord.TextStyle.paragraph,
-            placeholder="Type the message you want to send daily.",
+            placeholder=(
+                "Type the message you want to send daily. "
+                "Supports {date}, {weekday}, {guild}, {day}, {role:Name}."
+            ),
             default=current_config.get("message", ""),
         )
 
@@ -113,14 +144,27 @@ class ConfigCog(commands.Cog):
 
     def __init__(self, bot: "DailyMessageBot"):
         self.bot = bot
+        # Context menus cannot be defined in a cog class, so the menu is
+        # built here and added to the tree directly
+        self.configure_bot_menu = app_commands.ContextMenu(
+            name="Configure Bot", callback=self.configure_bot_context_menu
+        )
+        self.configure_bot_menu.error(self.command_error_handler)
+        self.bot.tree.add_command(self.configure_bot_menu)
 
-    @app_commands.context_menu(name="Configure Bot")
-    @app_commands.describe()
+    async def cog_unload(self):
+        """Remove the context menu added to the tree."""
+        self.bot.tree.remove_command(
+            self.configure_bot_menu.name, type=self.configure_bot_menu.type
+        )
+
+    @app_commands.guild_only()
     @app_commands.checks.has_permissions(manage_guild=True)
     async def configure_bot_context_menu(
         self, interaction: Interaction, user: discord.Member
     ):
         """Context menu command to configure the bot."""
+        assert interaction.guild_id is not None
         try:
             modal = SettingsModal(self.bot, interaction.guild_id)
             await modal.setup_form_fields()
@@ -138,9 +182,11 @@ class ConfigCog(commands.Cog):
         description="Enable or disable daily messages for this server.",
     )
     @app_commands.describe(enable="Whether to enable or disable daily messages")
+    @app_commands.guild_only()
     @app_commands.checks.has_permissions(manage_guild=True)
     async def toggle_daily(self, interaction: Interaction, enable: bool):
         """Slash command to enable/disable daily messages."""
+        assert interaction.guild_id is not None
         try:
             config = await self.bot.config_manager.get_config(interaction.guild_id)
 
@@ -171,9 +217,11 @@ class ConfigCog(commands.Cog):
     @app_commands.command(
         name="status", description="Show current bot configuration for this server."
     )
+    @app_commands.guild_only()
     @app_commands.checks.has_permissions(manage_guild=True)
     async def show_status(self, interaction: Interaction):
         """Show current bot configuration."""
+        assert interaction.guild is not None and interaction.guild_id is not None
         try:
             config = await self.bot.config_manager.get_config(interaction.guild_id)
 
@@ -200,13 +248,37 @@ class ConfigCog(commands.Cog):
             embed.add_field(
                 name="Time (UTC)", value=config.get("time", "Not set"), inline=True
             )
+            next_send = self.bot.scheduler.next_send_time(
+                interaction.guild_id, config, datetime.utcnow()
+            )
+            embed.add_field(
+                name="Next Send",
+                value=f"{next_send:%Y-%m-%d %H:%M} UTC" if next_send else "None scheduled",
+                inline=True,
+            )
+            stats = self.bot.delivery_history.stats(interaction.guild_id)
+            if stats.count:
+                embed.add_field(
+                    name=f"Last {stats.count} Deliveries",
+                    value=f"{format_latencies(stats)}\n{stats.failures} failed",
+                    inline=False,
+                )
+            preview = "Not set"
+            if config.get("message"):
+                template = self.bot.templates.get(
+                    interaction.guild_id, config["message"]
+                )
+                preview = template.render(
+                    build_context(
+                        datetime.utcnow(),
+                        interaction.guild.name,
+                        config.get("start_date"),
+                    )
+                )
+
             embed.add_field(
                 name="Message Preview",
-                value=(
-                    config.get("message", "Not set")[:100] + "..."
-                    if len(config.get("message", "")) > 100
-                    else config.get("message", "Not set")
-                ),
+                value=preview[:100] + "..." if len(preview) > 100 else preview,
                 inline=False,
             )
 
@@ -218,9 +290,12 @@ class ConfigCog(commands.Cog):
                 "❌ An error occurred while retrieving the status.", ephemeral=True
             )
 
-    @configure_bot_context_menu.error
-    @toggle_daily.error
-    @show_status.error
+    async def cog_app_command_error(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ):
+        """Handle errors of the cog's slash commands."""
+        await self.command_error_handler(interaction, error)
+
     async def command_error_handler(
         self, interaction: Interaction, error: app_commands.AppCommandError
     ):
@@ -1,13 +1,22 @@
 """Main Discord bot implementation."""
+import asyncio
 import logging
-from typing import List
+from datetime import timedelta
+from typing import List, Optional
 
 import discord
 from discord.ext import commands
 
 from bot.core.config import settings
+from bot.core.runtime import get_json_codec
 from bot.core.scheduler import MessageScheduler
+from bot.utils.attachments import AttachmentCache, AttachmentReferences, AttachmentStore
+from bot.utils.calendars import CalendarStore, SkipIndex
+from bot.utils.channel_health import ChannelHealth
+from bot.utils.config_archive import STALE_CONFIG_ACTIONS, ConfigArchive, reconcile_configs
 from bot.utils.config_manager import ConfigManager
+from bot.utils.delivery_history import DeliveryHistory
+from bot.utils.templates import TemplateCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,21 +25,71 @@ class DailyMessageBot(commands.Bot):
     The main class for the Discord Daily Message Bot.
     """
     
-    def __init__(self):
+    def __init__(self, config_file_path: Optional[str] = None):
         intents = discord.Intents.default()
         super().__init__(command_prefix="!", intents=intents)
         
-        self.config_manager = ConfigManager(settings.config_file_path)
-        self.scheduler = MessageScheduler(self)
+        self.config_manager = ConfigManager(
+            config_file_path or settings.config_file_path,
+            compress_threshold=settings.message_compress_threshold or None,
+            file_format=settings.config_file_format,
+            json_codec=get_json_codec(settings.runtime_profile),
+        )
+        if settings.stale_config_action not in STALE_CONFIG_ACTIONS:
+            raise ValueError(f"Unknown stale config action: {settings.stale_config_action}")
+        self.config_archive = (
+            ConfigArchive(settings.config_archive_path)
+            if settings.stale_config_action == 'archive'
+            else None
+        )
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.templates = TemplateCache()
+        self.channel_health = ChannelHealth(
+            circuit_threshold=settings.circuit_breaker_threshold,
+            cooldown=timedelta(hours=settings.circuit_cooldown_hours),
+        )
+        self.calendar_store = CalendarStore(settings.calendars_file_path)
+        self.attachment_store = AttachmentStore(settings.attachments_dir, settings.attachment_max_bytes)
+        self.attachment_cache = AttachmentCache(
+            self.attachment_store, ttl=timedelta(hours=settings.attachment_url_ttl_hours)
+        )
+        # Files no live or archived configuration references any more are deleted
+        self.attachment_refs = AttachmentReferences(self.attachment_store, self.attachment_cache)
+        self.config_manager.add_listener(self.attachment_refs.on_configs_changed)
+        if self.config_archive:
+            self.config_archive.add_listener(self.attachment_refs.on_archived)
+        self.delivery_history = DeliveryHistory(
+            settings.delivery_history_path, settings.delivery_history_size
+        )
+        self.scheduler = MessageScheduler(
+            self,
+            prewarm_seconds=settings.prewarm_seconds,
+            health=self.channel_health,
+            disable_threshold=settings.auto_disable_threshold,
+            skips=SkipIndex(self.calendar_store),
+            coalesce=settings.coalesce_messages,
+            attachments=self.attachment_cache,
+            history=self.delivery_history,
+        )
         
         self.initial_cogs: List[str] = [
-            "bot.cogs.config_cog"
+            "bot.cogs.config_cog",
+            "bot.cogs.admin_cog",
+            "bot.cogs.calendar_cog",
+            "bot.cogs.attachment_cog",
         ]
         
     async def setup_hook(self):
         """Asynchronous setup method, called after login."""
         logger.info("Executing setup_hook")
         
+        # Skip calendars must be in place before the scheduler runs
+        await self.calendar_store.load()
+        await self.delivery_history.load()
+        # Before anything can release a file only the archive still references
+        if self.config_archive:
+            self.attachment_refs.on_archived(await self.config_archive.load_all())
+        
         # Load initial cogs
         for cog in self.initial_cogs:
             try:
@@ -50,19 +109,98 @@ class DailyMessageBot(commands.Bot):
         # Start the scheduler
         await self.scheduler.start()
         
+        # Pick up external edits of the configuration file
+        if settings.config_watch:
+            await self.config_manager.watch(settings.config_poll_interval)
+        
     async def on_ready(self):
         """Called when the bot is ready and connected to Discord."""
         logger.info(f"Logged in as {self.user.name} (ID: {self.user.id})")
         logger.info("Bot is ready.")
         
+        # The guild list is complete now; also runs again after reconnects
+        await self.reconcile_configs()
+        if settings.reconcile_interval_hours > 0 and self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+            
+    async def reconcile_configs(self):
+        """Drop configs of guilds the bot has left and add missing ones, in one write."""
+        if not self.is_ready():
+            return
+            
+        try:
+            # Comparing against a partly loaded store would drop or recreate configs
+            await self.config_manager.wait_until_loaded()
+            result = await reconcile_configs(
+                self.config_manager,
+                [guild.id for guild in self.guilds],
+                self.config_archive,
+            )
+            for guild_id in result.removed + result.restored:
+                self.templates.invalidate(guild_id)
+        except Exception as e:
+            logger.error(f"Failed to reconcile guild configurations: {e}", exc_info=True)
+            
+    async def _reconcile_loop(self):
+        """Reconcile guild configurations periodically."""
+        while not self.is_closed():
+            await asyncio.sleep(settings.reconcile_interval_hours * 3600)
+            await self.reconcile_configs()
+            
     async def on_guild_join(self, guild: discord.Guild):
         """Called when the bot joins a new guild."""
         logger.info(f"Joined new guild: {guild.name} (ID: {guild.id})")
-        await self.config_manager.create_default_config(guild.id)
+        archived = await self.config_archive.find(guild.id) if self.config_archive else None
+        if archived:
+            await self.config_manager.set_config(guild.id, archived)
+            self.templates.invalidate(guild.id)
+            logger.info(f"Restored archived configuration for guild {guild.id}")
+        else:
+            await self.config_manager.create_default_config(guild.id)
+            
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Called when the bot leaves, is removed from, or loses a guild."""
+        logger.info(f"Removed from guild: {guild.name} (ID: {guild.id})")
+        config = await self.config_manager.get_config(guild.id)
+        if config and self.config_archive:
+            await self.config_archive.add({guild.id: config})
+        await self.config_manager.delete_config(guild.id)
+        self.templates.invalidate(guild.id)
+        
+    # Permission changes invalidate cached channel permissions and let
+    # channels with an open circuit be retried
+    
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """Called when a channel (including its overwrites) changes."""
+        self.channel_health.invalidate_channel(after.id)
+        
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Called when a channel is deleted."""
+        self.channel_health.invalidate_channel(channel.id)
+        
+    async def on_guild_role_create(self, role: discord.Role):
+        """Called when a role is created."""
+        self.channel_health.invalidate_guild(role.guild.id)
+        
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Called when a role's permissions or position change."""
+        self.channel_health.invalidate_guild(after.guild.id)
+        
+    async def on_guild_role_delete(self, role: discord.Role):
+        """Called when a role is deleted."""
+        self.channel_health.invalidate_guild(role.guild.id)
+        
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Called when a member changes; Discord always sends this for the bot itself."""
+        if self.user and after.id == self.user.id and before.roles != after.roles:
+            self.channel_health.invalidate_guild(after.guild.id)
         
     async def close(self):
         """Close the bot and clean up resources."""
         logger.info("Closing bot...")
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
         await self.scheduler.stop()
+        await self.delivery_history.flush()
         await self.config_manager.close()
         await super().close()
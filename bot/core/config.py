@@ -1,5 +1,9 @@
 """Configuration management using Pydantic."""
-from pydantic import BaseSettings, Field
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic v1
+    from pydantic import BaseSettings
+from pydantic import Field
 from dotenv import load_dotenv
 import os
 
@@ -11,6 +15,42 @@ class AppSettings(BaseSettings):
     """
     discord_bot_token: str = Field(..., env="DISCORD_BOT_TOKEN")
     config_file_path: str = Field("data/server_configs.json", env="CONFIG_FILE_PATH")
+    # "json" or "binary" (compact snapshot); files in the other format are upgraded on load
+    config_file_format: str = Field("json", env="CONFIG_FILE_FORMAT")
+    # Message bodies at least this many bytes are compressed on disk (0 disables)
+    message_compress_threshold: int = Field(1024, env="MESSAGE_COMPRESS_THRESHOLD")
+    # Seconds before each minute boundary that due messages are prepared (0 disables)
+    prewarm_seconds: float = Field(15, env="PREWARM_SECONDS")
+    # "standard", or "performance" to use uvloop and orjson when installed
+    runtime_profile: str = Field("standard", env="RUNTIME_PROFILE")
+    # Consecutive failed deliveries that pause a channel until a permission change (0 disables)
+    circuit_breaker_threshold: int = Field(3, env="CIRCUIT_BREAKER_THRESHOLD")
+    # Hours after its last failure that a paused channel is tried once again
+    circuit_cooldown_hours: float = Field(24, env="CIRCUIT_COOLDOWN_HOURS")
+    # Consecutive failed deliveries that disable a guild and notify its owner (0 disables)
+    auto_disable_threshold: int = Field(5, env="AUTO_DISABLE_THRESHOLD")
+    # Apply external edits of the configuration file without a restart
+    config_watch: bool = Field(True, env="CONFIG_WATCH")
+    # Seconds between file checks where inotify is unavailable
+    config_poll_interval: float = Field(2, env="CONFIG_POLL_INTERVAL")
+    # "archive" or "delete" configurations of guilds the bot is no longer in
+    stale_config_action: str = Field("archive", env="STALE_CONFIG_ACTION")
+    config_archive_path: str = Field("data/archived_configs.ndjson", env="CONFIG_ARCHIVE_PATH")
+    # Hours between reconciliation passes after the one at startup (0 disables)
+    reconcile_interval_hours: float = Field(6, env="RECONCILE_INTERVAL_HOURS")
+    # Merge messages due in the same channel at the same minute into shared sends
+    coalesce_messages: bool = Field(True, env="COALESCE_MESSAGES")
+    # Directory of files attached to daily messages, stored once by content hash
+    attachments_dir: str = Field("data/attachments", env="ATTACHMENTS_DIR")
+    # Largest attachment accepted, in bytes (Discord's limit without boosts)
+    attachment_max_bytes: int = Field(10 * 1024 * 1024, env="ATTACHMENT_MAX_BYTES")
+    # Hours an uploaded file's URL is reused when Discord does not say when it expires
+    attachment_url_ttl_hours: float = Field(20, env="ATTACHMENT_URL_TTL_HOURS")
+    # Deliveries remembered per guild for /status and /deliverystats
+    delivery_history_size: int = Field(14, env="DELIVERY_HISTORY_SIZE")
+    delivery_history_path: str = Field("data/delivery_history.bin", env="DELIVERY_HISTORY_PATH")
+    # Shared skip calendars (holidays, weekends, blackout dates)
+    calendars_file_path: str = Field("data/calendars.json", env="CALENDARS_FILE_PATH")
 
     class Config:
         env_file = ".env"
@@ -27,6 +67,25 @@ except Exception as e:
     class FallbackSettings:
         discord_bot_token: str = os.getenv("DISCORD_BOT_TOKEN", "")
         config_file_path: str = os.getenv("CONFIG_FILE_PATH", "data/server_configs.json")
+        config_file_format: str = os.getenv("CONFIG_FILE_FORMAT", "json")
+        message_compress_threshold: int = int(os.getenv("MESSAGE_COMPRESS_THRESHOLD", "1024"))
+        prewarm_seconds: float = float(os.getenv("PREWARM_SECONDS", "15"))
+        runtime_profile: str = os.getenv("RUNTIME_PROFILE", "standard")
+        circuit_breaker_threshold: int = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "3"))
+        circuit_cooldown_hours: float = float(os.getenv("CIRCUIT_COOLDOWN_HOURS", "24"))
+        auto_disable_threshold: int = int(os.getenv("AUTO_DISABLE_THRESHOLD", "5"))
+        config_watch: bool = os.getenv("CONFIG_WATCH", "true").lower() in ("1", "true", "yes")
+        config_poll_interval: float = float(os.getenv("CONFIG_POLL_INTERVAL", "2"))
+        stale_config_action: str = os.getenv("STALE_CONFIG_ACTION", "archive")
+        config_archive_path: str = os.getenv("CONFIG_ARCHIVE_PATH", "data/archived_configs.ndjson")
+        reconcile_interval_hours: float = float(os.getenv("RECONCILE_INTERVAL_HOURS", "6"))
+        coalesce_messages: bool = os.getenv("COALESCE_MESSAGES", "true").lower() in ("1", "true", "yes")
+        attachments_dir: str = os.getenv("ATTACHMENTS_DIR", "data/attachments")
+        attachment_max_bytes: int = int(os.getenv("ATTACHMENT_MAX_BYTES", str(10 * 1024 * 1024)))
+        attachment_url_ttl_hours: float = float(os.getenv("ATTACHMENT_URL_TTL_HOURS", "20"))
+        delivery_history_size: int = int(os.getenv("DELIVERY_HISTORY_SIZE", "14"))
+        delivery_history_path: str = os.getenv("DELIVERY_HISTORY_PATH", "data/delivery_history.bin")
+        calendars_file_path: str = os.getenv("CALENDARS_FILE_PATH", "data/calendars.json")
     
     settings: Any = FallbackSettings()
 
@@ -0,0 +1,66 @@
+"""Runtime profiles: event loop and serialization choices."""
+import asyncio
+import logging
+from types import ModuleType
+from typing import Optional
+
+from bot.utils.json_codec import JsonCodec, get_codec
+
+uvloop: Optional[ModuleType]
+try:
+    import uvloop
+except ImportError:  # optional speedup, not available on Windows
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+# "standard": asyncio loop and stdlib json
+# "performance": uvloop and orjson, each used only when installed
+RUNTIME_PROFILES = ('standard', 'performance')
+
+
+def _check_profile(profile: str):
+    if profile not in RUNTIME_PROFILES:
+        raise ValueError(f"Unknown runtime profile: {profile}")
+
+
+def install_event_loop(profile: str) -> str:
+    """
+    Select the event loop implementation for a runtime profile.
+
+    Must be called before the loop is created (i.e. before ``asyncio.run``).
+
+    Args:
+        profile: One of ``RUNTIME_PROFILES``
+
+    Returns:
+        The name of the installed event loop implementation
+    """
+    _check_profile(profile)
+
+    if profile == 'performance':
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return 'uvloop'
+        logger.warning("uvloop is not installed, using the default asyncio event loop")
+
+    asyncio.set_event_loop_policy(None)
+    return 'asyncio'
+
+
+def get_json_codec(profile: str) -> JsonCodec:
+    """
+    Get the configuration JSON codec for a runtime profile.
+
+    Args:
+        profile: One of ``RUNTIME_PROFILES``
+
+    Returns:
+        ``orjson`` for the performance profile when installed, else stdlib json
+    """
+    _check_profile(profile)
+
+    codec = get_codec(fast=profile == 'performance')
+    if profile == 'performance' and codec.name != 'orjson':
+        logger.warning("orjson is not installed, using the standard json module")
+    return codec
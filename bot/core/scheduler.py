@@ -1,11 +1,18 @@
 """Scheduler for daily message sending."""
 import asyncio
 import logging
-from datetime import datetime, date
-from typing import Dict, TYPE_CHECKING
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
 
 import discord
 
+from bot.utils.attachments import AttachmentCache
+from bot.utils.calendars import SkipIndex
+from bot.utils.channel_health import ChannelHealth
+from bot.utils.clock import Clock
+from bot.utils.delivery_history import DeliveryHistory
+from bot.utils.message_packing import pack_messages
+from bot.utils.templates import build_context
 from bot.utils.time_utils import parse_time_string, is_time_to_send
 
 if TYPE_CHECKING:
@@ -13,24 +20,81 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# (hour, minute) a guild's message is scheduled for
+Slot = Tuple[int, int]
+
+class StagedMessage(NamedTuple):
+    """A message resolved and rendered ahead of its fire time."""
+    guild_id: int
+    channel: Any
+    content: str
+    fire_time: datetime
+    # Digests of stored files sent with the message
+    attachments: Tuple[str, ...] = ()
+
 class MessageScheduler:
     """
     Handles the scheduling and sending of daily messages.
+
+    Guilds are indexed by their scheduled minute. Shortly before each minute
+    boundary a pre-warm stage resolves channels and renders the messages of
+    the guilds due at that minute, so delivery only has to make HTTP calls.
+
+    Channels the bot cannot post in are skipped before any API call, and a
+    guild whose deliveries keep failing is disabled and its owner notified.
+    Days a guild's skip calendars exclude are checked with a bit test.
+
+    Messages due in the same channel at the same minute are merged into as
+    few sends as fit Discord's length limit, saving requests against the
+    channel's rate limit. Messages with attachments are sent on their own,
+    reusing each file's uploaded URL while it is valid. Every delivery
+    attempt is added to the guild's delivery history.
     """
-    
-    def __init__(self, bot: "DailyMessageBot"):
+
+    def __init__(
+        self,
+        bot: "DailyMessageBot",
+        prewarm_seconds: float = 15,
+        clock: Optional[Clock] = None,
+        health: Optional[ChannelHealth] = None,
+        disable_threshold: int = 5,
+        skips: Optional[SkipIndex] = None,
+        coalesce: bool = True,
+        attachments: Optional[AttachmentCache] = None,
+        history: Optional[DeliveryHistory] = None,
+    ):
         self.bot = bot
+        self.prewarm_seconds = prewarm_seconds
+        self.clock = clock or Clock()
+        self.health = health or ChannelHealth()
+        # Consecutive failed deliveries before a guild is disabled (0 never)
+        self.disable_threshold = disable_threshold
+        self.skips = skips or SkipIndex()
+        # Merge messages due in the same channel into shared sends
+        self.coalesce = coalesce
+        # Without a cache, configured attachments are not sent
+        self.attachments = attachments
+        self.history = history or DeliveryHistory()
         self.last_sent_dates: Dict[int, date] = {}
         self._task: asyncio.Task = None
-        
+
+        self._slots: Dict[Slot, Set[int]] = {}
+        self._guild_slots: Dict[int, Slot] = {}
+        self._index_ready = False
+        self._ready: Dict[int, StagedMessage] = {}
+        # Guilds the pre-warm could not stage, with the fire time it was for
+        self._rejected: Dict[int, datetime] = {}
+
+        bot.config_manager.add_listener(self._on_configs_changed)
+
     async def start(self):
         """Start the message scheduling task."""
         if self._task and not self._task.done():
             return
-            
+
         logger.info("Starting message scheduler")
         self._task = asyncio.create_task(self._scheduler_loop())
-        
+
     async def stop(self):
         """Stop the message scheduling task."""
         if self._task and not self._task.done():
@@ -40,72 +104,376 @@ class MessageScheduler:
                 await self._task
             except asyncio.CancelledError:
                 pass
-                
+
     async def _scheduler_loop(self):
         """Main scheduler loop that runs continuously."""
         await self.bot.wait_until_ready()
-        
+
+        fire_time = self.clock.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
         while not self.bot.is_closed():
             try:
-                now_utc = datetime.utcnow()
-                await self._check_and_send_messages(now_utc)
+                behind = self.clock.now() - fire_time
+                if behind >= timedelta(minutes=1):
+                    logger.warning(f"Scheduler is {behind.total_seconds():.0f}s behind, catching up {fire_time:%H:%M}")
+
+                # Stage the upcoming minute's messages ahead of the boundary
+                await self._sleep_until(fire_time - timedelta(seconds=self.prewarm_seconds))
+                if self.prewarm_seconds > 0:
+                    await self._prewarm(fire_time)
+
+                await self._sleep_until(fire_time)
+                await self._check_and_send_messages(fire_time)
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
-            
-            # Wait 60 seconds before next check
-            await asyncio.sleep(60)
-            
-    async def _check_and_send_messages(self, current_time: datetime):
-        """Check all guild configurations and send messages if needed."""
+                await self.clock.sleep(1)
+
+            # Step one minute at a time: a minute whose boundary passed while
+            # the previous one was still sending is run late, not skipped
+            fire_time += timedelta(minutes=1)
+
+    async def _sleep_until(self, target: datetime):
+        """Sleep until the given UTC time (returns at once if it has passed)."""
+        delay = (target - self.clock.now()).total_seconds()
+        if delay > 0:
+            await self.clock.sleep(delay)
+
+    def _on_configs_changed(self, changes: Dict[int, Optional[Dict[str, Any]]]):
+        """Keep the schedule index in sync with configuration changes."""
+        for guild_id, config in changes.items():
+            self._index_guild(guild_id, config)
+            self.skips.invalidate_guild(guild_id)
+            if config is None:
+                self.history.forget(guild_id)
+            # Anything staged for this guild was built from the old config
+            self._ready.pop(guild_id, None)
+            self._rejected.pop(guild_id, None)
+
+    def _index_guild(self, guild_id: int, config: Optional[Dict[str, Any]]):
+        """Place a guild in the slot of its scheduled minute, if it is active."""
+        old_slot = self._guild_slots.pop(guild_id, None)
+        if old_slot is not None:
+            guilds = self._slots.get(old_slot)
+            if guilds is not None:
+                guilds.discard(guild_id)
+                if not guilds:
+                    del self._slots[old_slot]
+
+        if not config or not config.get('enabled') or not config.get('channel_id'):
+            return
+
+        scheduled_time = parse_time_string(config.get('time', '07:00'))
+        if not scheduled_time:
+            logger.warning(f"Invalid time format for guild {guild_id}")
+            return
+
+        slot = (scheduled_time.hour, scheduled_time.minute)
+        self._slots.setdefault(slot, set()).add(guild_id)
+        self._guild_slots[guild_id] = slot
+
+    async def _ensure_index(self):
+        """Build the schedule index from all configurations on first use."""
+        if self._index_ready:
+            return
+
         configs = await self.bot.config_manager.get_all_configs()
-        
+        self._slots.clear()
+        self._guild_slots.clear()
         for guild_id, config in configs.items():
+            self._index_guild(guild_id, config)
+        self._index_ready = True
+
+    def _due_guilds(self, current_time: datetime) -> Set[int]:
+        """Get the guilds scheduled for the minute of ``current_time``."""
+        return set(self._slots.get((current_time.hour, current_time.minute), ()))
+
+    async def _prewarm(self, fire_time: datetime):
+        """Resolve channels and render messages for guilds due at ``fire_time``."""
+        try:
+            await self._ensure_index()
+
+            # Drop anything left over from an earlier minute
+            self._ready.clear()
+            self._rejected.clear()
+
+            for guild_id in self._due_guilds(fire_time):
+                config = await self.bot.config_manager.get_config(guild_id)
+                if not self._is_due(guild_id, config, fire_time):
+                    continue
+
+                staged = await self._prepare_message(guild_id, config, fire_time)
+                if staged:
+                    self._ready[guild_id] = staged
+                else:
+                    # Not retried at the boundary, so a dead channel is fetched once a day
+                    self._rejected[guild_id] = fire_time
+
+            if self._ready:
+                logger.debug(f"Pre-warmed {len(self._ready)} messages for {fire_time:%H:%M}")
+        except Exception as e:
+            logger.error(f"Error pre-warming messages for {fire_time:%H:%M}: {e}")
+
+    async def _check_and_send_messages(self, current_time: datetime):
+        """Send the messages of all guilds due at the current minute."""
+        await self._ensure_index()
+
+        batch: List[StagedMessage] = []
+        for guild_id in sorted(self._due_guilds(current_time)):
+            if self._rejected.get(guild_id) == current_time:
+                continue
             try:
-                await self._process_guild_message(guild_id, config, current_time)
+                staged = self._ready.pop(guild_id, None)
+                if not staged or staged.fire_time != current_time:
+                    config = await self.bot.config_manager.get_config(guild_id)
+                    staged = await self._stage_guild_message(guild_id, config, current_time)
+                if staged:
+                    batch.append(staged)
             except Exception as e:
                 logger.error(f"Error processing guild {guild_id}: {e}")
-                
-    async def _process_guild_message(self, guild_id: int, config: dict, current_time: datetime):
-        """Process message sending for a single guild."""
+
+        self._ready.clear()
+        self._rejected.clear()
+        await self._deliver_batch(batch, current_time)
+        await self.history.flush()
+
+    async def _deliver_batch(self, batch: List[StagedMessage], current_time: datetime):
+        """Deliver staged messages, merging those bound for the same channel."""
+        by_channel: Dict[int, List[StagedMessage]] = {}
+        separate: List[List[StagedMessage]] = []
+        for staged in batch:
+            if staged.attachments or not self.coalesce:
+                separate.append([staged])
+            else:
+                by_channel.setdefault(staged.channel.id, []).append(staged)
+
+        # One failing channel must not stop the rest of the burst
+        for channel_batch in [*by_channel.values(), *separate]:
+            try:
+                await self._deliver_channel(channel_batch, current_time)
+            except Exception as e:
+                logger.error(f"Error delivering to channel {channel_batch[0].channel.id}: {e}")
+
+    def _is_due(self, guild_id: int, config: dict, current_time: datetime) -> bool:
+        """Check whether a guild's message should be sent at ``current_time``."""
         # Skip if disabled or missing required fields
         if not config.get('enabled') or not config.get('channel_id'):
-            return
-            
+            return False
+
         # Check if already sent today
         last_sent_date = self.last_sent_dates.get(guild_id)
         if last_sent_date == current_time.date():
-            return
-            
+            return False
+
         # Parse scheduled time
         scheduled_time = parse_time_string(config.get('time', '07:00'))
         if not scheduled_time:
             logger.warning(f"Invalid time format for guild {guild_id}")
-            return
-            
+            return False
+
         # Check if it's time to send
         if not is_time_to_send(scheduled_time, current_time):
-            return
-            
-        # Send the message
-        success = await self._send_message(guild_id, config)
-        if success:
-            self.last_sent_dates[guild_id] = current_time.date()
-            logger.info(f"Daily message sent to guild {guild_id}")
-            
-    async def _send_message(self, guild_id: int, config: dict) -> bool:
-        """Send a message to the configured channel."""
+            return False
+
+        # Skip holidays and other days excluded by the guild's calendars
+        return not self.skips.is_skipped(guild_id, config, current_time.date())
+
+    def next_send_time(self, guild_id: int, config: dict, now: datetime) -> Optional[datetime]:
+        """
+        Get the next time a guild's message will be sent, skipped days excluded.
+
+        Args:
+            guild_id: Guild to look up
+            config: The guild's configuration
+            now: Current UTC time
+
+        Returns:
+            The UTC send time, or None if the guild is disabled or every day
+            in the coming year is skipped
+        """
+        if not config.get('enabled') or not config.get('channel_id'):
+            return None
+
+        scheduled_time = parse_time_string(config.get('time', '07:00'))
+        if not scheduled_time:
+            return None
+
+        start = now.date()
+        if self.last_sent_dates.get(guild_id) == start or now.time() >= scheduled_time:
+            start += timedelta(days=1)
+
+        day = self.skips.next_send_date(guild_id, config, start)
+        return datetime.combine(day, scheduled_time) if day else None
+
+    async def _stage_guild_message(
+        self, guild_id: int, config: dict, current_time: datetime
+    ) -> Optional[StagedMessage]:
+        """Prepare a guild's message if it is due at ``current_time``."""
+        if not self._is_due(guild_id, config, current_time):
+            return None
+        return await self._prepare_message(guild_id, config, current_time)
+
+    async def _process_guild_message(self, guild_id: int, config: dict, current_time: datetime):
+        """Process message sending for a single guild."""
+        staged = await self._stage_guild_message(guild_id, config, current_time)
+        if staged:
+            await self._deliver_channel([staged], current_time)
+
+    async def _deliver_channel(self, batch: List[StagedMessage], current_time: datetime):
+        """
+        Send the staged messages of one channel and record each guild's delivery.
+
+        The messages are packed into as few sends as Discord's length limit
+        allows. After a failed send the rest are abandoned, since the channel
+        is likely unusable, and every guild not yet delivered is failed.
+        """
+        channel = batch[0].channel
+        delivered: Dict[int, datetime] = {}
+        failed: Dict[int, str] = {}
+        error: Optional[str] = None
+        packed = pack_messages([staged.content for staged in batch])
+        for number, (content, members) in enumerate(packed, 1):
+            guild_ids = [batch[i].guild_id for i in members]
+            if error:
+                failed.update(dict.fromkeys(guild_ids, error))
+                continue
+
+            # Attachments go with the last piece of their message
+            attachments = batch[-1].attachments if number == len(packed) else ()
+            error = await self._send_message(
+                StagedMessage(guild_ids[0], channel, content, current_time, attachments)
+            )
+            if error:
+                failed.update(dict.fromkeys(guild_ids, error))
+            else:
+                sent_at = self.clock.now()
+                delivered.update((guild_id, sent_at) for guild_id in guild_ids)
+
+        if set(delivered).difference(failed):
+            self.health.record_success(channel.id)
+        for staged in batch:
+            if staged.guild_id in failed:
+                await self._record_failure(staged.guild_id, channel.id, failed[staged.guild_id], staged.fire_time)
+            else:
+                self.history.record(staged.guild_id, staged.fire_time, delivered[staged.guild_id], True)
+                self.last_sent_dates[staged.guild_id] = current_time.date()
+                logger.info(f"Daily message sent to guild {staged.guild_id}")
+
+        if len(batch) > 1:
+            logger.debug(f"Coalesced {len(batch)} messages for channel {channel.id}")
+
+    async def _resolve_channel(self, channel_id: int):
+        """Get a channel from the cache, falling back to a REST fetch."""
+        channel = self.bot.get_channel(channel_id)
+        if channel:
+            return channel
+
+        try:
+            return await self.bot.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+
+    def _render_message(self, guild_id: int, config: dict, channel, current_time: datetime) -> str:
+        """Render a guild's message template for the given send time."""
+        template = self.bot.templates.get(guild_id, config['message'])
+        # Static messages need no placeholder context
+        if not template.fields:
+            return template.render({})
+
+        guild = getattr(channel, 'guild', None)
+        guild_name = getattr(guild, 'name', None) or ''
+        context = build_context(current_time, guild_name, config.get('start_date'))
+        return template.render(context)
+
+    async def _prepare_message(
+        self, guild_id: int, config: dict, current_time: datetime
+    ) -> Optional[StagedMessage]:
+        """Resolve the target channel and render the message for a guild."""
+        channel_id = config['channel_id']
         try:
-            channel = self.bot.get_channel(config['channel_id'])
+            if not self.health.allow(channel_id, current_time):
+                # Nothing was attempted, so the skip does not count towards auto-disabling
+                logger.info(f"Skipping guild {guild_id}: circuit open for channel {channel_id}")
+                self.history.record(guild_id, current_time, self.clock.now(), False)
+                return None
+
+            channel = await self._resolve_channel(channel_id)
             if not channel:
-                logger.error(f"Channel {config['channel_id']} not found for guild {guild_id}")
-                return False
-                
-            await channel.send(config['message'])
-            return True
-            
+                logger.error(f"Channel {channel_id} not found for guild {guild_id}")
+                await self._record_failure(guild_id, channel_id, 'channel not found', current_time)
+                return None
+
+            # Checked against cached permissions, so no request is wasted
+            if not self.health.can_send(channel):
+                logger.error(f"No permission to send message in channel {channel_id} for guild {guild_id}")
+                await self._record_failure(
+                    guild_id, channel_id, 'missing permission to send messages', current_time
+                )
+                return None
+
+            content = self._render_message(guild_id, config, channel, current_time)
+            attachments = tuple(config.get('attachments') or ()) if self.attachments else ()
+            return StagedMessage(guild_id, channel, content, current_time, attachments)
+
+        except Exception as e:
+            logger.error(f"Failed to prepare message for guild {guild_id}: {e}")
+            return None
+
+    async def _send_message(self, staged: StagedMessage) -> Optional[str]:
+        """
+        Send a prepared message to its channel.
+
+        Returns:
+            None on success, otherwise a short description of the failure
+        """
+        try:
+            if staged.attachments and self.attachments:
+                await self.attachments.send(
+                    staged.channel, staged.content, staged.attachments, staged.fire_time
+                )
+            else:
+                await staged.channel.send(staged.content)
+            return None
+
         except discord.Forbidden:
-            logger.error(f"No permission to send message in channel {config['channel_id']} for guild {guild_id}")
-            return False
+            logger.error(f"No permission to send message in channel {staged.channel.id} for guild {staged.guild_id}")
+            self.health.mark_forbidden(staged.channel.id)
+            error = 'missing permission to send messages'
+        except discord.NotFound:
+            logger.error(f"Channel {staged.channel.id} not found for guild {staged.guild_id}")
+            error = 'channel not found'
         except Exception as e:
-            logger.error(f"Failed to send message to guild {guild_id}: {e}")
-            return False
+            logger.error(f"Failed to send message to guild {staged.guild_id}: {e}")
+            error = str(e) or type(e).__name__
+
+        return error
+
+    async def _record_failure(self, guild_id: int, channel_id: int, error: str, fire_time: datetime):
+        """Count a failed delivery and disable the guild once the threshold is reached."""
+        self.history.record(guild_id, fire_time, self.clock.now(), False)
+        failures = self.health.record_failure(channel_id, error, fire_time)
+        if self.disable_threshold and failures >= self.disable_threshold:
+            await self._auto_disable(guild_id, channel_id, failures, error)
+
+    async def _auto_disable(self, guild_id: int, channel_id: int, failures: int, error: str):
+        """Disable a guild's daily message and tell its owner why."""
+        logger.warning(
+            f"Disabling daily messages for guild {guild_id} after {failures} "
+            f"failed deliveries to channel {channel_id}: {error}"
+        )
+        # The channel's state is left alone: other guilds may share it
+        await self.bot.config_manager.update_config(guild_id, {'enabled': False})
+
+        guild = self.bot.get_guild(guild_id)
+        if guild is None or guild.owner_id is None:
+            return
+
+        try:
+            owner = guild.owner or await self.bot.fetch_user(guild.owner_id)
+            await owner.send(
+                f"⚠️ Daily messages in **{guild.name}** have been disabled: the last "
+                f"{failures} messages could not be delivered to <#{channel_id}> "
+                f"({error}).\n"
+                f"Check the channel and the bot's permissions, then re-enable them "
+                f"with `/toggledaily true`."
+            )
+        except Exception as e:
+            logger.warning(f"Could not notify the owner of guild {guild_id}: {e}")
@@ -0,0 +1,330 @@
+"""Content-addressed attachment files and a cache of their uploaded URLs."""
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import aiofiles
+import discord
+
+from bot.utils.message_packing import MESSAGE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Discord's upload limit for bots without boosts
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+# Files Discord accepts in one message
+MAX_ATTACHMENTS = 10
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class AttachmentError(ValueError):
+    """Raised for a file that cannot be stored."""
+
+
+def is_digest(value: Any) -> bool:
+    """Check whether a value looks like an attachment digest."""
+    return isinstance(value, str) and bool(_DIGEST.match(value))
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """An attachment file on disk."""
+
+    digest: str
+    path: Path
+    filename: str
+    content_type: str
+    size: int
+
+    @property
+    def is_image(self) -> bool:
+        return self.content_type.startswith("image/")
+
+
+class AttachmentStore:
+    """
+    Attachment files stored once on disk, named by the SHA-256 of their bytes.
+
+    Each file ``<digest>`` has a ``<digest>.json`` sidecar with its original
+    file name and content type. The same file added by many guilds is kept
+    once. File metadata is cached in memory after the first lookup, so
+    sends do not touch the disk until the upload itself.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._files: Dict[str, StoredFile] = {}
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest
+
+    async def add(
+        self, chunks: AsyncIterable[bytes], filename: str, content_type: Optional[str] = None
+    ) -> StoredFile:
+        """
+        Store a file from a stream of chunks, hashing it as it is written.
+
+        Args:
+            chunks: The file's bytes, e.g. an HTTP response body
+            filename: Name shown when the file is uploaded
+            content_type: MIME type; guessed from the name if omitted
+
+        Raises:
+            AttachmentError: If the file is larger than ``max_bytes``
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp_name, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise AttachmentError(
+                            f"file is larger than {self.max_bytes // (1024 * 1024)} MB"
+                        )
+                    hasher.update(chunk)
+                    await f.write(chunk)
+
+            digest = hasher.hexdigest()
+            os.replace(temp_name, self._path(digest))
+        finally:
+            Path(temp_name).unlink(missing_ok=True)
+
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        meta = {"filename": filename, "content_type": content_type}
+        async with aiofiles.open(self._path(digest).with_suffix(".json"), "w", encoding="utf-8") as f:
+            await f.write(json.dumps(meta))
+        stored = StoredFile(digest, self._path(digest), filename, content_type, size)
+        self._files[digest] = stored
+        return stored
+
+    def get(self, digest: str) -> Optional[StoredFile]:
+        """Look up a stored file, or None if it is missing."""
+        stored = self._files.get(digest)
+        if stored is not None:
+            return stored
+
+        path = self._path(digest)
+        try:
+            size = path.stat().st_size
+            meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        stored = StoredFile(digest, path, meta["filename"], meta["content_type"], size)
+        self._files[digest] = stored
+        return stored
+
+    def invalidate(self, digest: str):
+        """Drop a file's cached metadata, so the next lookup reads the disk."""
+        self._files.pop(digest, None)
+
+    def remove(self, digest: str):
+        """Delete a stored file."""
+        self._files.pop(digest, None)
+        path = self._path(digest)
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+# Whose configuration references files: ("config" or "archive", guild ID)
+Holder = Tuple[str, int]
+
+
+def _config_digests(config: Optional[Mapping[str, Any]]) -> FrozenSet[str]:
+    return frozenset(
+        digest for digest in (config or {}).get("attachments") or () if is_digest(digest)
+    )
+
+
+class AttachmentReferences:
+    """
+    Deletes stored files once no guild configuration references them.
+
+    Register :meth:`on_configs_changed` as a ``ConfigManager`` listener
+    before the configurations load: it counts the guilds referencing each
+    file, so a file is deleted however its last reference goes (a command,
+    an import, reconciliation, leaving a guild or an external edit).
+
+    Archived configurations count as references too (see
+    :meth:`on_archived`), so a guild restored from the archive gets its
+    files back.
+    """
+
+    def __init__(self, store: AttachmentStore, cache: Optional["AttachmentCache"] = None):
+        self.store = store
+        self.cache = cache
+        self._holder_digests: Dict[Holder, FrozenSet[str]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def count(self, digest: str) -> int:
+        """Number of live or archived configurations referencing a file."""
+        return self._counts.get(digest, 0)
+
+    def on_configs_changed(self, changes: Mapping[int, Optional[Dict[str, Any]]]):
+        """Update the counts from changed (or deleted, as None) configs."""
+        self._update(
+            (("config", guild_id), _config_digests(config)) for guild_id, config in changes.items()
+        )
+
+    def on_archived(self, configs: Mapping[int, Mapping[str, Any]]):
+        """
+        Update the counts from archived configs.
+
+        Register it as a ``ConfigArchive`` listener, and call it with the
+        archive's existing configurations at startup. The latest archived
+        configuration of a guild replaces its earlier ones.
+        """
+        self._update(
+            (("archive", guild_id), _config_digests(config)) for guild_id, config in configs.items()
+        )
+
+    def _update(self, changes: Iterable[Tuple[Holder, FrozenSet[str]]]):
+        released = set()
+        for holder, digests in changes:
+            previous = self._holder_digests.pop(holder, frozenset())
+            if digests:
+                self._holder_digests[holder] = digests
+
+            for digest in digests - previous:
+                self._counts[digest] = self._counts.get(digest, 0) + 1
+            for digest in previous - digests:
+                self._counts[digest] -= 1
+                if not self._counts[digest]:
+                    del self._counts[digest]
+                    released.add(digest)
+
+        # A file dropped by one guild may be picked up by another in the same change set
+        for digest in released - self._counts.keys():
+            self.store.remove(digest)
+            if self.cache:
+                self.cache.invalidate(digest)
+            logger.info(f"Deleted attachment {digest}, no longer referenced")
+
+
+def url_expiry(url: str) -> Optional[datetime]:
+    """Read the expiry (the hex ``ex`` parameter) of a signed Discord CDN URL."""
+    try:
+        expires = parse_qs(urlparse(url).query)["ex"][0]
+        return datetime.utcfromtimestamp(int(expires, 16))
+    except (KeyError, IndexError, ValueError, OverflowError):
+        return None
+
+
+class AttachmentCache:
+    """
+    Sends stored attachments, uploading each file once and reusing its URL.
+
+    The first send of a file uploads it; the CDN URL Discord returns is then
+    reused by later sends (as an embedded image, or a link for other files)
+    until it expires, when the file is uploaded again. A send that fails
+    drops the URLs it used, so the next one uploads afresh.
+    """
+
+    def __init__(self, store: AttachmentStore, ttl: timedelta = timedelta(hours=20)):
+        """
+        Args:
+            store: Where the files are kept
+            ttl: How long a URL without a signed expiry is reused
+        """
+        self.store = store
+        self.ttl = ttl
+        # Re-upload this long before a signed URL expires
+        self.margin = timedelta(hours=1)
+        self._urls: Dict[str, Tuple[str, datetime]] = {}
+
+    def url(self, digest: str, now: datetime) -> Optional[str]:
+        """Get a file's cached URL, if it has not expired."""
+        entry = self._urls.get(digest)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._urls[digest]
+            return None
+        return entry[0]
+
+    def remember(self, digest: str, url: str, now: datetime):
+        """Cache the URL a file was uploaded to."""
+        expires = url_expiry(url)
+        expires = expires - self.margin if expires else now + self.ttl
+        self._urls[digest] = (url, expires)
+
+    def invalidate(self, digest: str):
+        """Forget a file's URL."""
+        self._urls.pop(digest, None)
+
+    def _build(
+        self, content: str, digests: Sequence[str], now: datetime
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Build send arguments; returns them with the digests being uploaded."""
+        files: List[discord.File] = []
+        embeds: List[discord.Embed] = []
+        links: List[str] = []
+        uploading: List[str] = []
+        # Characters left for links, each on its own line
+        room = MESSAGE_LIMIT - len(content)
+
+        for digest in digests[:MAX_ATTACHMENTS]:
+            stored = self.store.get(digest)
+            if stored is None:
+                logger.warning(f"Attachment {digest} is missing from the store")
+                continue
+
+            url = self.url(digest, now)
+            if url is not None and stored.is_image:
+                embeds.append(discord.Embed().set_image(url=url))
+            elif url is not None and len(url) + 1 <= room:
+                links.append(url)
+                room -= len(url) + 1
+            else:
+                # A link that would not fit in the message is uploaded again;
+                # discord.File streams the file from disk during the upload
+                files.append(discord.File(stored.path, filename=stored.filename))
+                uploading.append(digest)
+
+        kwargs: Dict[str, Any] = {"content": "\n".join([content, *links]) if links else content}
+        if files:
+            kwargs["files"] = files
+        if embeds:
+            kwargs["embeds"] = embeds
+        return kwargs, uploading
+
+    async def send(self, channel: Any, content: str, digests: Sequence[str], now: datetime):
+        """
+        Send a message with stored attachments.
+
+        Raises:
+            Whatever ``channel.send`` raises, after dropping the URLs used
+        """
+        kwargs, uploading = self._build(content, digests, now)
+        try:
+            message = await channel.send(**kwargs)
+        except Exception:
+            for digest in digests:
+                self.invalidate(digest)
+                # The file may have changed or gone from disk
+                self.store.invalidate(digest)
+            raise
+        finally:
+            for file in kwargs.get("files", ()):
+                file.close()
+
+        # Uploaded attachments come back in the order they were sent
+        uploaded = getattr(message, "attachments", None) or []
+        for index, attachment in enumerate(uploaded[:len(uploading)]):
+            self.remember(uploading[index], attachment.url, now)
+        return message
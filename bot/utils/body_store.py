@@ -0,0 +1,142 @@
+"""Content-addressed store for message bodies shared between guilds."""
+import base64
+import hashlib
+import logging
+import zlib
+from typing import Any, Dict, ItemsView, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Persisted body: plain text, or {"zlib": <base64>} for compressed bodies
+StoredBody = Union[str, Dict[str, str]]
+
+
+def body_digest(text: str) -> str:
+    """
+    Compute the content address of a message body.
+
+    Args:
+        text: Message body
+
+    Returns:
+        Hex digest identifying the body
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class BodyStore:
+    """
+    Deduplicates message bodies by content and tracks how many guild
+    configurations reference each one.
+
+    Every guild using the same text shares a single string object in memory
+    and a single entry on disk. Bodies are dropped once their reference count
+    reaches zero.
+    """
+
+    def __init__(self, compress_threshold: Optional[int] = 1024):
+        """
+        Args:
+            compress_threshold: Bodies of at least this many bytes are stored
+                zlib-compressed on disk; ``None`` disables compression
+        """
+        self.compress_threshold = compress_threshold
+        self._bodies: Dict[str, str] = {}
+        self._digests: Dict[str, str] = {}
+        self._refs: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def acquire(self, text: str) -> str:
+        """
+        Add a reference to a body.
+
+        Returns:
+            The canonical string object for ``text``, to be stored in place
+            of the caller's copy
+        """
+        digest = self._digests.get(text)
+        if digest is None:
+            digest = body_digest(text)
+            self._bodies[digest] = text
+            self._digests[text] = digest
+            self._refs[digest] = 0
+
+        self._refs[digest] += 1
+        return self._bodies[digest]
+
+    def release(self, text: str):
+        """Drop a reference to a body, removing it when unreferenced."""
+        digest = self._digests.get(text)
+        if digest is None:
+            return
+
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            del self._digests[text]
+            del self._bodies[digest]
+
+    def digest(self, text: str) -> str:
+        """Get the content address of a stored body."""
+        return self._digests[text]
+
+    def references(self, text: str) -> int:
+        """Get the number of references to a body."""
+        digest = self._digests.get(text)
+        return self._refs.get(digest, 0) if digest else 0
+
+    def get(self, digest: str) -> Optional[str]:
+        """Get a body by its content address."""
+        return self._bodies.get(digest)
+
+    def clear(self):
+        """Remove all bodies."""
+        self._bodies.clear()
+        self._digests.clear()
+        self._refs.clear()
+
+    def items(self) -> ItemsView[str, str]:
+        """Get (digest, body) pairs for all referenced bodies."""
+        return self._bodies.items()
+
+    def encode_bytes(self, text: str) -> Tuple[bytes, bool]:
+        """
+        Encode a body as bytes, compressing it if worthwhile.
+
+        Returns:
+            The encoded bytes and whether they are zlib-compressed
+        """
+        raw = text.encode("utf-8")
+        if self.compress_threshold is None or len(raw) < self.compress_threshold:
+            return raw, False
+
+        packed = zlib.compress(raw, 9)
+        if len(packed) >= len(raw):
+            return raw, False
+        return packed, True
+
+    def encode_body(self, text: str) -> StoredBody:
+        """Encode a body for JSON persistence, compressing it if worthwhile."""
+        data, compressed = self.encode_bytes(text)
+        if not compressed:
+            return text
+
+        packed = base64.b64encode(data).decode("ascii")
+        if len(packed) >= len(text.encode("utf-8")):
+            return text
+        return {"zlib": packed}
+
+    @staticmethod
+    def decode_body(stored: Any) -> str:
+        """Decode a persisted body."""
+        if isinstance(stored, dict):
+            return zlib.decompress(base64.b64decode(stored["zlib"])).decode("utf-8")
+        return str(stored)
+
+    def dump(self) -> Dict[str, StoredBody]:
+        """Get all referenced bodies keyed by digest, encoded for persistence."""
+        return {
+            digest: self.encode_body(text) for digest, text in self._bodies.items()
+        }
@@ -0,0 +1,306 @@
+"""Skip-date calendars compiled into yearly bitsets."""
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Bytes in a yearly bitset: one bit per day of a leap year
+BITSET_SIZE = (366 + 7) // 8
+
+# Called with the name of a calendar that was defined or removed
+CalendarListener = Callable[[str], None]
+
+
+class CalendarError(ValueError):
+    """Raised for an invalid calendar definition or date."""
+
+
+def parse_date(text: str) -> date:
+    """Parse an ISO date (YYYY-MM-DD)."""
+    try:
+        return date.fromisoformat(text.strip())
+    except ValueError:
+        raise CalendarError(f"invalid date '{text.strip()}', use YYYY-MM-DD") from None
+
+
+def parse_weekdays(text: str) -> FrozenSet[int]:
+    """Parse comma-separated weekday names (``sat,sun``) into 0=Monday numbers."""
+    weekdays = set()
+    for part in filter(None, (p.strip().lower()[:3] for p in text.split(","))):
+        if part not in WEEKDAY_NAMES:
+            raise CalendarError(f"unknown weekday '{part}'")
+        weekdays.add(WEEKDAY_NAMES.index(part))
+    return frozenset(weekdays)
+
+
+def parse_dates(text: str) -> Tuple[FrozenSet[date], FrozenSet[Tuple[int, int]]]:
+    """
+    Parse comma-separated dates: YYYY-MM-DD for one day, MM-DD for every year.
+
+    Returns:
+        The one-off dates and the yearly (month, day) pairs
+    """
+    dates, annual = set(), set()
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        if len(part) == 5 and part[2] == "-":
+            try:
+                month, day = int(part[:2]), int(part[3:])
+                # 2000 is a leap year, so 02-29 is accepted
+                date(2000, month, day)
+            except ValueError:
+                raise CalendarError(f"invalid yearly date '{part}', use MM-DD") from None
+            annual.add((month, day))
+        else:
+            dates.add(parse_date(part))
+    return frozenset(dates), frozenset(annual)
+
+
+def _set_bit(bits: bytearray, day: date):
+    index = day.timetuple().tm_yday - 1
+    bits[index >> 3] |= 1 << (index & 7)
+
+
+def _clear_bit(bits: bytearray, day: date):
+    index = day.timetuple().tm_yday - 1
+    bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+def bit_is_set(bits: bytes, day: date) -> bool:
+    """Check a day's bit in its year's bitset."""
+    index = day.timetuple().tm_yday - 1
+    return bool(bits[index >> 3] >> (index & 7) & 1)
+
+
+@dataclass(frozen=True)
+class Calendar:
+    """A named set of days on which daily messages are skipped."""
+
+    name: str
+    weekdays: FrozenSet[int] = frozenset()
+    dates: FrozenSet[date] = frozenset()
+    annual: FrozenSet[Tuple[int, int]] = frozenset()
+
+    def compile(self, year: int) -> bytes:
+        """Build the bitset of skipped days in ``year``."""
+        bits = bytearray(BITSET_SIZE)
+        if self.weekdays:
+            day = date(year, 1, 1)
+            while day.year == year:
+                if day.weekday() in self.weekdays:
+                    _set_bit(bits, day)
+                day += timedelta(days=1)
+        for day in self.dates:
+            if day.year == year:
+                _set_bit(bits, day)
+        for month, day_of_month in self.annual:
+            try:
+                _set_bit(bits, date(year, month, day_of_month))
+            except ValueError:  # Feb 29 outside leap years
+                pass
+        return bytes(bits)
+
+    def describe(self) -> str:
+        """Summarize the calendar's rules for display."""
+        parts = []
+        if self.weekdays:
+            parts.append("every " + ", ".join(WEEKDAY_NAMES[d] for d in sorted(self.weekdays)))
+        if self.annual:
+            parts.append("yearly " + ", ".join(f"{m:02d}-{d:02d}" for m, d in sorted(self.annual)))
+        if self.dates:
+            parts.append(", ".join(d.isoformat() for d in sorted(self.dates)))
+        return "; ".join(parts) or "no dates"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "weekdays": sorted(self.weekdays),
+            "dates": sorted(d.isoformat() for d in self.dates),
+            "annual": sorted(f"{m:02d}-{d:02d}" for m, d in self.annual),
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "Calendar":
+        dates, annual = parse_dates(",".join(data.get("dates", []) + data.get("annual", [])))
+        return cls(name, frozenset(data.get("weekdays", [])), dates, annual)
+
+
+class CalendarStore:
+    """Shared named calendars, persisted to a JSON file."""
+
+    FILE_VERSION = 1
+
+    def __init__(self, file_path: Optional[str] = None):
+        """
+        Args:
+            file_path: Backing file; ``None`` keeps calendars in memory only
+        """
+        self.file_path = Path(file_path) if file_path else None
+        self._calendars: Dict[str, Calendar] = {}
+        self._listeners: List[CalendarListener] = []
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        """Load calendars from the backing file, if it exists."""
+        if self.file_path is None or not self.file_path.exists():
+            return
+        try:
+            async with aiofiles.open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.loads(await f.read())
+            self._calendars = {
+                name: Calendar.from_dict(name, entry)
+                for name, entry in data.get("calendars", {}).items()
+            }
+            logger.info(f"Loaded {len(self._calendars)} skip calendars")
+        except Exception as e:
+            logger.error(f"Failed to load skip calendars: {e}")
+        for name in self._calendars:
+            self._notify(name)
+
+    async def _save(self):
+        if self.file_path is None:
+            return
+        data = {
+            "version": self.FILE_VERSION,
+            "calendars": {name: cal.to_dict() for name, cal in sorted(self._calendars.items())},
+        }
+        async with self._lock:
+            try:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+                async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
+                    await f.write(json.dumps(data, indent=4))
+                os.replace(temp_path, self.file_path)
+            except Exception as e:
+                logger.error(f"Failed to save skip calendars: {e}")
+
+    def get(self, name: str) -> Optional[Calendar]:
+        """Get a calendar by name."""
+        return self._calendars.get(name)
+
+    def names(self) -> List[str]:
+        """Get the names of all calendars."""
+        return sorted(self._calendars)
+
+    async def define(self, calendar: Calendar):
+        """Create or replace a calendar."""
+        self._calendars[calendar.name] = calendar
+        self._notify(calendar.name)
+        await self._save()
+
+    async def remove(self, name: str) -> bool:
+        """Delete a calendar; guilds subscribed to it stop skipping its days."""
+        if self._calendars.pop(name, None) is None:
+            return False
+        self._notify(name)
+        await self._save()
+        return True
+
+    def add_listener(self, listener: CalendarListener):
+        """Register a callback invoked with the name of each changed calendar."""
+        self._listeners.append(listener)
+
+    def _notify(self, name: str):
+        for listener in self._listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.error(f"Calendar listener failed: {e}")
+
+
+def _guild_dates(config: Dict[str, Any], key: str) -> Iterable[date]:
+    for text in config.get(key) or ():
+        try:
+            yield date.fromisoformat(text)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid {key} entry {text!r}")
+
+
+class SkipIndex:
+    """
+    Answers "is this guild's message skipped on this day?" with a bit test.
+
+    A guild's subscribed calendars and its own ``skip_dates`` and
+    ``send_dates`` overrides are compiled into one bitset per year, cached
+    until the guild's configuration or one of the calendars changes.
+    """
+
+    def __init__(self, store: Optional[CalendarStore] = None):
+        self.store = store or CalendarStore()
+        # Bitsets by calendar name or guild ID, then by year, so one
+        # calendar's or guild's entries are dropped with a single pop
+        self._calendar_bits: Dict[str, Dict[int, bytes]] = {}
+        self._guild_bits: Dict[int, Dict[int, bytes]] = {}
+        self.store.add_listener(self._on_calendar_changed)
+
+    def _on_calendar_changed(self, name: str):
+        self._calendar_bits.pop(name, None)
+        # Calendars change rarely; recompiling every guild lazily is cheap
+        self._guild_bits.clear()
+
+    def invalidate_guild(self, guild_id: int):
+        """Drop a guild's compiled bitsets after its configuration changed."""
+        self._guild_bits.pop(guild_id, None)
+
+    def _calendar_year(self, name: str, year: int) -> Optional[bytes]:
+        years = self._calendar_bits.get(name)
+        bits = years.get(year) if years else None
+        if bits is None:
+            calendar = self.store.get(name)
+            if calendar is None:
+                return None
+            bits = calendar.compile(year)
+            self._calendar_bits.setdefault(name, {})[year] = bits
+        return bits
+
+    def compile_guild(self, config: Dict[str, Any], year: int) -> bytes:
+        """Build a guild's bitset of skipped days in ``year``."""
+        bits = bytearray(BITSET_SIZE)
+        for name in config.get("calendars") or ():
+            calendar_bits = self._calendar_year(name, year)
+            if calendar_bits is not None:
+                for i, byte in enumerate(calendar_bits):
+                    bits[i] |= byte
+        for day in _guild_dates(config, "skip_dates"):
+            if day.year == year:
+                _set_bit(bits, day)
+        for day in _guild_dates(config, "send_dates"):
+            if day.year == year:
+                _clear_bit(bits, day)
+        return bytes(bits)
+
+    def is_skipped(self, guild_id: int, config: Dict[str, Any], day: date) -> bool:
+        """Check whether a guild's message is skipped on ``day``."""
+        if not config.get("calendars") and not config.get("skip_dates"):
+            return False
+
+        years = self._guild_bits.get(guild_id)
+        bits = years.get(day.year) if years else None
+        if bits is None:
+            bits = self.compile_guild(config, day.year)
+            self._guild_bits.setdefault(guild_id, {})[day.year] = bits
+        return bit_is_set(bits, day)
+
+    def next_send_date(
+        self, guild_id: int, config: Dict[str, Any], start: date, horizon_days: int = 366
+    ) -> Optional[date]:
+        """
+        Find the first day from ``start`` that is not skipped.
+
+        Returns:
+            The date, or None if every day within the horizon is skipped
+        """
+        day = start
+        for _ in range(horizon_days):
+            if not self.is_skipped(guild_id, config, day):
+                return day
+            day += timedelta(days=1)
+        return None
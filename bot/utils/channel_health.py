@@ -0,0 +1,147 @@
+"""Per-channel delivery health: cached send permissions and a circuit breaker."""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChannelState:
+    """Delivery history of one channel."""
+
+    failures: int = 0
+    last_failure: Optional[datetime] = None
+    last_error: str = ""
+    circuit_open: bool = False
+
+
+class ChannelHealth:
+    """
+    Tracks whether the bot can deliver to each channel.
+
+    Send permissions are computed from the gateway cache once and kept until a
+    permission-related gateway event invalidates them, so a channel the bot
+    cannot post in is skipped without an API call. Consecutive failed
+    deliveries open the channel's circuit, which skips further attempts until
+    a gateway event suggests the problem may be fixed. An open circuit lets
+    one delivery through as a probe once ``cooldown`` has passed since the
+    last failure, so a channel that recovers by itself is noticed.
+    """
+
+    def __init__(self, circuit_threshold: int = 3, cooldown: timedelta = timedelta(days=1)):
+        """
+        Args:
+            circuit_threshold: Consecutive failures that open a channel's
+                circuit; ``0`` never opens it
+            cooldown: Time after the last failure before an open circuit
+                allows a probe
+        """
+        self.circuit_threshold = circuit_threshold
+        self.cooldown = cooldown
+        self._states: Dict[int, ChannelState] = {}
+        self._can_send: Dict[int, bool] = {}
+        self._channel_guilds: Dict[int, int] = {}
+
+    def state(self, channel_id: int) -> ChannelState:
+        """Get the delivery state of a channel."""
+        return self._states.get(channel_id) or ChannelState()
+
+    def allow(self, channel_id: int, now: datetime) -> bool:
+        """Check whether a delivery to the channel should be attempted at ``now``."""
+        state = self._states.get(channel_id)
+        if state is None or not state.circuit_open:
+            return True
+        # Half-open: a probe that fails again restarts the cooldown
+        return state.last_failure is None or now - state.last_failure >= self.cooldown
+
+    def can_send(self, channel: Any) -> bool:
+        """
+        Check the bot's permission to post in a channel, using the cache.
+
+        Channels outside a guild, or whose guild member is not cached, are
+        assumed sendable.
+        """
+        cached = self._can_send.get(channel.id)
+        if cached is not None:
+            return cached
+
+        guild = getattr(channel, "guild", None)
+        me = getattr(guild, "me", None)
+        if guild is None or me is None:
+            return True
+
+        permissions = channel.permissions_for(me)
+        if isinstance(channel, discord.Thread):
+            allowed = permissions.send_messages_in_threads
+        else:
+            allowed = permissions.send_messages
+        allowed = bool(permissions.view_channel and allowed)
+
+        self._can_send[channel.id] = allowed
+        self._channel_guilds[channel.id] = guild.id
+        return allowed
+
+    def mark_forbidden(self, channel_id: int):
+        """Remember that Discord rejected a send for missing permissions."""
+        self._can_send[channel_id] = False
+
+    def record_success(self, channel_id: int):
+        """Reset a channel's failures and close its circuit."""
+        self._states.pop(channel_id, None)
+
+    def record_failure(self, channel_id: int, error: str, fire_time: datetime) -> int:
+        """
+        Record a failed delivery.
+
+        A channel fails at most once per fire time, however many stages of
+        that delivery failed.
+
+        Args:
+            channel_id: Target channel
+            error: Short description of the failure
+            fire_time: The scheduled minute the delivery was for
+
+        Returns:
+            The number of consecutive failures
+        """
+        state = self._states.setdefault(channel_id, ChannelState())
+        if state.last_failure == fire_time:
+            return state.failures
+
+        state.failures += 1
+        state.last_failure = fire_time
+        state.last_error = error
+        if self.circuit_threshold and state.failures >= self.circuit_threshold:
+            if not state.circuit_open:
+                logger.warning(
+                    f"Opening circuit for channel {channel_id} after "
+                    f"{state.failures} failures: {error}"
+                )
+            state.circuit_open = True
+        return state.failures
+
+    def invalidate_channel(self, channel_id: int):
+        """
+        Drop a channel's cached permissions and let the next delivery probe it.
+
+        Failures are kept, so a probe that fails again re-opens the circuit.
+        """
+        self._can_send.pop(channel_id, None)
+        self._channel_guilds.pop(channel_id, None)
+        state = self._states.get(channel_id)
+        if state is not None:
+            state.circuit_open = False
+
+    def invalidate_guild(self, guild_id: int):
+        """Invalidate every known channel of a guild (e.g. after a role change)."""
+        channel_ids = [
+            channel_id
+            for channel_id, channel_guild in self._channel_guilds.items()
+            if channel_guild == guild_id
+        ]
+        for channel_id in channel_ids:
+            self.invalidate_channel(channel_id)
@@ -0,0 +1,83 @@
+"""Clock abstraction so scheduling can run in real or virtual time."""
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+
+class Clock:
+    """
+    Wall clock backed by ``datetime.utcnow()`` and ``asyncio.sleep()``.
+    """
+
+    def now(self) -> datetime:
+        """Get the current (naive) UTC time."""
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float):
+        """Sleep for the given number of seconds."""
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Manually driven clock for simulations and tests.
+
+    Time only moves when :meth:`advance` or :meth:`run_until` is called, and
+    sleepers are woken in wake-time order as it passes their deadline, so
+    hours of scheduling can be replayed in milliseconds.
+    """
+
+    def __init__(self, start: datetime, settle_rounds: int = 5):
+        """
+        Args:
+            start: Initial virtual time
+            settle_rounds: Event loop iterations given to woken tasks before
+                time moves on
+        """
+        self._now = start
+        self.settle_rounds = settle_rounds
+        self._sleepers: List[Tuple[datetime, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        wake_time = self._now + timedelta(seconds=seconds)
+        heapq.heappush(self._sleepers, (wake_time, next(self._sequence), future))
+        await future
+
+    async def _settle(self):
+        """Let runnable tasks proceed until they block again."""
+        for _ in range(self.settle_rounds):
+            await asyncio.sleep(0)
+
+    async def run_until(self, end: datetime):
+        """
+        Advance virtual time to ``end``, waking sleepers along the way.
+
+        Args:
+            end: Virtual time to stop at
+        """
+        await self._settle()
+        while self._sleepers and self._sleepers[0][0] <= end:
+            wake_time, _, future = heapq.heappop(self._sleepers)
+            if future.done():
+                continue
+
+            self._now = max(self._now, wake_time)
+            future.set_result(None)
+            await self._settle()
+
+        self._now = max(self._now, end)
+
+    async def advance(self, seconds: float):
+        """Advance virtual time by the given number of seconds."""
+        await self.run_until(self._now + timedelta(seconds=seconds))
@@ -0,0 +1,154 @@
+"""Archive of configurations of guilds the bot has left, and reconciliation."""
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Callable, Collection, Dict, Iterable, List, Mapping,
+    NamedTuple, Optional, Tuple,
+)
+
+import aiofiles
+
+from bot.utils.config_transfer import export_line
+
+if TYPE_CHECKING:
+    from bot.utils.config_manager import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+# What reconciliation does with configurations of guilds the bot is not in
+STALE_CONFIG_ACTIONS = ("archive", "delete")
+
+# Called with the configurations added to the archive
+ArchiveListener = Callable[[Mapping[int, Dict[str, Any]]], None]
+
+
+class ConfigArchive:
+    """
+    Append-only JSON Lines file of removed guild configurations.
+
+    Each line is an export line (see :mod:`bot.utils.config_transfer`) with an
+    ``archived_at`` timestamp; the latest line for a guild wins on restore.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._listeners: List[ArchiveListener] = []
+
+    def add_listener(self, listener: ArchiveListener):
+        """Call ``listener`` with the configurations of every :meth:`add`."""
+        self._listeners.append(listener)
+
+    async def add(
+        self, configs: Mapping[int, Dict[str, Any]], archived_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Append configurations to the archive.
+
+        Returns:
+            The number of configurations archived
+        """
+        if not configs:
+            return 0
+
+        stamp = (archived_at or datetime.utcnow()).isoformat(timespec="seconds")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(self.path, "a", encoding="utf-8") as f:
+            for guild_id, config in configs.items():
+                await f.write(export_line(guild_id, {**config, "archived_at": stamp}))
+        for listener in self._listeners:
+            listener(configs)
+        return len(configs)
+
+    async def _records(self) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Read the archive's configurations, oldest first, skipping bad lines."""
+        if not self.path.exists():
+            return
+
+        async with aiofiles.open(self.path, "r", encoding="utf-8") as f:
+            async for line in f:
+                try:
+                    record = json.loads(line)
+                    guild_id = int(record.pop("guild_id"))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                record.pop("archived_at", None)
+                yield guild_id, record
+
+    async def load_all(self) -> Dict[int, Dict[str, Any]]:
+        """Read the latest archived configuration of every guild."""
+        return {guild_id: record async for guild_id, record in self._records()}
+
+    async def find_many(self, guild_ids: Collection[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up the latest archived configuration of each guild in one pass.
+
+        Returns:
+            Configurations (without ``archived_at``) of the guilds found
+        """
+        found: Dict[int, Dict[str, Any]] = {}
+        if not guild_ids:
+            return found
+
+        wanted = set(guild_ids)
+        async for guild_id, record in self._records():
+            if guild_id in wanted:
+                found[guild_id] = record
+        return found
+
+    async def find(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Look up the latest archived configuration of a guild."""
+        return (await self.find_many([guild_id])).get(guild_id)
+
+
+class ReconcileResult(NamedTuple):
+    """Changes made by :func:`reconcile_configs`."""
+
+    removed: List[int]
+    restored: List[int]
+    created: List[int]
+
+
+async def reconcile_configs(
+    config_manager: "ConfigManager",
+    guild_ids: Iterable[int],
+    archive: Optional[ConfigArchive] = None,
+) -> ReconcileResult:
+    """
+    Make the stored configurations match the guilds the bot is in.
+
+    Configurations of other guilds are removed (archived first if an archive
+    is given); guilds without one get their archived configuration back, or
+    the defaults. All changes are saved with a single write.
+
+    Args:
+        config_manager: Configuration store to reconcile
+        guild_ids: Guilds the bot is currently in
+        archive: Where removed configurations are kept, if anywhere
+
+    Returns:
+        The removed, restored and newly created guild IDs
+    """
+    current = set(guild_ids)
+    configs = await config_manager.get_all_configs()
+    stale = sorted(set(configs) - current)
+    missing = sorted(current - set(configs))
+
+    restored: Dict[int, Dict[str, Any]] = {}
+    if archive is not None:
+        await archive.add({guild_id: configs[guild_id] for guild_id in stale})
+        restored = await archive.find_many(missing)
+    created = [guild_id for guild_id in missing if guild_id not in restored]
+
+    async with config_manager.batch():
+        await config_manager.delete_many(stale)
+        await config_manager.set_many(restored)
+        await config_manager.create_default_configs(created)
+
+    if stale or missing:
+        logger.info(
+            f"Reconciled configurations: {len(stale)} removed, "
+            f"{len(restored)} restored, {len(created)} created"
+        )
+    return ReconcileResult(stale, sorted(restored), created)
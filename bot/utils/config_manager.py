@@ -1,105 +1,546 @@
 """Configuration manager for guild settings."""
 import asyncio
-import json
+import hashlib
 import logging
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import aiofiles
 
+from bot.utils.body_store import BodyStore
+from bot.utils.file_watcher import FileSignature, FileWatcher, file_signature
+from bot.utils.json_codec import STDLIB_CODEC, JsonCodec
+from bot.utils.snapshot import MAGIC, SnapshotReader, encode_snapshot, is_snapshot
+
 logger = logging.getLogger(__name__)
 
+# Receives {guild_id: new config, or None if deleted} after every change
+ConfigListener = Callable[[Dict[int, Optional[Dict[str, Any]]]], None]
+
+def _content_digest(content: bytes) -> str:
+    """Fingerprint file contents to recognize our own writes."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
 class ConfigManager:
     """
     Manages guild configurations with async file operations and proper error handling.
+    
+    Every committed change set increments ``revision``, which is saved with
+    the file. When the file is edited externally, only the guilds that differ
+    from memory are applied; edits to guilds the bot changed after the
+    revision the edited file was based on are rejected as conflicts.
     """
     
-    def __init__(self, config_file_path: str):
+    # Version of the JSON layout written by _encode_file
+    FILE_VERSION = 2
+    # Supported on-disk formats: indented JSON or a compact binary snapshot
+    FILE_FORMATS = ('json', 'binary')
+    # Snapshot records decoded between yields to the event loop during load
+    LOAD_CHUNK_SIZE = 1000
+    
+    def __init__(
+        self,
+        config_file_path: str,
+        compress_threshold: Optional[int] = 1024,
+        file_format: str = 'json',
+        json_codec: Optional[JsonCodec] = None,
+    ):
+        if file_format not in self.FILE_FORMATS:
+            raise ValueError(f"Unknown configuration file format: {file_format}")
+            
         self.config_file_path = Path(config_file_path)
+        self.file_format = file_format
+        self.json_codec = json_codec or STDLIB_CODEC
         self._configs: Dict[int, Dict[str, Any]] = {}
+        self._bodies = BodyStore(compress_threshold)
         self._lock = asyncio.Lock()
+        self._listeners: List[ConfigListener] = []
+        self._batch_depth = 0
+        self._pending_changes: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.revision = 0
+        # Revision of each guild's last change made through this manager
+        self._guild_revisions: Dict[int, int] = {}
+        # What the file held when last read or written, to skip our own writes
+        self._file_signature: FileSignature = None
+        self._file_digest: Optional[str] = None
+        self._watcher: Optional[FileWatcher] = None
+        # Memory-mapped snapshot serving lookups while it is being loaded
+        self._snapshot: Optional[SnapshotReader] = None
         
         # Ensure the directory exists
         self.config_file_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Load existing configurations
-        asyncio.create_task(self._load_configs())
+        self._load_task = asyncio.create_task(self._load_configs())
         
     async def _load_configs(self):
         """Load configurations from file."""
         async with self._lock:
             try:
                 if self.config_file_path.exists():
-                    async with aiofiles.open(self.config_file_path, 'r') as f:
-                        content = await f.read()
-                        loaded_configs = json.loads(content)
-                        # Convert string guild IDs back to integers
-                        self._configs = {int(k): v for k, v in loaded_configs.items()}
-                        logger.info(f"Loaded {len(self._configs)} guild configurations")
+                    with open(self.config_file_path, 'rb') as f:
+                        binary = is_snapshot(f.read(len(MAGIC)))
+                    revision: Optional[int]
+                    if binary:
+                        configs, revision = await self._load_snapshot()
+                        file_format = 'binary'
+                    else:
+                        async with aiofiles.open(self.config_file_path, 'rb') as f:
+                            content = await f.read()
+                        self._file_signature = file_signature(self.config_file_path)
+                        self._file_digest = _content_digest(content)
+                        configs, file_format, revision = self._decode_file(content)
+                    self._bodies.clear()
+                    for config in configs.values():
+                        self._acquire_message(config)
+                    self._configs = configs
+                    self.revision = revision or 0
+                    logger.info(
+                        f"Loaded {len(self._configs)} guild configurations "
+                        f"({len(self._bodies)} unique messages, {file_format} format)"
+                    )
+                    self._notify(dict(self._configs))
+                    
+                    if file_format != self.file_format:
+                        logger.info(f"Upgrading configuration file to {self.file_format} format")
+                        await self._write_configs()
                 else:
                     logger.info("No existing configuration file found, starting with empty configs")
                     self._configs = {}
             except Exception as e:
                 logger.error(f"Failed to load configurations: {e}")
                 self._configs = {}
+                self._bodies.clear()
                 
+    async def _load_snapshot(self) -> Tuple[Dict[int, Dict[str, Any]], int]:
+        """
+        Decode a binary snapshot through a memory map.
+        
+        The file is never read into memory whole. Until every record is
+        decoded, get_config() reads single guilds from the map, and decoding
+        yields to the event loop every LOAD_CHUNK_SIZE records, so a large
+        file does not hold up the rest of startup.
+        
+        Returns:
+            The configs (messages not yet acquired) and the file's revision
+        """
+        reader = SnapshotReader.open(self.config_file_path, self.json_codec.loads)
+        self._snapshot = reader
+        try:
+            self._file_signature = file_signature(self.config_file_path)
+            self._file_digest = _content_digest(reader.buffer)
+            
+            bodies = reader.bodies()
+            configs: Dict[int, Dict[str, Any]] = {}
+            for count, (guild_id, record) in enumerate(reader.records(), 1):
+                message_ref = record.pop('message_ref', None)
+                if message_ref is not None:
+                    record['message'] = bodies[message_ref]
+                configs[guild_id] = record
+                if count % self.LOAD_CHUNK_SIZE == 0:
+                    await asyncio.sleep(0)
+            return configs, reader.revision
+        finally:
+            self._snapshot = None
+            reader.close()
+            
+    def _decode_file(
+        self, content: bytes
+    ) -> Tuple[Dict[int, Dict[str, Any]], str, Optional[int]]:
+        """
+        Decode file contents in either format.
+        
+        Returns:
+            The configs (messages not yet acquired), the format found, and the
+            file's revision if it records one
+        """
+        if is_snapshot(content):
+            reader = SnapshotReader(content, self.json_codec.loads)
+            configs = self._resolve_messages(dict(reader.records()), reader.bodies())
+            return configs, 'binary', reader.revision
+            
+        data = self.json_codec.loads(content)
+        revision = data.pop('revision', None)
+        if 'version' in data:
+            bodies = {digest: BodyStore.decode_body(body) for digest, body in data['bodies'].items()}
+            return self._resolve_messages(data['guilds'], bodies), 'json', revision
+            
+        # Legacy layout: guild ID -> config with inline messages
+        return self._resolve_messages(data, {}), 'json', revision
+        
+    @staticmethod
+    def _resolve_messages(
+        guilds: Dict[Any, Dict[str, Any]], bodies: Dict[str, str]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Build configs from stored records, inlining referenced message bodies."""
+        configs = {}
+        for guild_id, config in guilds.items():
+            message_ref = config.pop('message_ref', None)
+            if message_ref is not None:
+                config['message'] = bodies[message_ref]
+            # Convert string guild IDs back to integers
+            configs[int(guild_id)] = config
+        return configs
+        
+    def _serialize_configs(self) -> Dict[int, Dict[str, Any]]:
+        """Build stored records, referencing each distinct message body by digest."""
+        guilds = {}
+        for guild_id, config in self._configs.items():
+            entry = dict(config)
+            message = entry.get('message')
+            if isinstance(message, str) and self._bodies.references(message):
+                del entry['message']
+                entry['message_ref'] = self._bodies.digest(message)
+            guilds[guild_id] = entry
+        return guilds
+        
+    def _encode_file(self) -> bytes:
+        """Encode all configurations in the configured file format."""
+        guilds = self._serialize_configs()
+        
+        if self.file_format == 'binary':
+            bodies = {digest: self._bodies.encode_bytes(text) for digest, text in self._bodies.items()}
+            return encode_snapshot(guilds, bodies, self.json_codec.dumps, self.revision)
+            
+        # Convert integer guild IDs to strings for JSON serialization
+        data = {
+            'version': self.FILE_VERSION,
+            'revision': self.revision,
+            'bodies': self._bodies.dump(),
+            'guilds': {str(k): v for k, v in guilds.items()},
+        }
+        return self.json_codec.dumps(data, indent=True)
+        
+    def _acquire_message(self, config: Dict[str, Any]):
+        """Replace a config's message with the shared copy from the body store."""
+        message = config.get('message')
+        if isinstance(message, str):
+            config['message'] = self._bodies.acquire(message)
+            
+    def _release_message(self, config: Dict[str, Any]):
+        """Drop a config's reference to its message body."""
+        message = config.get('message')
+        if isinstance(message, str):
+            self._bodies.release(message)
+            
+    async def _write_configs(self):
+        """Write configurations to file; the caller must hold the lock."""
+        # Merge an external edit the watcher has not delivered yet rather
+        # than overwrite it
+        if self._file_signature is not None and file_signature(self.config_file_path) != self._file_signature:
+            await self._apply_file_changes()
+            signature = file_signature(self.config_file_path)
+            if signature is not None and signature != self._file_signature:
+                # The edit could not be read; keep it on disk for the user to fix
+                raise RuntimeError(
+                    f"{self.config_file_path} was changed externally and cannot be read; "
+                    "changes stay in memory until it is fixed"
+                )
+            
+        content = self._encode_file()
+        
+        # Write to a temporary file and swap it in, so a crash mid-write
+        # never leaves a truncated file behind
+        temp_path = self.config_file_path.with_name(self.config_file_path.name + '.tmp')
+        async with aiofiles.open(temp_path, 'wb') as f:
+            await f.write(content)
+        os.replace(temp_path, self.config_file_path)
+        self._file_signature = file_signature(self.config_file_path)
+        self._file_digest = _content_digest(content)
+        
     async def _save_configs(self):
         """Save configurations to file."""
         async with self._lock:
             try:
-                # Convert integer guild IDs to strings for JSON serialization
-                configs_to_save = {str(k): v for k, v in self._configs.items()}
-                
-                async with aiofiles.open(self.config_file_path, 'w') as f:
-                    await f.write(json.dumps(configs_to_save, indent=4))
-                    
+                await self._write_configs()
                 logger.debug("Configurations saved successfully")
             except Exception as e:
                 logger.error(f"Failed to save configurations: {e}")
                 
+    def add_listener(self, listener: ConfigListener):
+        """Register a callback invoked with the guild configs that changed."""
+        self._listeners.append(listener)
+        
+    def _notify(self, changes: Dict[int, Optional[Dict[str, Any]]]):
+        """Tell listeners about changed (or deleted, as None) guild configs."""
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error(f"Config listener failed: {e}")
+                
+    async def wait_until_loaded(self):
+        """
+        Wait for the initial configuration load to finish.
+        
+        Every change waits for it first: the load replaces the configs
+        wholesale, so anything written into them earlier would be lost.
+        """
+        await self._load_task
+        
     async def get_config(self, guild_id: int) -> Dict[str, Any]:
         """Get configuration for a specific guild."""
+        if self._snapshot is not None and guild_id not in self._configs:
+            # Still loading: read the guild straight from the mapped file
+            return self._snapshot.get(guild_id) or {}
         return self._configs.get(guild_id, {})
         
+    async def _commit(self, changes: Dict[int, Optional[Dict[str, Any]]]):
+        """Notify listeners and persist, or defer both until the open batch ends."""
+        if not changes:
+            return
+        if self._batch_depth:
+            self._pending_changes.update(changes)
+            return
+            
+        self.revision += 1
+        for guild_id in changes:
+            self._guild_revisions[guild_id] = self.revision
+        self._notify(changes)
+        await self._save_configs()
+        
+    async def watch(self, poll_interval: float = 2.0, use_inotify: bool = True):
+        """
+        Start applying external edits of the configuration file.
+        
+        Args:
+            poll_interval: Seconds between checks when inotify is unavailable
+            use_inotify: Set to False to always poll
+        """
+        await self.wait_until_loaded()
+        if self._watcher is None:
+            self._watcher = FileWatcher(
+                self.config_file_path, self.reload, poll_interval, use_inotify=use_inotify
+            )
+        await self._watcher.start()
+        
+    async def reload(self) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Apply external changes of the configuration file.
+        
+        Returns:
+            The guild configs that changed (None for deleted guilds)
+        """
+        async with self._lock:
+            changes = await self._apply_file_changes()
+            return changes or {}
+            
+    async def _apply_file_changes(self) -> Optional[Dict[int, Optional[Dict[str, Any]]]]:
+        """
+        Diff the file against memory and apply the changed guilds; the caller
+        must hold the lock.
+        
+        Returns:
+            The applied changes, or None if the file is unchanged or unreadable
+        """
+        try:
+            async with aiofiles.open(self.config_file_path, 'rb') as f:
+                content = await f.read()
+        except FileNotFoundError:
+            return None
+            
+        signature = file_signature(self.config_file_path)
+        digest = _content_digest(content)
+        if digest == self._file_digest:
+            self._file_signature = signature
+            return None
+            
+        try:
+            guilds, file_format, file_revision = self._decode_file(content)
+        except Exception as e:
+            logger.error(f"Ignoring unreadable configuration file change: {e}")
+            return None
+            
+        # Files without a revision (hand-written or generated) are taken as
+        # based on the current state
+        base_revision = self.revision if file_revision is None else file_revision
+        
+        changes, conflicts = self._diff_guilds(guilds, base_revision)
+        for guild_id, config in changes.items():
+            if config is None:
+                self._release_message(self._configs.pop(guild_id))
+            else:
+                self._store_config(guild_id, config)
+                
+        self.revision = max(self.revision, base_revision)
+        self._file_signature = signature
+        self._file_digest = digest
+        if changes:
+            logger.info(f"Applied external changes to {len(changes)} guild configurations")
+            self._notify(changes)
+            
+        if conflicts:
+            logger.warning(
+                f"Rejected external changes to guilds {sorted(conflicts)}: they were "
+                f"changed by the bot after revision {base_revision} the edit was based on"
+            )
+        if conflicts or file_format != self.file_format:
+            # Put the kept state back on disk
+            await self._write_configs()
+        return changes
+        
+    def _diff_guilds(
+        self, guilds: Dict[int, Dict[str, Any]], base_revision: int
+    ) -> Tuple[Dict[int, Optional[Dict[str, Any]]], List[int]]:
+        """
+        Compare externally edited configs with memory.
+        
+        Returns:
+            The guilds to apply (None for deleted ones), and the guilds whose
+            edits conflict with changes made here after ``base_revision``
+        """
+        changes: Dict[int, Optional[Dict[str, Any]]] = {}
+        conflicts = []
+        for guild_id in set(guilds) | set(self._configs):
+            new_config = guilds.get(guild_id)
+            if new_config == self._configs.get(guild_id):
+                continue
+            changed_here = self._guild_revisions.get(guild_id, 0) > base_revision
+            if changed_here or guild_id in self._pending_changes:
+                conflicts.append(guild_id)
+                continue
+            changes[guild_id] = new_config
+        return changes, conflicts
+        
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator["ConfigManager"]:
+        """
+        Group changes so they are persisted with one write and announced to
+        listeners with one notification when the outermost batch exits.
+        
+        Changes are applied in memory immediately; this is not a rollback
+        transaction.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending_changes:
+                changes, self._pending_changes = self._pending_changes, {}
+                await self._commit(changes)
+                
     async def set_config(self, guild_id: int, config: Dict[str, Any]):
         """Set configuration for a specific guild."""
-        self._configs[guild_id] = config
-        await self._save_configs()
+        await self.wait_until_loaded()
+        self._store_config(guild_id, config)
+        await self._commit({guild_id: config})
         
     async def update_config(self, guild_id: int, updates: Dict[str, Any]):
         """Update specific fields in a guild's configuration."""
-        if guild_id not in self._configs:
-            await self.create_default_config(guild_id)
+        await self.wait_until_loaded()
+        config = self._apply_updates(guild_id, updates)
+        await self._commit({guild_id: config})
+        
+    async def set_many(self, configs: Mapping[int, Dict[str, Any]]):
+        """Set the configurations of many guilds with a single write."""
+        await self.wait_until_loaded()
+        for guild_id, config in configs.items():
+            self._store_config(guild_id, config)
+        await self._commit(dict(configs))
+        
+    async def update_many(self, updates: Mapping[int, Dict[str, Any]]):
+        """
+        Update fields of many guilds with a single write.
+        
+        Guilds without a configuration get the defaults first.
+        """
+        await self.wait_until_loaded()
+        changes: Dict[int, Optional[Dict[str, Any]]] = {}
+        for guild_id, guild_updates in updates.items():
+            changes[guild_id] = self._apply_updates(guild_id, guild_updates)
+        await self._commit(changes)
+        
+    def _store_config(self, guild_id: int, config: Dict[str, Any]):
+        """Replace a guild's configuration in memory."""
+        if guild_id in self._configs:
+            self._release_message(self._configs[guild_id])
+        self._acquire_message(config)
+        self._configs[guild_id] = config
+        
+    def _apply_updates(self, guild_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge updates into a guild's configuration in memory, creating it if needed."""
+        config = self._configs.get(guild_id)
+        if config is None:
+            config = self._new_default_config()
+            self._configs[guild_id] = config
+        else:
+            self._release_message(config)
             
-        self._configs[guild_id].update(updates)
-        await self._save_configs()
+        config.update(updates)
+        self._acquire_message(config)
+        return config
         
     async def get_all_configs(self) -> Dict[int, Dict[str, Any]]:
         """Get all guild configurations."""
         return self._configs.copy()
         
-    async def create_default_config(self, guild_id: int):
-        """Create a default configuration for a new guild."""
-        default_config = {
+    def _new_default_config(self) -> Dict[str, Any]:
+        """Build a default configuration (its message not yet acquired)."""
+        return {
             'channel_id': None,
             'time': '07:00',
             'message': 'This is a default message. Please configure me!',
             'enabled': False
         }
         
+    async def create_default_config(self, guild_id: int):
+        """Create a default configuration for a new guild."""
+        await self.wait_until_loaded()
         if guild_id not in self._configs:
+            default_config = self._new_default_config()
+            self._acquire_message(default_config)
             self._configs[guild_id] = default_config
-            await self._save_configs()
+            await self._commit({guild_id: default_config})
             logger.info(f"Created default configuration for guild {guild_id}")
             
+    async def create_default_configs(self, guild_ids: Iterable[int]) -> List[int]:
+        """
+        Create default configurations for many guilds with a single write.
+        
+        Returns:
+            The guilds that had no configuration and got the defaults
+        """
+        await self.wait_until_loaded()
+        changes: Dict[int, Optional[Dict[str, Any]]] = {}
+        for guild_id in guild_ids:
+            if guild_id not in self._configs and guild_id not in changes:
+                default_config = self._new_default_config()
+                self._acquire_message(default_config)
+                self._configs[guild_id] = default_config
+                changes[guild_id] = default_config
+        await self._commit(changes)
+        return list(changes)
+        
     async def delete_config(self, guild_id: int):
         """Delete configuration for a guild."""
+        await self.wait_until_loaded()
         if guild_id in self._configs:
-            del self._configs[guild_id]
-            await self._save_configs()
+            self._release_message(self._configs.pop(guild_id))
+            await self._commit({guild_id: None})
             logger.info(f"Deleted configuration for guild {guild_id}")
             
+    async def delete_many(self, guild_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Delete the configurations of many guilds with a single write.
+        
+        Returns:
+            The deleted configurations
+        """
+        await self.wait_until_loaded()
+        removed = {}
+        for guild_id in guild_ids:
+            config = self._configs.pop(guild_id, None)
+            if config is not None:
+                self._release_message(config)
+                removed[guild_id] = config
+        await self._commit(dict.fromkeys(removed))
+        return removed
+            
     async def close(self):
         """Clean up resources."""
+        if self._watcher is not None:
+            await self._watcher.stop()
         await self._save_configs()
@@ -0,0 +1,204 @@
+"""Streaming import and export of guild configurations as JSON Lines."""
+import json
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Tuple, Union
+
+import aiofiles
+
+from bot.utils.attachments import MAX_ATTACHMENTS, is_digest
+from bot.utils.templates import TemplateError, compile_template, escape_template
+from bot.utils.time_utils import parse_time_string
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigImportError(ValueError):
+    """Raised when an import line is not a valid guild configuration."""
+
+
+def _validate_channel_id(value: Any) -> Any:
+    if value is None or (isinstance(value, int) and not isinstance(value, bool)):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    raise ConfigImportError("channel_id must be a numeric ID or null")
+
+
+def _validate_time(value: Any) -> Any:
+    if not isinstance(value, str) or not parse_time_string(value):
+        raise ConfigImportError("time must use HH:MM format")
+    return value
+
+
+def _validate_message(value: Any) -> Any:
+    if not isinstance(value, str):
+        raise ConfigImportError("message must be a string")
+    try:
+        return compile_template(value).source
+    except TemplateError as e:
+        raise ConfigImportError(f"invalid message template: {e}") from e
+
+
+def _validate_enabled(value: Any) -> Any:
+    if not isinstance(value, bool):
+        raise ConfigImportError("enabled must be true or false")
+    return value
+
+
+def _validate_start_date(value: Any) -> Any:
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ConfigImportError("start_date must be an ISO date (YYYY-MM-DD)") from None
+    return value
+
+
+def _validate_calendars(value: Any) -> Any:
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ConfigImportError("calendars must be a list of calendar names")
+    return value
+
+
+def _validate_dates(key: str) -> Callable[[Any], Any]:
+    def validate(value: Any) -> Any:
+        if not isinstance(value, list):
+            raise ConfigImportError(f"{key} must be a list of ISO dates (YYYY-MM-DD)")
+        for item in value:
+            try:
+                date.fromisoformat(item)
+            except (TypeError, ValueError):
+                raise ConfigImportError(f"{key} must be a list of ISO dates (YYYY-MM-DD)") from None
+        return value
+    return validate
+
+
+def _validate_attachments(value: Any) -> Any:
+    if not isinstance(value, list) or not all(is_digest(item) for item in value):
+        raise ConfigImportError("attachments must be a list of attachment digests")
+    if len(value) > MAX_ATTACHMENTS:
+        raise ConfigImportError(f"at most {MAX_ATTACHMENTS} attachments are allowed")
+    return value
+
+
+# Fields accepted on import, with their validators
+IMPORT_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "channel_id": _validate_channel_id,
+    "time": _validate_time,
+    "message": _validate_message,
+    "enabled": _validate_enabled,
+    "start_date": _validate_start_date,
+    "calendars": _validate_calendars,
+    "skip_dates": _validate_dates("skip_dates"),
+    "send_dates": _validate_dates("send_dates"),
+    "attachments": _validate_attachments,
+}
+
+
+def export_line(guild_id: int, config: Dict[str, Any]) -> str:
+    """
+    Encode one guild configuration as a JSON line.
+
+    A message that is not a valid template (saved before templates existed)
+    is sent verbatim, so it is exported escaped: the import accepts it and
+    it still renders the same text.
+    """
+    record = {"guild_id": str(guild_id)}
+    record.update(config)
+    message = record.get("message")
+    if isinstance(message, str):
+        try:
+            compile_template(message)
+        except TemplateError:
+            record["message"] = escape_template(message)
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def parse_import_line(line: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    Parse and validate one JSON line of an import.
+
+    Args:
+        line: A JSON object with ``guild_id`` and any importable fields
+
+    Returns:
+        The guild ID and the validated field updates
+
+    Raises:
+        ConfigImportError: If the line is not a valid configuration
+    """
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ConfigImportError(f"invalid JSON: {e.msg}") from e
+
+    if not isinstance(record, dict):
+        raise ConfigImportError("each line must be a JSON object")
+
+    try:
+        guild_id = int(record.pop("guild_id"))
+    except (KeyError, TypeError, ValueError):
+        raise ConfigImportError("guild_id must be a numeric ID") from None
+
+    unknown = sorted(set(record) - set(IMPORT_FIELDS))
+    if unknown:
+        raise ConfigImportError(f"unknown fields: {', '.join(unknown)}")
+
+    updates = {key: IMPORT_FIELDS[key](value) for key, value in record.items()}
+    return guild_id, updates
+
+
+async def write_export(configs: Iterable[Tuple[int, Dict[str, Any]]], path: Path) -> int:
+    """
+    Write guild configurations to a JSON Lines file, one guild per line.
+
+    Args:
+        configs: (guild ID, configuration) pairs
+        path: Destination file
+
+    Returns:
+        The number of guilds written
+    """
+    count = 0
+    async with aiofiles.open(path, "w", encoding="utf-8") as f:
+        for guild_id, config in configs:
+            await f.write(export_line(guild_id, config))
+            count += 1
+    return count
+
+
+async def read_import(
+    lines: AsyncIterable[Union[bytes, str]],
+) -> Tuple[Dict[int, Dict[str, Any]], List[Tuple[int, str]]]:
+    """
+    Parse a JSON Lines import stream one line at a time.
+
+    Blank lines are ignored; a guild listed more than once has its updates
+    merged in order.
+
+    Args:
+        lines: Raw lines, e.g. an HTTP response body iterated line by line
+
+    Returns:
+        The validated updates by guild ID, and (line number, error) pairs
+        for rejected lines
+    """
+    updates: Dict[int, Dict[str, Any]] = {}
+    errors: List[Tuple[int, str]] = []
+    line_number = 0
+
+    async for raw in lines:
+        line_number += 1
+        line = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+        if not line.strip():
+            continue
+
+        try:
+            guild_id, guild_updates = parse_import_line(line)
+        except ConfigImportError as e:
+            errors.append((line_number, str(e)))
+            continue
+        updates.setdefault(guild_id, {}).update(guild_updates)
+
+    return updates, errors
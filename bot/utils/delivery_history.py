@@ -0,0 +1,328 @@
+"""Fixed-size per-guild history of deliveries, with latency statistics."""
+import logging
+import math
+import os
+import struct
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import compress
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+# Outcome codes stored per record; a log record with 0 drops the guild's history
+FORGOTTEN = 0
+SENT = 1
+FAILED = 2
+OUTCOMES = {SENT: "sent", FAILED: "failed"}
+
+# Maps outcome bytes to a mask selecting successful sends
+_SENT_MASK = bytes(1 if code == SENT else 0 for code in range(256))
+
+# Log record: guild ID, scheduled time (Unix seconds), latency (ms), outcome
+_RECORD = struct.Struct("<QIIB")
+
+_EPOCH = datetime(1970, 1, 1)
+
+# The log is rewritten once it holds this many times the live records
+_COMPACT_RATIO = 2
+
+
+class DeliveryRecord(NamedTuple):
+    """One delivery attempt of a guild's daily message."""
+
+    scheduled: datetime
+    sent_at: datetime
+    outcome: str
+    latency: float
+
+
+@dataclass(frozen=True)
+class DeliveryStats:
+    """Summary of a set of delivery records; latencies are in seconds."""
+
+    count: int
+    failures: int
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    max: Optional[float]
+
+
+def _percentile(ordered: List[int], fraction: float) -> int:
+    """Nearest-rank percentile of sorted values."""
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(latencies_ms: List[int], failures: int) -> DeliveryStats:
+    """Build statistics from the latencies of successful sends and a failure count."""
+    count = len(latencies_ms) + failures
+    if not latencies_ms:
+        return DeliveryStats(count, failures, None, None, None, None)
+
+    ordered = sorted(latencies_ms)
+    p50, p90, p99 = (_percentile(ordered, f) / 1000 for f in (0.5, 0.9, 0.99))
+    return DeliveryStats(count, failures, p50, p90, p99, ordered[-1] / 1000)
+
+
+def format_latencies(stats: DeliveryStats) -> str:
+    """Describe the latency percentiles of some statistics, e.g. for an embed."""
+    def fmt(seconds: float) -> str:
+        return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+    latencies = {"p50": stats.p50, "p90": stats.p90, "p99": stats.p99, "max": stats.max}
+    parts = [f"{label} {fmt(seconds)}" for label, seconds in latencies.items() if seconds is not None]
+    return " · ".join(parts) if parts else "no successful sends"
+
+
+class DeliveryHistory:
+    """
+    The last ``size`` deliveries of every guild, in preallocated arrays.
+
+    Each guild owns a slot of ``size`` entries in three shared arrays
+    (scheduled time, latency, outcome; 9 bytes per entry) used as a ring
+    buffer, so memory stays bounded however long the bot runs. New records
+    are appended to a binary log in batches by :meth:`flush`; the log is
+    replayed on load and rewritten when it grows well past the live records.
+    """
+
+    def __init__(self, path: Optional[str] = None, size: int = 14):
+        """
+        Args:
+            path: Log file; ``None`` keeps the history in memory only
+            size: Records kept per guild
+        """
+        if size < 1 or size > 0xFFFF:
+            raise ValueError("History size must be between 1 and 65535")
+
+        self.path = Path(path) if path else None
+        self.size = size
+        self._scheduled = array("I")
+        self._latency = array("I")
+        self._outcome = array("B")
+        self._heads = array("H")
+        self._counts = array("H")
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._pending = bytearray()
+        self._log_records = 0
+
+    def _slot(self, guild_id: int) -> int:
+        """Get a guild's slot, allocating one if needed."""
+        slot = self._slots.get(guild_id)
+        if slot is not None:
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._heads)
+            self._scheduled.extend(array("I", [0]) * self.size)
+            self._latency.extend(array("I", [0]) * self.size)
+            self._outcome.extend(array("B", [0]) * self.size)
+            self._heads.append(0)
+            self._counts.append(0)
+        self._heads[slot] = 0
+        self._counts[slot] = 0
+        self._slots[guild_id] = slot
+        return slot
+
+    def _store(self, guild_id: int, scheduled: int, latency_ms: int, outcome: int):
+        slot = self._slot(guild_id)
+        start = slot * self.size
+        last = start + (self._heads[slot] - 1) % self.size
+        if self._counts[slot] and self._scheduled[last] == scheduled:
+            # A later attempt for the same minute replaces the earlier one
+            index = last
+        else:
+            index = start + self._heads[slot]
+            self._heads[slot] = (self._heads[slot] + 1) % self.size
+            self._counts[slot] = min(self._counts[slot] + 1, self.size)
+        self._scheduled[index] = scheduled
+        self._latency[index] = latency_ms
+        self._outcome[index] = outcome
+
+    def record(self, guild_id: int, scheduled: datetime, sent_at: datetime, sent: bool):
+        """
+        Record a delivery attempt.
+
+        A guild keeps one record per scheduled minute; recording the same
+        minute again (e.g. a pre-warm failure, then a delivery failure)
+        replaces it.
+
+        Args:
+            guild_id: Guild the message belongs to
+            scheduled: The minute the message was due
+            sent_at: When the send finished or failed (UTC)
+            sent: Whether the message was delivered
+        """
+        scheduled_seconds = int((scheduled - _EPOCH).total_seconds())
+        latency_ms = max(0, int((sent_at - scheduled).total_seconds() * 1000))
+        latency_ms = min(latency_ms, 0xFFFFFFFF)
+        outcome = SENT if sent else FAILED
+        self._store(guild_id, scheduled_seconds, latency_ms, outcome)
+        self._pending += _RECORD.pack(guild_id, scheduled_seconds, latency_ms, outcome)
+
+    def forget(self, guild_id: int):
+        """Drop a guild's history and free its slot."""
+        slot = self._slots.pop(guild_id, None)
+        if slot is not None:
+            # Free entries must read as empty for summary()
+            start = slot * self.size
+            self._outcome[start:start + self.size] = array("B", bytes(self.size))
+            self._counts[slot] = 0
+            self._free.append(slot)
+            self._pending += _RECORD.pack(guild_id, 0, 0, FORGOTTEN)
+
+    def _entries(self, slot: int) -> Iterable[int]:
+        """Array indices of a slot's records, oldest first."""
+        count = self._counts[slot]
+        start = slot * self.size
+        first = (self._heads[slot] - count) % self.size
+        return (start + (first + i) % self.size for i in range(count))
+
+    def records(self, guild_id: int) -> List[DeliveryRecord]:
+        """Get a guild's records, oldest first."""
+        slot = self._slots.get(guild_id)
+        if slot is None:
+            return []
+
+        records = []
+        for index in self._entries(slot):
+            scheduled = _EPOCH + timedelta(seconds=self._scheduled[index])
+            latency = self._latency[index] / 1000
+            records.append(DeliveryRecord(
+                scheduled,
+                scheduled + timedelta(seconds=latency),
+                OUTCOMES[self._outcome[index]],
+                latency,
+            ))
+        return records
+
+    def _collect(self, slot: int, latencies: List[int]) -> int:
+        """Add a slot's send latencies to ``latencies``; return its failures."""
+        # Until a ring wraps its records fill the front of the slot, so the
+        # first ``count`` entries are the records, in some order
+        start = slot * self.size
+        end = start + self._counts[slot]
+        outcomes = self._outcome[start:end]
+        latencies.extend(compress(self._latency[start:end], (o == SENT for o in outcomes)))
+        return len(outcomes) - outcomes.count(SENT)
+
+    def stats(self, guild_id: int) -> DeliveryStats:
+        """Summarize a guild's recent deliveries."""
+        latencies: List[int] = []
+        slot = self._slots.get(guild_id)
+        failures = self._collect(slot, latencies) if slot is not None else 0
+        return summarize(latencies, failures)
+
+    def summary(self, top: int = 5) -> Tuple[DeliveryStats, List[Tuple[int, int]]]:
+        """
+        Summarize the recent deliveries of all guilds.
+
+        Returns:
+            The overall statistics, and up to ``top`` (guild ID, failures)
+            pairs for the guilds with the most failures
+        """
+        # Entries not holding a record have outcome 0, so the arrays can be
+        # scanned whole, without visiting each guild
+        outcomes = self._outcome.tobytes()
+        latencies = list(compress(self._latency, outcomes.translate(_SENT_MASK)))
+
+        failures_by_slot: Dict[int, int] = {}
+        index = outcomes.find(FAILED)
+        while index >= 0:
+            slot = index // self.size
+            failures_by_slot[slot] = failures_by_slot.get(slot, 0) + 1
+            index = outcomes.find(FAILED, index + 1)
+
+        failing: List[Tuple[int, int]] = []
+        if failures_by_slot:
+            guilds = {slot: guild_id for guild_id, slot in self._slots.items()}
+            failing = [(guilds[slot], count) for slot, count in failures_by_slot.items()]
+            failing.sort(key=lambda item: (-item[1], item[0]))
+        return summarize(latencies, sum(failures_by_slot.values())), failing[:top]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    async def load(self):
+        """Replay the log file into memory, compacting it if it has grown."""
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            async with aiofiles.open(self.path, "rb") as f:
+                data = await f.read()
+        except OSError as e:
+            logger.error(f"Failed to load delivery history: {e}")
+            return
+
+        usable = len(data) - len(data) % _RECORD.size
+        for guild_id, scheduled, latency_ms, outcome in _RECORD.iter_unpack(memoryview(data)[:usable]):
+            if outcome in OUTCOMES:
+                self._store(guild_id, scheduled, latency_ms, outcome)
+            elif outcome == FORGOTTEN:
+                self.forget(guild_id)
+        self._pending.clear()
+        self._log_records = usable // _RECORD.size
+        logger.info(f"Loaded delivery history of {len(self._slots)} guilds")
+
+        if usable != len(data) or self._needs_compaction():
+            await self.compact()
+
+    def _live_records(self) -> int:
+        # Free slots have a count of 0
+        return sum(self._counts)
+
+    def _needs_compaction(self) -> bool:
+        return self._log_records > _COMPACT_RATIO * max(self._live_records(), self.size)
+
+    async def flush(self):
+        """Append records made since the last flush to the log file."""
+        if self.path is None or not self._pending:
+            self._pending.clear()
+            return
+
+        pending, self._pending = bytes(self._pending), bytearray()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(self.path, "ab") as f:
+                await f.write(pending)
+            self._log_records += len(pending) // _RECORD.size
+        except OSError as e:
+            logger.error(f"Failed to save delivery history: {e}")
+            return
+
+        if self._needs_compaction():
+            await self.compact()
+
+    async def compact(self):
+        """Rewrite the log file with only the live records."""
+        if self.path is None:
+            return
+
+        data = bytearray()
+        for guild_id, slot in self._slots.items():
+            for index in self._entries(slot):
+                data += _RECORD.pack(
+                    guild_id, self._scheduled[index], self._latency[index], self._outcome[index]
+                )
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(temp_path, "wb") as f:
+                await f.write(data + self._pending)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to compact delivery history: {e}")
+            return
+
+        self._log_records = (len(data) + len(self._pending)) // _RECORD.size
+        self._pending.clear()
@@ -0,0 +1,181 @@
+"""Watch a file for changes with inotify, falling back to polling."""
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# wd, mask, cookie, name length; followed by the NUL-padded name
+_EVENT = struct.Struct("iIII")
+
+# (mtime in ns, size) of a file, or None if it does not exist
+FileSignature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: Path) -> FileSignature:
+    """Get the modification time and size of a file."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_inotify() -> Optional[Any]:
+    """Get libc if it provides inotify (Linux only)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    Calls an async callback after a file changes.
+
+    On Linux the file's directory is watched with inotify, so files replaced
+    by rename (as atomic writers do) are followed. Elsewhere, or if inotify
+    cannot be set up, the file's modification time and size are polled.
+    Bursts of events are debounced into a single callback.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        callback: Callable[[], Awaitable[Any]],
+        poll_interval: float = 2.0,
+        debounce: float = 0.25,
+        use_inotify: bool = True,
+    ):
+        """
+        Args:
+            path: File to watch
+            callback: Coroutine function called after each change; its result is ignored
+            poll_interval: Seconds between checks when polling
+            debounce: Seconds to wait for further events before calling back
+            use_inotify: Set to False to always poll
+        """
+        self.path = Path(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._fd: Optional[int] = None
+
+    async def start(self):
+        """Start watching; does nothing if already started."""
+        if self._task and not self._task.done():
+            return
+
+        self._fd = self._open_inotify() if self.use_inotify else None
+        if self._fd is not None:
+            self.backend = "inotify"
+            self._task = asyncio.create_task(self._run_inotify(self._fd))
+        else:
+            self.backend = "polling"
+            self._task = asyncio.create_task(self._run_polling())
+        logger.info(f"Watching {self.path} for changes ({self.backend})")
+
+    async def stop(self):
+        """Stop watching."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _open_inotify(self) -> Optional[int]:
+        """Create an inotify descriptor watching the file's directory."""
+        libc = _load_inotify()
+        if libc is None:
+            return None
+
+        fd: int = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify unavailable ({os.strerror(ctypes.get_errno())}), polling instead")
+            return None
+
+        directory = str(self.path.parent.resolve()).encode()
+        if libc.inotify_add_watch(fd, directory, _WATCH_MASK) < 0:
+            logger.warning(f"Cannot watch {directory!r} ({os.strerror(ctypes.get_errno())}), polling instead")
+            os.close(fd)
+            return None
+        return fd
+
+    def _read_events(self, fd: int) -> bool:
+        """Drain pending inotify events; return whether any concern the file."""
+        name = self.path.name.encode()
+        matched = False
+        while True:
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                return matched
+
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                start = offset + _EVENT.size
+                if data[start:start + length].rstrip(b"\0") == name:
+                    matched = True
+                offset = start + length
+
+    async def _run_inotify(self, fd: int):
+        readable = asyncio.Event()
+        asyncio.get_running_loop().add_reader(fd, readable.set)
+
+        while True:
+            await readable.wait()
+            readable.clear()
+            if not self._read_events(fd):
+                continue
+
+            # Let the writer finish, then fold its remaining events into this change
+            await asyncio.sleep(self.debounce)
+            readable.clear()
+            self._read_events(fd)
+            await self._notify()
+
+    async def _run_polling(self):
+        signature = file_signature(self.path)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = file_signature(self.path)
+            if current != signature:
+                signature = current
+                await self._notify()
+
+    async def _notify(self):
+        try:
+            await self.callback()
+        except Exception as e:
+            logger.error(f"File change handler for {self.path} failed: {e}")
@@ -0,0 +1,64 @@
+"""Interchangeable JSON codecs for configuration persistence."""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None  # type: ignore[assignment]
+
+
+class JsonCodec:
+    """JSON codec backed by the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        """
+        Serialize an object to UTF-8 JSON.
+
+        Args:
+            obj: Object to serialize (string keys only)
+            indent: Pretty-print for human-readable files
+
+        Returns:
+            The encoded bytes
+        """
+        if indent:
+            return json.dumps(obj, indent=4).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Deserialize JSON bytes or text."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by ``orjson``; indented output uses two spaces."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+STDLIB_CODEC = JsonCodec()
+
+
+def get_codec(fast: bool = False) -> JsonCodec:
+    """
+    Get a JSON codec.
+
+    Args:
+        fast: Prefer ``orjson``; falls back to the standard library when it
+            is not installed
+
+    Returns:
+        The codec to use
+    """
+    if fast and orjson is not None:
+        return OrjsonCodec()
+    return STDLIB_CODEC
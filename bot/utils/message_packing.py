@@ -0,0 +1,73 @@
+"""Merge and split message contents to fit Discord's message length limit."""
+from typing import List, Sequence, Tuple
+
+# Maximum characters in a message's content
+MESSAGE_LIMIT = 2000
+
+# Placed between merged messages
+SEPARATOR = "\n\n"
+
+# Preferred split points, best first
+_BREAKS = ("\n\n", "\n", " ")
+
+
+def split_message(content: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Split content into pieces of at most ``limit`` characters.
+
+    Pieces end at a paragraph break where possible, then at a line break,
+    then at a space; a run of text without any is cut at the limit.
+    """
+    pieces = []
+    while len(content) > limit:
+        for separator in _BREAKS:
+            cut = content.rfind(separator, 0, limit + 1)
+            if cut > 0:
+                pieces.append(content[:cut])
+                content = content[cut + len(separator):]
+                break
+        else:
+            pieces.append(content[:limit])
+            content = content[limit:]
+    if content or not pieces:
+        pieces.append(content)
+    return pieces
+
+
+def pack_messages(
+    contents: Sequence[str], limit: int = MESSAGE_LIMIT
+) -> List[Tuple[str, List[int]]]:
+    """
+    Combine messages for one channel into as few messages as fit the limit.
+
+    Messages keep their order and are joined with a blank line. A message
+    longer than the limit is split (see :func:`split_message`) across
+    consecutive packed messages.
+
+    Args:
+        contents: Message contents in send order
+        limit: Maximum characters per packed message
+
+    Returns:
+        (packed content, indices of the messages it contains) pairs
+    """
+    packed: List[Tuple[str, List[int]]] = []
+    current: List[str] = []
+    members: List[int] = []
+    size = 0
+
+    for index, content in enumerate(contents):
+        for piece in split_message(content, limit):
+            added = len(piece) + (len(SEPARATOR) if current else 0)
+            if current and size + added > limit:
+                packed.append((SEPARATOR.join(current), members))
+                current, members, size = [], [], 0
+                added = len(piece)
+            current.append(piece)
+            size += added
+            if not members or members[-1] != index:
+                members.append(index)
+
+    if current:
+        packed.append((SEPARATOR.join(current), members))
+    return packed
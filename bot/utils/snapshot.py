@@ -0,0 +1,363 @@
+"""
+Compact binary snapshot format for guild configurations.
+
+Layout (little-endian)::
+
+    header      magic, version, flags, guild count, body count,
+                guild index offset, body index offset, revision
+    body index  one fixed-size entry per body, sorted by digest:
+                digest (12 bytes), data offset, data length, encoding
+    guild index one fixed-size entry per guild, sorted by guild ID:
+                guild ID, record offset, record length
+    data        message bodies (UTF-8 or zlib) and guild records
+
+A guild record packs the common fields (channel ID, send time, enabled flag
+and ``message_ref`` digest) into a fixed struct; any other keys follow as a
+compact JSON object.
+
+Both indexes are fixed-size and sorted, so a memory-mapped snapshot can
+answer a single guild lookup with a binary search, without deserializing
+the rest of the file.
+
+Version 1 snapshots have no revision field and read as revision 0.
+"""
+import json
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+MAGIC = b"ANTNSNAP"
+VERSION = 2
+
+_HEADER_V1 = struct.Struct("<8sHHIIQQ")
+_HEADER = struct.Struct("<8sHHIIQQQ")
+_VERSION = struct.Struct("<H")
+_BODY_ENTRY = struct.Struct("<12sQIB")
+_GUILD_ENTRY = struct.Struct("<QQI")
+# channel ID, minute of day, flags, message digest
+_RECORD = struct.Struct("<QHB12s")
+
+_ENCODING_UTF8 = 0
+_ENCODING_ZLIB = 1
+
+_HAS_CHANNEL = 1
+_HAS_TIME = 2
+_HAS_ENABLED = 4
+_ENABLED = 8
+_HAS_MESSAGE_REF = 16
+
+_NO_DIGEST = bytes(12)
+
+# Shared "HH:MM" strings for every minute of the day
+_TIME_STRINGS = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+
+# Serializes the extra keys of a guild record to bytes, and back
+ExtrasEncoder = Callable[[Dict[str, Any]], bytes]
+ExtrasDecoder = Callable[[bytes], Dict[str, Any]]
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is malformed."""
+
+
+def _encode_extras(extras: Dict[str, Any]) -> bytes:
+    return json.dumps(extras, separators=(",", ":")).encode("utf-8")
+
+
+def _decode_extras(data: bytes) -> Dict[str, Any]:
+    extras: Dict[str, Any] = json.loads(data)
+    return extras
+
+
+def _pack_time(value: Any) -> Optional[int]:
+    """Convert a canonical "HH:MM" string to minutes since midnight."""
+    if not isinstance(value, str) or len(value) != 5 or value[2] != ":":
+        return None
+    hours, minutes = value[:2], value[3:]
+    if not (hours.isdigit() and minutes.isdigit()):
+        return None
+    if int(hours) > 23 or int(minutes) > 59:
+        return None
+    return int(hours) * 60 + int(minutes)
+
+
+def encode_record(
+    record: Dict[str, Any], encode_extras: ExtrasEncoder = _encode_extras
+) -> bytes:
+    """Encode a guild record (with ``message_ref``) to bytes."""
+    extras = dict(record)
+    flags = 0
+    channel_id = 0
+    minute_of_day = 0
+    digest = _NO_DIGEST
+
+    value = extras.get("channel_id")
+    if "channel_id" in extras and (value is None or (isinstance(value, int) and 0 < value < 2**64)):
+        flags |= _HAS_CHANNEL
+        channel_id = value or 0
+        del extras["channel_id"]
+
+    packed_time = _pack_time(extras.get("time"))
+    if packed_time is not None:
+        flags |= _HAS_TIME
+        minute_of_day = packed_time
+        del extras["time"]
+
+    if isinstance(extras.get("enabled"), bool):
+        flags |= _HAS_ENABLED | (_ENABLED if extras.pop("enabled") else 0)
+
+    value = extras.get("message_ref")
+    if isinstance(value, str) and len(value) == 24:
+        flags |= _HAS_MESSAGE_REF
+        digest = bytes.fromhex(value)
+        del extras["message_ref"]
+
+    head = _RECORD.pack(channel_id, minute_of_day, flags, digest)
+    return head + encode_extras(extras) if extras else head
+
+
+def decode_record(
+    buffer: Any,
+    offset: int = 0,
+    length: Optional[int] = None,
+    decode_extras: ExtrasDecoder = _decode_extras,
+) -> Dict[str, Any]:
+    """Decode a guild record produced by :func:`encode_record`."""
+    if length is None:
+        length = len(buffer) - offset
+    channel_id, minute_of_day, flags, digest = _RECORD.unpack_from(buffer, offset)
+
+    record: Dict[str, Any] = {}
+    if flags & _HAS_CHANNEL:
+        record["channel_id"] = channel_id or None
+    if flags & _HAS_TIME:
+        record["time"] = _TIME_STRINGS[minute_of_day]
+    if flags & _HAS_MESSAGE_REF:
+        record["message_ref"] = digest.hex()
+    if flags & _HAS_ENABLED:
+        record["enabled"] = bool(flags & _ENABLED)
+    if length > _RECORD.size:
+        record.update(decode_extras(buffer[offset + _RECORD.size:offset + length]))
+    return record
+
+
+def is_snapshot(data: bytes) -> bool:
+    """Check whether a buffer starts with the snapshot magic bytes."""
+    return data[: len(MAGIC)] == MAGIC
+
+
+def encode_snapshot(
+    guilds: Mapping[int, Dict[str, Any]],
+    bodies: Mapping[str, Tuple[bytes, bool]],
+    encode_extras: ExtrasEncoder = _encode_extras,
+    revision: int = 0,
+) -> bytes:
+    """
+    Encode guild records and message bodies into a snapshot.
+
+    Args:
+        guilds: Guild ID to record (referencing bodies via ``message_ref``)
+        bodies: Hex digest to (encoded bytes, whether zlib-compressed)
+        encode_extras: Serializer for record keys without a packed field
+        revision: Change counter of the configurations being saved
+
+    Returns:
+        The snapshot bytes
+    """
+    body_items = sorted(bodies.items())
+    guild_items = sorted(guilds.items())
+
+    body_index_offset = _HEADER.size
+    guild_index_offset = body_index_offset + _BODY_ENTRY.size * len(body_items)
+    offset = guild_index_offset + _GUILD_ENTRY.size * len(guild_items)
+
+    index = bytearray()
+    chunks = []
+
+    for digest, (data, compressed) in body_items:
+        encoding = _ENCODING_ZLIB if compressed else _ENCODING_UTF8
+        index += _BODY_ENTRY.pack(bytes.fromhex(digest), offset, len(data), encoding)
+        chunks.append(data)
+        offset += len(data)
+
+    for guild_id, record in guild_items:
+        data = encode_record(record, encode_extras)
+        index += _GUILD_ENTRY.pack(int(guild_id), offset, len(data))
+        chunks.append(data)
+        offset += len(data)
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        0,
+        len(guild_items),
+        len(body_items),
+        guild_index_offset,
+        body_index_offset,
+        revision,
+    )
+    return b"".join([header, bytes(index), *chunks])
+
+
+class SnapshotReader:
+    """
+    Random-access reader over a snapshot buffer.
+
+    Works on ``bytes`` or on a memory map; use :meth:`open` to map a file so
+    only the pages that are actually read get loaded.
+    """
+
+    guild_count: int
+    body_count: int
+    revision: int
+
+    def __init__(self, buffer: Any, decode_extras: ExtrasDecoder = _decode_extras):
+        self._buffer = buffer
+        self._decode_extras = decode_extras
+        self._mmap: Optional[mmap.mmap] = None
+
+        if len(buffer) < _HEADER_V1.size or not is_snapshot(buffer):
+            raise SnapshotError("Not a configuration snapshot")
+
+        version = _VERSION.unpack_from(buffer, len(MAGIC))[0]
+        if version == 1:
+            header = _HEADER_V1.unpack_from(buffer, 0) + (0,)
+        elif version == VERSION:
+            if len(buffer) < _HEADER.size:
+                raise SnapshotError("Truncated snapshot")
+            header = _HEADER.unpack_from(buffer, 0)
+        else:
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+
+        (
+            _,
+            _,
+            _,
+            self.guild_count,
+            self.body_count,
+            self._guild_index,
+            self._body_index,
+            self.revision,
+        ) = header
+
+        end = self._guild_index + _GUILD_ENTRY.size * self.guild_count
+        if end > len(buffer):
+            raise SnapshotError("Truncated snapshot")
+
+    @classmethod
+    def open(
+        cls, path: Path, decode_extras: ExtrasDecoder = _decode_extras
+    ) -> "SnapshotReader":
+        """Memory-map a snapshot file."""
+        with open(path, "rb") as f:
+            if not is_snapshot(f.read(len(MAGIC))):
+                raise SnapshotError("Not a configuration snapshot")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            reader = cls(mapped, decode_extras)
+        except Exception:
+            mapped.close()
+            raise
+        reader._mmap = mapped
+        return reader
+
+    def close(self):
+        """Release the memory map, if any."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.guild_count
+
+    @property
+    def buffer(self) -> Any:
+        """The snapshot bytes or memory map being read."""
+        return self._buffer
+
+    def _guild_entry(self, position: int) -> Tuple[int, int, int]:
+        return _GUILD_ENTRY.unpack_from(
+            self._buffer, self._guild_index + position * _GUILD_ENTRY.size
+        )
+
+    def _body_entry(self, position: int) -> Tuple[bytes, int, int, int]:
+        return _BODY_ENTRY.unpack_from(
+            self._buffer, self._body_index + position * _BODY_ENTRY.size
+        )
+
+    def _read_body(self, offset: int, length: int, encoding: int) -> str:
+        data = bytes(self._buffer[offset:offset + length])
+        if encoding == _ENCODING_ZLIB:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def _read_record(self, offset: int, length: int) -> Dict[str, Any]:
+        return decode_record(self._buffer, offset, length, self._decode_extras)
+
+    def guild_ids(self) -> Iterator[int]:
+        """Iterate over guild IDs in ascending order."""
+        for position in range(self.guild_count):
+            yield self._guild_entry(position)[0]
+
+    def get_record(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read one guild record (with ``message_ref``) by binary search."""
+        low, high = 0, self.guild_count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            entry_id, offset, length = self._guild_entry(middle)
+            if entry_id == guild_id:
+                return self._read_record(offset, length)
+            if entry_id < guild_id:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def get_body(self, digest: str) -> Optional[str]:
+        """Read one message body by binary search on its digest."""
+        key = bytes.fromhex(digest)
+        low, high = 0, self.body_count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            entry_digest, offset, length, encoding = self._body_entry(middle)
+            if entry_digest == key:
+                return self._read_body(offset, length, encoding)
+            if entry_digest < key:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def get(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read one guild configuration with its message body resolved."""
+        record = self.get_record(guild_id)
+        if record is None:
+            return None
+
+        message_ref = record.pop("message_ref", None)
+        if message_ref is not None:
+            record["message"] = self.get_body(message_ref)
+        return record
+
+    def bodies(self) -> Dict[str, str]:
+        """Read all message bodies keyed by hex digest."""
+        result = {}
+        for position in range(self.body_count):
+            digest, offset, length, encoding = self._body_entry(position)
+            result[digest.hex()] = self._read_body(offset, length, encoding)
+        return result
+
+    def records(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Iterate over (guild ID, record) pairs in ascending guild order."""
+        start = self._guild_index
+        index = self._buffer[start:start + _GUILD_ENTRY.size * self.guild_count]
+        for guild_id, offset, length in _GUILD_ENTRY.iter_unpack(index):
+            yield guild_id, decode_record(self._buffer, offset, length, self._decode_extras)
@@ -0,0 +1,225 @@
+"""Message templates with per-guild placeholders."""
+import logging
+import weakref
+from datetime import date, datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Placeholders resolved at send time
+PLACEHOLDERS = ("date", "weekday", "guild", "day")
+
+
+class TemplateError(ValueError):
+    """Raised when a message template cannot be compiled."""
+
+
+class CompiledTemplate:
+    """
+    A parsed message template.
+
+    The source is split once into literal text and placeholder names, so
+    rendering is a single join over precomputed parts.
+    """
+
+    __slots__ = ("source", "fields", "_parts", "_static", "__weakref__")
+
+    def __init__(self, source: str, parts: List[Tuple[str, Optional[str]]]):
+        self.source = source
+        self._parts = tuple(parts)
+        self.fields = frozenset(name for _, name in parts if name)
+        # Without placeholders there is a single literal part
+        self._static: Optional[str] = parts[0][0] if not self.fields else None
+
+    @classmethod
+    def literal(cls, text: str) -> "CompiledTemplate":
+        """Create a template that renders ``text`` verbatim."""
+        return cls(text, [(text, None)])
+
+    def render(self, context: Mapping[str, str]) -> str:
+        """
+        Render the template.
+
+        Args:
+            context: Values for the placeholders used by this template
+
+        Returns:
+            The rendered message text
+        """
+        if self._static is not None:
+            return self._static
+        return "".join(
+            text + context[name] if name else text for text, name in self._parts
+        )
+
+
+def _resolve_role(argument: str, roles: Optional[Mapping[str, int]]) -> int:
+    if argument.isdigit():
+        return int(argument)
+    if roles and argument in roles:
+        return roles[argument]
+    raise TemplateError(f"Unknown role '{argument}'")
+
+
+def compile_template(
+    source: str, roles: Optional[Mapping[str, int]] = None
+) -> CompiledTemplate:
+    """
+    Compile a message template.
+
+    Supported placeholders are ``{date}``, ``{weekday}``, ``{guild}``,
+    ``{day}`` and ``{role:<name or ID>}``. Literal braces are written as
+    ``{{`` and ``}}``. Role names are resolved to IDs at compile time, so the
+    returned template's ``source`` only contains role IDs.
+
+    Args:
+        source: Template text
+        roles: Mapping of role name to role ID used to resolve role names
+
+    Returns:
+        The compiled template
+
+    Raises:
+        TemplateError: If the template is malformed or uses unknown names
+    """
+    parts: List[Tuple[str, Optional[str]]] = []
+    normalized: List[str] = []
+    literal: List[str] = []
+    i = 0
+    length = len(source)
+
+    while i < length:
+        char = source[i]
+
+        if char == "}":
+            if source.startswith("}}", i):
+                literal.append("}")
+                normalized.append("}}")
+                i += 2
+                continue
+            raise TemplateError(f"Unmatched '}}' at position {i + 1}")
+
+        if char != "{":
+            literal.append(char)
+            normalized.append(char)
+            i += 1
+            continue
+
+        if source.startswith("{{", i):
+            literal.append("{")
+            normalized.append("{{")
+            i += 2
+            continue
+
+        end = source.find("}", i + 1)
+        if end == -1:
+            raise TemplateError(f"Unclosed '{{' at position {i + 1}")
+
+        name = source[i + 1:end].strip()
+        i = end + 1
+
+        if name.startswith("role:"):
+            role_id = _resolve_role(name[5:].strip(), roles)
+            literal.append(f"<@&{role_id}>")
+            normalized.append(f"{{role:{role_id}}}")
+            continue
+
+        if name not in PLACEHOLDERS:
+            raise TemplateError(f"Unknown placeholder '{{{name}}}'")
+
+        parts.append(("".join(literal), name))
+        normalized.append(f"{{{name}}}")
+        literal = []
+
+    # Keep the caller's string when it is already normalized (or, for a
+    # static message, the text itself), so the template holds no copy of it
+    if literal or not parts:
+        text = "".join(literal)
+        parts.append((source if not parts and text == source else text, None))
+
+    normalized_source = "".join(normalized)
+    return CompiledTemplate(source if normalized_source == source else normalized_source, parts)
+
+
+def escape_template(text: str) -> str:
+    """Turn text into a template that renders it verbatim."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def build_context(
+    current_time: datetime, guild_name: str, start_date: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Build the placeholder values for a render.
+
+    Args:
+        current_time: Time the message is sent
+        guild_name: Name of the guild the message is sent to
+        start_date: ISO date the day counter starts from (day 1)
+
+    Returns:
+        Mapping of placeholder name to value
+    """
+    today = current_time.date()
+    try:
+        day = (today - date.fromisoformat(start_date)).days + 1 if start_date else 1
+    except ValueError:
+        day = 1
+
+    return {
+        "date": today.isoformat(),
+        "weekday": today.strftime("%A"),
+        "guild": guild_name,
+        "day": str(day),
+    }
+
+
+class TemplateCache:
+    """
+    Cache of compiled message templates, shared by guilds with the same message.
+
+    Templates are keyed by their source, so guilds sending the same text use
+    one compiled template. Each guild keeps a reference to its template; a
+    template no guild uses any more is dropped.
+    """
+
+    def __init__(self):
+        self._templates: Dict[int, CompiledTemplate] = {}
+        self._by_source: "weakref.WeakValueDictionary[str, CompiledTemplate]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def put(self, guild_id: int, template: CompiledTemplate):
+        """Store a template compiled (and validated) elsewhere."""
+        shared = self._by_source.setdefault(template.source, template)
+        self._templates[guild_id] = shared
+
+    def get(self, guild_id: int, source: str) -> CompiledTemplate:
+        """
+        Get the compiled template for a guild's message.
+
+        A source is compiled only when no guild's cached template was built
+        from it. Messages that are not valid templates (for example ones
+        saved before templates existed) are sent verbatim.
+        """
+        template = self._templates.get(guild_id)
+        if template is not None and (
+            template.source is source or template.source == source
+        ):
+            return template
+
+        template = self._by_source.get(source)
+        if template is None:
+            try:
+                template = compile_template(source)
+            except TemplateError as e:
+                logger.warning(f"Message for guild {guild_id} is not a valid template, sending verbatim: {e}")
+                template = CompiledTemplate.literal(source)
+            self._by_source[source] = template
+
+        self._templates[guild_id] = template
+        return template
+
+    def invalidate(self, guild_id: int):
+        """Drop the cached template for a guild."""
+        self._templates.pop(guild_id, None)
@@ -3,6 +3,8 @@ from datetime import datetime, time
 from typing import Optional
 import logging
 
+from bot.utils.clock import Clock
+
 logger = logging.getLogger(__name__)
 
 def parse_time_string(time_str: str) -> Optional[time]:
@@ -21,19 +23,24 @@ def parse_time_string(time_str: str) -> Optional[time]:
         logger.error(f"Failed to parse time string '{time_str}': {e}")
         return None
 
-def is_time_to_send(scheduled_time: time, current_time: Optional[datetime] = None) -> bool:
+def is_time_to_send(
+    scheduled_time: time,
+    current_time: Optional[datetime] = None,
+    clock: Optional[Clock] = None,
+) -> bool:
     """
     Check if it's time to send a message based on the scheduled time.
     
     Args:
         scheduled_time: The scheduled time to send the message
-        current_time: Current time (defaults to utcnow())
+        current_time: Current time (defaults to the clock's now())
+        clock: Clock used when current_time is omitted (defaults to the wall clock)
         
     Returns:
         True if it's time to send the message, False otherwise
     """
     if current_time is None:
-        current_time = datetime.utcnow()
+        current_time = (clock or Clock()).now()
     
     return (scheduled_time.hour == current_time.hour and 
             scheduled_time.minute == current_time.minute)
@@ -3,6 +3,7 @@ import asyncio
 import logging
 from bot.core.bot import DailyMessageBot
 from bot.core.config import settings
+from bot.core.runtime import install_event_loop
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s")
@@ -25,4 +26,6 @@ async def main():
         await bot.close()
 
 if __name__ == "__main__":
+    loop_name = install_event_loop(settings.runtime_profile)
+    logging.info(f"Runtime profile: {settings.runtime_profile} ({loop_name} event loop)")
     asyncio.run(main())
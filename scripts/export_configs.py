@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Export guild configurations to readable JSON for debugging.
+
+Reads either the binary snapshot or the JSON configuration file and writes
+a flat ``{guild_id: config}`` JSON document with messages inlined, which the
+bot can also load back. The document keeps the file's ``revision``, so edits
+copied back over a running bot's file are checked for conflicts.
+
+Usage:
+    python scripts/export_configs.py data/server_configs.json -o configs.json
+    python scripts/export_configs.py data/server_configs.json --guild 1234567890
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.utils.body_store import BodyStore  # noqa: E402
+from bot.utils.snapshot import SnapshotReader, SnapshotError  # noqa: E402
+
+def load_snapshot(path: Path, guild_ids):
+    """Read configs and the revision from a binary snapshot, only touching the requested guilds."""
+    with SnapshotReader.open(path) as reader:
+        if guild_ids:
+            return {
+                str(guild_id): reader.get(guild_id)
+                for guild_id in guild_ids
+                if reader.get_record(guild_id) is not None
+            }, reader.revision
+
+        bodies = reader.bodies()
+        configs = {}
+        for guild_id, record in reader.records():
+            message_ref = record.pop('message_ref', None)
+            if message_ref is not None:
+                record['message'] = bodies[message_ref]
+            configs[str(guild_id)] = record
+        return configs, reader.revision
+
+def load_json(path: Path, guild_ids):
+    """Read configs and the revision from a JSON configuration file."""
+    data = json.loads(path.read_text())
+    revision = data.pop('revision', None)
+    if 'version' not in data:
+        guilds = data
+    else:
+        bodies = {digest: BodyStore.decode_body(body) for digest, body in data['bodies'].items()}
+        guilds = data['guilds']
+        for config in guilds.values():
+            message_ref = config.pop('message_ref', None)
+            if message_ref is not None:
+                config['message'] = bodies[message_ref]
+
+    if guild_ids:
+        wanted = {str(guild_id) for guild_id in guild_ids}
+        guilds = {k: v for k, v in guilds.items() if k in wanted}
+    return guilds, revision
+
+def main():
+    parser = argparse.ArgumentParser(description="Export guild configurations to JSON")
+    parser.add_argument("config_file", help="Configuration file (binary snapshot or JSON)")
+    parser.add_argument("-o", "--output", help="Output file (defaults to stdout)")
+    parser.add_argument("--guild", type=int, action="append", default=[],
+                        help="Only export this guild ID (repeatable)")
+    args = parser.parse_args()
+
+    path = Path(args.config_file)
+    try:
+        configs, revision = load_snapshot(path, args.guild)
+    except SnapshotError:
+        configs, revision = load_json(path, args.guild)
+
+    document = configs if revision is None else {'revision': revision, **configs}
+    output = json.dumps(document, indent=4, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+        print(f"Exported {len(configs)} guild configurations to {args.output}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
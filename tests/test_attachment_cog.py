@@ -0,0 +1,177 @@
+"""Tests for the attachment cog."""
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from discord import app_commands
+
+from bot.cogs.attachment_cog import AttachmentCog
+from bot.utils.attachments import MAX_ATTACHMENTS, AttachmentStore
+from bot.utils.config_manager import ConfigManager
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+async def bot(tmp_path):
+    bot = MagicMock()
+    bot.config_manager = ConfigManager(str(tmp_path / "configs.json"))
+    await bot.config_manager.wait_until_loaded()
+    bot.attachment_store = AttachmentStore(str(tmp_path / "attachments"), max_bytes=100)
+    yield bot
+    await bot.config_manager.close()
+
+
+@pytest.fixture
+def cog(bot):
+    return AttachmentCog(bot)
+
+
+def make_interaction(guild_id=1):
+    interaction = MagicMock()
+    interaction.guild_id = guild_id
+    interaction.response.send_message = AsyncMock()
+    interaction.response.defer = AsyncMock()
+    interaction.response.is_done.return_value = False
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+def download(*parts):
+    """Patch the HTTP session to serve a file made of ``parts``."""
+    response = MagicMock()
+    response.content.iter_chunked = lambda size: chunks(*parts)
+    session = MagicMock()
+    session.get.return_value.__aenter__.return_value = response
+    client_session = MagicMock()
+    client_session.return_value.__aenter__.return_value = session
+    return patch("bot.cogs.attachment_cog.aiohttp.ClientSession", client_session)
+
+
+async def add(cog, interaction, data=b"hello", filename="photo.png"):
+    file = MagicMock(url="https://cdn.example/photo.png", filename=filename, content_type="image/png")
+    with download(data):
+        # Command.callback is typed without the cog it is bound to
+        callback: Any = cog.add.callback
+        await callback(cog, interaction, file)
+    return interaction.followup.send.await_args.args[0]
+
+
+async def run(command, cog, interaction, *args):
+    callback: Any = command.callback
+    await callback(cog, interaction, *args)
+    return interaction.response.send_message.await_args.args[0]
+
+
+class TestAttachmentCog:
+    """Test the /attachment commands."""
+
+    def test_commands_are_not_available_in_dms(self, cog):
+        # The commands inherit the setting from the /attachment group
+        assert cog.__cog_app_commands_group__.guild_only
+
+    @pytest.mark.asyncio
+    async def test_add_stores_and_attaches_the_file(self, bot, cog):
+        reply = await add(cog, make_interaction())
+
+        assert reply == "✅ `photo.png` will be sent with the daily message."
+        attachments = (await bot.config_manager.get_config(1))["attachments"]
+        assert len(attachments) == 1
+        assert bot.attachment_store.get(attachments[0]).path.read_bytes() == b"hello"
+
+    @pytest.mark.asyncio
+    async def test_adding_the_same_file_twice_attaches_it_once(self, bot, cog):
+        await add(cog, make_interaction())
+        await add(cog, make_interaction(), filename="copy.png")
+
+        assert len((await bot.config_manager.get_config(1))["attachments"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_add_refuses_more_than_the_limit(self, bot, cog):
+        digests = [f"{number:064x}" for number in range(MAX_ATTACHMENTS)]
+        await bot.config_manager.set_config(1, {"attachments": digests})
+
+        reply = await add(cog, make_interaction())
+
+        assert reply.startswith("❌ A daily message can carry at most")
+        assert (await bot.config_manager.get_config(1))["attachments"] == digests
+
+    @pytest.mark.asyncio
+    async def test_add_rejects_a_file_that_is_too_large(self, bot, cog):
+        reply = await add(cog, make_interaction(), data=b"x" * 101)
+
+        assert reply.startswith("❌ Cannot attach this file: file is larger than")
+        assert await bot.config_manager.get_config(1) == {}
+
+    @pytest.mark.asyncio
+    async def test_list_numbers_the_files(self, bot, cog):
+        await add(cog, make_interaction())
+        attachments = (await bot.config_manager.get_config(1))["attachments"]
+        await bot.config_manager.update_config(1, {"attachments": attachments + ["f" * 64]})
+
+        reply = await run(cog.list_attachments, cog, make_interaction())
+
+        assert reply == (
+            "📎 **Attachments**\n"
+            "1. `photo.png` (0 KB)\n"
+            f"2. ⚠️ missing file `{'f' * 12}`"
+        )
+
+    @pytest.mark.asyncio
+    async def test_list_without_files(self, cog):
+        assert await run(cog.list_attachments, cog, make_interaction()) == "No files are attached."
+
+    @pytest.mark.asyncio
+    async def test_remove_detaches_the_numbered_file(self, bot, cog):
+        await bot.config_manager.set_config(1, {"attachments": ["a" * 64, "b" * 64]})
+
+        reply = await run(cog.remove, cog, make_interaction(), 1)
+
+        assert reply == "✅ File removed."
+        assert (await bot.config_manager.get_config(1))["attachments"] == ["b" * 64]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("number", [0, 2, -1])
+    async def test_remove_rejects_unknown_numbers(self, bot, cog, number):
+        await bot.config_manager.set_config(1, {"attachments": ["a" * 64]})
+
+        reply = await run(cog.remove, cog, make_interaction(), number)
+
+        assert reply.startswith("❌ No such file.")
+        assert (await bot.config_manager.get_config(1))["attachments"] == ["a" * 64]
+
+
+class TestErrorHandler:
+    """Test the cog's command error handler."""
+
+    @pytest.mark.asyncio
+    async def test_missing_permissions(self, cog):
+        interaction = make_interaction()
+
+        await cog.command_error_handler(
+            interaction, app_commands.MissingPermissions(["manage_guild"])
+        )
+
+        reply = interaction.response.send_message.await_args.args[0]
+        assert "'Manage Server' permission" in reply
+
+    @pytest.mark.asyncio
+    async def test_other_errors(self, cog):
+        interaction = make_interaction()
+
+        await cog.command_error_handler(interaction, app_commands.CheckFailure())
+
+        reply = interaction.response.send_message.await_args.args[0]
+        assert reply == "❌ An unexpected error occurred."
+
+    @pytest.mark.asyncio
+    async def test_errors_after_a_reply_are_only_logged(self, cog):
+        interaction = make_interaction()
+        interaction.response.is_done.return_value = True
+
+        await cog.command_error_handler(interaction, app_commands.CheckFailure())
+
+        interaction.response.send_message.assert_not_awaited()
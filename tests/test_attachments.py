@@ -0,0 +1,235 @@
+"""Tests for stored attachments and their upload cache."""
+import hashlib
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from bot.utils.attachments import (
+    AttachmentCache, AttachmentError, AttachmentReferences, AttachmentStore, url_expiry
+)
+from bot.utils.config_archive import ConfigArchive
+from bot.utils.config_manager import ConfigManager
+from bot.utils.message_packing import MESSAGE_LIMIT
+
+NOW = datetime(2024, 1, 1, 7, 0)
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def sent_message(*urls):
+    message = MagicMock()
+    message.attachments = [MagicMock(url=url) for url in urls]
+    return message
+
+
+@pytest.fixture
+async def store(tmp_path):
+    return AttachmentStore(str(tmp_path / "attachments"), max_bytes=100)
+
+
+class TestAttachmentStore:
+    """Test the content-addressed file store."""
+
+    @pytest.mark.asyncio
+    async def test_add_streams_and_deduplicates(self, store):
+        """Test that files are named by their hash and stored once."""
+        stored = await store.add(chunks(b"hello ", b"world"), "greeting.txt")
+        again = await store.add(chunks(b"hello world"), "copy.txt", "text/plain")
+
+        assert stored.digest == hashlib.sha256(b"hello world").hexdigest()
+        assert again.digest == stored.digest
+        assert stored.path.read_bytes() == b"hello world"
+        assert store.get(stored.digest).size == 11
+        assert [p.name for p in store.directory.iterdir() if p.suffix != ".json"] == [stored.digest]
+
+    @pytest.mark.asyncio
+    async def test_rejects_large_files(self, store):
+        """Test that oversized files are rejected without leaving a file behind."""
+        with pytest.raises(AttachmentError):
+            await store.add(chunks(b"x" * 60, b"x" * 60), "big.bin")
+        assert list(store.directory.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_metadata_is_cached(self, store):
+        """Test that looking up a known file does not read the disk."""
+        stored = await store.add(chunks(b"data"), "data.bin")
+        stored.path.with_suffix(".json").unlink()
+
+        assert store.get(stored.digest) == stored
+        store.invalidate(stored.digest)
+        assert store.get(stored.digest) is None
+
+    @pytest.mark.asyncio
+    async def test_remove(self, store):
+        """Test that removed files are gone."""
+        stored = await store.add(chunks(b"data"), "data.bin")
+        store.remove(stored.digest)
+        assert store.get(stored.digest) is None
+
+
+class TestAttachmentReferences:
+    """Test deleting files no configuration references."""
+
+    @pytest.mark.asyncio
+    async def test_file_is_deleted_with_its_last_reference(self, store, tmp_path):
+        """Test that deleting, replacing and editing configs release their files."""
+        refs = AttachmentReferences(store)
+        manager = ConfigManager(str(tmp_path / "configs.json"))
+        manager.add_listener(refs.on_configs_changed)
+        await manager.wait_until_loaded()
+
+        shared = await store.add(chunks(b"shared"), "shared.png")
+        own = await store.add(chunks(b"own"), "own.png")
+        await manager.update_many({
+            1: {"attachments": [shared.digest, own.digest]},
+            2: {"attachments": [shared.digest]},
+        })
+        assert refs.count(shared.digest) == 2
+
+        await manager.delete_config(1)
+        assert store.get(own.digest) is None
+        assert store.get(shared.digest) is not None
+
+        await manager.set_config(2, {"channel_id": 20})
+        assert store.get(shared.digest) is None
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_file_moved_between_guilds_is_kept(self, store, tmp_path):
+        """Test that a file dropped and picked up in one change set survives."""
+        refs = AttachmentReferences(store)
+        stored = await store.add(chunks(b"data"), "data.bin")
+        refs.on_configs_changed({1: {"attachments": [stored.digest]}})
+
+        refs.on_configs_changed({1: None, 2: {"attachments": [stored.digest]}})
+
+        assert store.get(stored.digest) is not None
+        assert refs.count(stored.digest) == 1
+
+    @pytest.mark.asyncio
+    async def test_references_are_counted_from_the_initial_load(self, store, tmp_path):
+        """Test that files referenced by the loaded file are tracked."""
+        stored = await store.add(chunks(b"data"), "data.bin")
+        manager = ConfigManager(str(tmp_path / "configs.json"))
+        await manager.wait_until_loaded()
+        await manager.set_config(1, {"attachments": [stored.digest]})
+        await manager.close()
+
+        refs = AttachmentReferences(store)
+        manager = ConfigManager(str(tmp_path / "configs.json"))
+        manager.add_listener(refs.on_configs_changed)
+        await manager.wait_until_loaded()
+
+        assert refs.count(stored.digest) == 1
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_archived_configs_keep_their_files(self, store, tmp_path):
+        """Test that a config moved to the archive does not release its files."""
+        stored = await store.add(chunks(b"data"), "data.bin")
+        archive = ConfigArchive(str(tmp_path / "archive.ndjson"))
+        refs = AttachmentReferences(store)
+        archive.add_listener(refs.on_archived)
+        config = {"attachments": [stored.digest]}
+        refs.on_configs_changed({1: config})
+
+        await archive.add({1: config})
+        refs.on_configs_changed({1: None})
+        assert store.get(stored.digest) is not None
+
+        # A later archive entry without the file releases it
+        await archive.add({1: {"attachments": []}})
+        assert store.get(stored.digest) is None
+
+    @pytest.mark.asyncio
+    async def test_existing_archive_is_counted(self, store, tmp_path):
+        """Test that files of configs archived in earlier runs are kept."""
+        stored = await store.add(chunks(b"data"), "data.bin")
+        archive = ConfigArchive(str(tmp_path / "archive.ndjson"))
+        await archive.add({1: {"attachments": [stored.digest]}})
+
+        refs = AttachmentReferences(store)
+        refs.on_archived(await archive.load_all())
+        refs.on_configs_changed({2: {"attachments": [stored.digest]}})
+        refs.on_configs_changed({2: None})
+
+        assert refs.count(stored.digest) == 1
+        assert store.get(stored.digest) is not None
+
+
+class TestAttachmentCache:
+    """Test uploading once and reusing URLs."""
+
+    def test_url_expiry(self):
+        """Test reading the expiry of signed CDN URLs."""
+        url = "https://cdn.discordapp.com/attachments/1/2/a.png?ex=65920080&is=1&hm=2"
+        assert url_expiry(url) == datetime(2024, 1, 1, 0, 0)
+        assert url_expiry("https://example.com/a.png") is None
+
+    @pytest.mark.asyncio
+    async def test_uploads_once_then_reuses_url(self, store):
+        """Test that an image is uploaded once and then embedded by URL."""
+        stored = await store.add(chunks(b"png"), "cat.png")
+        cache = AttachmentCache(store)
+        channel = MagicMock()
+        channel.send = AsyncMock(return_value=sent_message("https://cdn/cat.png"))
+
+        await cache.send(channel, "Good morning", [stored.digest], NOW)
+        first = channel.send.await_args.kwargs
+        assert first["files"][0].filename == "cat.png"
+        assert "embeds" not in first
+
+        await cache.send(channel, "Good morning", [stored.digest], NOW + timedelta(hours=1))
+        second = channel.send.await_args.kwargs
+        assert "files" not in second
+        assert second["embeds"][0].image.url == "https://cdn/cat.png"
+
+    @pytest.mark.asyncio
+    async def test_expired_or_failed_url_is_uploaded_again(self, store):
+        """Test that expiry and send failures both force a new upload."""
+        stored = await store.add(chunks(b"pdf"), "report.pdf")
+        cache = AttachmentCache(store, ttl=timedelta(hours=2))
+        cache.remember(stored.digest, "https://cdn/report.pdf", NOW)
+
+        assert cache.url(stored.digest, NOW + timedelta(hours=1)) == "https://cdn/report.pdf"
+        assert cache.url(stored.digest, NOW + timedelta(hours=3)) is None
+
+        cache.remember(stored.digest, "https://cdn/report.pdf", NOW)
+        channel = MagicMock()
+        channel.send = AsyncMock(side_effect=discord.HTTPException(MagicMock(status=500), "oops"))
+        with pytest.raises(discord.HTTPException):
+            await cache.send(channel, "Report", [stored.digest], NOW)
+        assert cache.url(stored.digest, NOW) is None
+
+    @pytest.mark.asyncio
+    async def test_non_images_are_linked(self, store):
+        """Test that a reused non-image file is sent as a link."""
+        stored = await store.add(chunks(b"pdf"), "report.pdf")
+        cache = AttachmentCache(store)
+        cache.remember(stored.digest, "https://cdn/report.pdf", NOW)
+        channel = MagicMock()
+        channel.send = AsyncMock()
+
+        await cache.send(channel, "Report", [stored.digest], NOW)
+        assert channel.send.await_args.kwargs == {"content": "Report\nhttps://cdn/report.pdf"}
+
+    @pytest.mark.asyncio
+    async def test_link_that_does_not_fit_is_uploaded(self, store):
+        """Test that links never push the message past Discord's length limit."""
+        stored = await store.add(chunks(b"pdf"), "report.pdf")
+        cache = AttachmentCache(store)
+        cache.remember(stored.digest, "https://cdn/report.pdf", NOW)
+        channel = MagicMock()
+        channel.send = AsyncMock()
+        content = "x" * (MESSAGE_LIMIT - 10)
+
+        await cache.send(channel, content, [stored.digest], NOW)
+
+        kwargs = channel.send.await_args.kwargs
+        assert kwargs["content"] == content
+        assert kwargs["files"][0].filename == "report.pdf"
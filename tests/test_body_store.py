@@ -0,0 +1,57 @@
+"""Tests for the content-addressed message body store."""
+from bot.utils.body_store import BodyStore, body_digest
+
+class TestBodyStore:
+    """Test BodyStore functionality."""
+
+    def test_identical_bodies_are_shared(self):
+        """Test that equal bodies resolve to one string object."""
+        store = BodyStore()
+        first = store.acquire("".join(["Good ", "morning"]))
+        second = store.acquire("".join(["Good ", "mor", "ning"]))
+
+        assert first is second
+        assert len(store) == 1
+        assert store.references("Good morning") == 2
+        assert store.digest("Good morning") == body_digest("Good morning")
+
+    def test_unreferenced_bodies_are_removed(self):
+        """Test reference counting on release."""
+        store = BodyStore()
+        store.acquire("hello")
+        store.acquire("hello")
+
+        store.release("hello")
+        assert len(store) == 1
+
+        store.release("hello")
+        assert len(store) == 0
+        assert store.references("hello") == 0
+
+    def test_release_unknown_body_is_ignored(self):
+        """Test releasing a body that was never stored."""
+        store = BodyStore()
+        store.release("missing")
+        assert len(store) == 0
+
+    def test_large_bodies_are_compressed(self):
+        """Test that only large bodies are compressed and they round-trip."""
+        store = BodyStore(compress_threshold=64)
+        large = "daily " * 100
+        store.acquire(large)
+        store.acquire("short")
+
+        dumped = store.dump()
+        encoded_large = dumped[body_digest(large)]
+
+        assert isinstance(encoded_large, dict)
+        assert BodyStore.decode_body(encoded_large) == large
+        assert dumped[body_digest("short")] == "short"
+
+    def test_compression_can_be_disabled(self):
+        """Test that a None threshold keeps bodies as plain text."""
+        store = BodyStore(compress_threshold=None)
+        large = "daily " * 1000
+        store.acquire(large)
+
+        assert store.dump()[body_digest(large)] == large
@@ -0,0 +1,137 @@
+"""Tests for the bot's guild membership handlers."""
+import json
+from typing import List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bot.core.bot import DailyMessageBot
+from bot.core.config import settings
+
+
+def guild_config(guild_id, message="Hi"):
+    return {"channel_id": guild_id * 10, "time": "07:00", "message": message, "enabled": True}
+
+
+def guild(guild_id):
+    guild = MagicMock()
+    guild.id = guild_id
+    guild.name = f"Guild {guild_id}"
+    return guild
+
+
+class ConnectedBot(DailyMessageBot):
+    """The bot with its guild list set by the test instead of the gateway."""
+
+    def __init__(self, config_file_path: str):
+        super().__init__(config_file_path)
+        self.joined: List[MagicMock] = []
+
+    @property
+    def user(self):
+        return MagicMock()
+
+    @property
+    def guilds(self):
+        return self.joined
+
+    def is_ready(self):
+        return True
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "stale_config_action", "archive")
+    monkeypatch.setattr(settings, "config_archive_path", str(tmp_path / "archive.ndjson"))
+    monkeypatch.setattr(settings, "calendars_file_path", str(tmp_path / "calendars.json"))
+    monkeypatch.setattr(settings, "attachments_dir", str(tmp_path / "attachments"))
+    monkeypatch.setattr(settings, "delivery_history_path", str(tmp_path / "history.bin"))
+    monkeypatch.setattr(settings, "reconcile_interval_hours", 0)
+    return tmp_path
+
+
+@pytest.fixture
+async def bot(data_dir):
+    bot = ConnectedBot(str(data_dir / "configs.json"))
+    await bot.config_manager.wait_until_loaded()
+    yield bot
+    await bot.config_manager.close()
+
+
+class TestGuildMembership:
+    """Test joining and leaving guilds."""
+
+    @pytest.mark.asyncio
+    async def test_leaving_archives_the_config(self, bot):
+        await bot.config_manager.set_config(1, guild_config(1))
+
+        await bot.on_guild_remove(guild(1))
+
+        assert await bot.config_manager.get_config(1) == {}
+        assert await bot.config_archive.find(1) == guild_config(1)
+
+    @pytest.mark.asyncio
+    async def test_rejoining_restores_the_archived_config(self, bot):
+        await bot.config_manager.set_config(1, guild_config(1))
+        await bot.on_guild_remove(guild(1))
+
+        await bot.on_guild_join(guild(1))
+
+        assert await bot.config_manager.get_config(1) == guild_config(1)
+
+    @pytest.mark.asyncio
+    async def test_rejoining_finds_the_attached_files(self, bot):
+        async def chunks():
+            yield b"png"
+
+        stored = await bot.attachment_store.add(chunks(), "cat.png")
+        await bot.config_manager.set_config(1, {**guild_config(1), "attachments": [stored.digest]})
+        await bot.on_guild_remove(guild(1))
+        await bot.on_guild_join(guild(1))
+
+        config = await bot.config_manager.get_config(1)
+        assert bot.attachment_store.get(config["attachments"][0]) == stored
+
+    @pytest.mark.asyncio
+    async def test_joining_a_new_guild_creates_defaults(self, bot):
+        await bot.on_guild_join(guild(1))
+
+        config = await bot.config_manager.get_config(1)
+        assert config["enabled"] is False
+        assert config["channel_id"] is None
+
+
+class TestReconcile:
+    """Test reconciling configurations with the guild list."""
+
+    @pytest.mark.asyncio
+    async def test_ready_waits_for_the_config_load(self, data_dir):
+        config_path = data_dir / "configs.json"
+        config_path.write_text(json.dumps({"1": guild_config(1), "3": guild_config(3)}))
+        bot = ConnectedBot(str(config_path))
+        bot.joined = [guild(1), guild(2)]
+
+        try:
+            await bot.on_ready()
+
+            configs = await bot.config_manager.get_all_configs()
+            assert set(configs) == {1, 2}
+            assert configs[1] == guild_config(1)
+            assert bot.config_archive is not None
+            assert await bot.config_archive.find(3) == guild_config(3)
+        finally:
+            await bot.config_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_periodic_reconcile(self, bot, monkeypatch):
+        monkeypatch.setattr(settings, "reconcile_interval_hours", 6)
+        await bot.config_manager.set_many({1: guild_config(1), 2: guild_config(2)})
+        bot.joined = [guild(2), guild(3)]
+        bot.is_closed = MagicMock(side_effect=[False, True])
+
+        with patch("bot.core.bot.asyncio.sleep", AsyncMock()) as sleep:
+            await bot._reconcile_loop()
+
+        sleep.assert_awaited_once_with(6 * 3600)
+        assert set(await bot.config_manager.get_all_configs()) == {2, 3}
+        assert await bot.config_archive.find(1) == guild_config(1)
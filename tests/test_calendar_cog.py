@@ -0,0 +1,196 @@
+"""Tests for the skip calendar cog."""
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from discord import app_commands
+
+from bot.cogs.calendar_cog import CalendarCog
+from bot.utils.calendars import Calendar, CalendarStore
+from bot.utils.config_manager import ConfigManager
+
+
+@pytest.fixture
+async def bot(tmp_path):
+    bot = MagicMock()
+    bot.config_manager = ConfigManager(str(tmp_path / "configs.json"))
+    await bot.config_manager.wait_until_loaded()
+    bot.calendar_store = CalendarStore()
+    await bot.calendar_store.define(Calendar("weekends", frozenset({5, 6}), frozenset(), frozenset()))
+    bot.scheduler.next_send_time.return_value = datetime(2024, 1, 2, 7, 0)
+    yield bot
+    await bot.config_manager.close()
+
+
+@pytest.fixture
+def cog(bot):
+    return CalendarCog(bot)
+
+
+def make_interaction(guild_id=1):
+    interaction = MagicMock()
+    interaction.guild_id = guild_id
+    interaction.response.send_message = AsyncMock()
+    interaction.response.is_done.return_value = False
+    return interaction
+
+
+async def run(command, cog, *args):
+    interaction = make_interaction()
+    # Command.callback is typed without the cog it is bound to
+    callback: Any = command.callback
+    await callback(cog, interaction, *args)
+    return interaction.response.send_message.await_args.args[0]
+
+
+class TestSubscriptions:
+    """Test following and leaving calendars."""
+
+    def test_commands_are_not_available_in_dms(self, cog):
+        # The commands inherit the setting from the /calendar group
+        assert cog.__cog_app_commands_group__.guild_only
+
+    @pytest.mark.asyncio
+    async def test_show(self, bot, cog):
+        await bot.calendar_store.define(Calendar("holidays", frozenset(), frozenset(), frozenset({(12, 25)})))
+        await bot.config_manager.set_config(1, {
+            "calendars": ["weekends", "gone"],
+            "skip_dates": ["2099-01-01"],
+        })
+
+        reply = await run(cog.show, cog)
+
+        assert reply == "\n".join([
+            "📅 **Skip calendars**",
+            "▫️ `holidays`: yearly 12-25",
+            "✅ `weekends`: every sat, sun",
+            "⚠️ `gone`: no longer exists",
+            "**Skipped dates:** 2099-01-01",
+            "**Forced send dates:** none",
+            "**Next send:** 2024-01-02 07:00 UTC",
+        ])
+
+    @pytest.mark.asyncio
+    async def test_show_without_calendars(self, bot, cog):
+        await bot.calendar_store.remove("weekends")
+        bot.scheduler.next_send_time.return_value = None
+
+        reply = await run(cog.show, cog)
+
+        assert "No calendars have been defined yet." in reply
+        assert reply.endswith("**Next send:** none scheduled")
+
+    @pytest.mark.asyncio
+    async def test_subscribe(self, bot, cog):
+        reply = await run(cog.subscribe, cog, "weekends")
+        await run(cog.subscribe, cog, "weekends")
+
+        assert reply == "✅ Daily messages will be skipped on `weekends` days."
+        assert (await bot.config_manager.get_config(1))["calendars"] == ["weekends"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_to_unknown_calendar(self, bot, cog):
+        reply = await run(cog.subscribe, cog, "holidays")
+
+        assert reply.startswith("❌ Unknown calendar `holidays`.")
+        assert await bot.config_manager.get_config(1) == {}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self, bot, cog):
+        await bot.config_manager.set_config(1, {"calendars": ["weekends", "holidays"]})
+
+        reply = await run(cog.unsubscribe, cog, "weekends")
+
+        assert reply == "✅ No longer skipping `weekends` days."
+        assert (await bot.config_manager.get_config(1))["calendars"] == ["holidays"]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_from_calendar_not_followed(self, cog):
+        reply = await run(cog.unsubscribe, cog, "weekends")
+
+        assert reply == "❌ This server does not follow `weekends`."
+
+
+class TestDateOverrides:
+    """Test the per-server skip and send dates."""
+
+    @pytest.mark.asyncio
+    async def test_skip_send_and_clear(self, bot, cog):
+        assert await run(cog.skip, cog, "2099-12-25") == "✅ No daily message will be sent on `2099-12-25`."
+        await run(cog.send, cog, "2099-12-26")
+        config = await bot.config_manager.get_config(1)
+        assert config["skip_dates"] == ["2099-12-25"]
+        assert config["send_dates"] == ["2099-12-26"]
+
+        # A date is in at most one list
+        await run(cog.send, cog, "2099-12-25")
+        config = await bot.config_manager.get_config(1)
+        assert config["skip_dates"] == []
+        assert config["send_dates"] == ["2099-12-25", "2099-12-26"]
+
+        assert await run(cog.clear, cog, " 2099-12-25 ") == "✅ `2099-12-25` follows the server's calendars again."
+        assert (await bot.config_manager.get_config(1))["send_dates"] == ["2099-12-26"]
+
+    @pytest.mark.asyncio
+    async def test_past_dates_are_dropped(self, bot, cog):
+        await bot.config_manager.set_config(1, {"skip_dates": ["2000-01-01"], "send_dates": ["2000-01-02"]})
+
+        await run(cog.skip, cog, "2099-12-25")
+
+        config = await bot.config_manager.get_config(1)
+        assert config["skip_dates"] == ["2099-12-25"]
+        assert config["send_dates"] == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command", ["skip", "send", "clear"])
+    async def test_invalid_date(self, bot, cog, command):
+        reply = await run(getattr(cog, command), cog, "25/12/2099")
+
+        assert reply == "❌ Invalid date: invalid date '25/12/2099', use YYYY-MM-DD."
+        assert await bot.config_manager.get_config(1) == {}
+
+
+class TestSharedCalendars:
+    """Test defining and deleting calendars."""
+
+    @pytest.mark.asyncio
+    async def test_define(self, bot, cog):
+        reply = await run(cog.define, cog, " Holidays ", "", "12-25, 2099-01-01")
+
+        assert reply == "✅ Calendar `holidays` saved: yearly 12-25; 2099-01-01."
+        assert bot.calendar_store.get("holidays").annual == frozenset({(12, 25)})
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("weekdays,dates", [("someday", ""), ("", "13-01")])
+    async def test_define_invalid_calendar(self, bot, cog, weekdays, dates):
+        reply = await run(cog.define, cog, "holidays", weekdays, dates)
+
+        assert reply.startswith("❌ Invalid calendar:")
+        assert bot.calendar_store.get("holidays") is None
+
+    @pytest.mark.asyncio
+    async def test_delete(self, bot, cog):
+        assert await run(cog.delete, cog, "weekends") == "✅ Calendar `weekends` deleted."
+        assert bot.calendar_store.get("weekends") is None
+        assert await run(cog.delete, cog, "weekends") == "❌ Unknown calendar `weekends`."
+
+
+class TestErrorHandler:
+    """Test the cog's command error handler."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error,reply", [
+        (
+            app_commands.MissingPermissions(["manage_guild"]),
+            "❌ You don't have permission to use this command. You need 'Manage Server' permission.",
+        ),
+        (app_commands.CheckFailure(), "❌ Only the bot owner can use this command."),
+        (app_commands.AppCommandError(), "❌ An unexpected error occurred."),
+    ])
+    async def test_errors(self, cog, error, reply):
+        interaction = make_interaction()
+
+        await cog.command_error_handler(interaction, error)
+
+        assert interaction.response.send_message.await_args.args[0] == reply
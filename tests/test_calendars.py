@@ -0,0 +1,126 @@
+"""Tests for skip calendars and their bitsets."""
+import json
+import pytest
+from datetime import date
+
+from bot.utils.calendars import (
+    Calendar,
+    CalendarError,
+    CalendarStore,
+    SkipIndex,
+    parse_dates,
+    parse_weekdays,
+)
+
+
+class TestParsing:
+    """Test parsing calendar definitions."""
+
+    def test_parse_weekdays(self):
+        """Test weekday names, case and full names."""
+        assert parse_weekdays("sat, Sunday") == frozenset({5, 6})
+        assert parse_weekdays("") == frozenset()
+        with pytest.raises(CalendarError):
+            parse_weekdays("someday")
+
+    def test_parse_dates(self):
+        """Test one-off and yearly dates."""
+        dates, annual = parse_dates("2024-05-01, 12-25,02-29")
+        assert dates == frozenset({date(2024, 5, 1)})
+        assert annual == frozenset({(12, 25), (2, 29)})
+        with pytest.raises(CalendarError):
+            parse_dates("13-01")
+        with pytest.raises(CalendarError):
+            parse_dates("2024-02-30")
+
+
+class TestCalendar:
+    """Test compiling calendars into bitsets."""
+
+    def test_compile_marks_rule_days(self):
+        """Test that weekday, one-off and yearly rules set the right bits."""
+        calendar = Calendar("c", frozenset({6}), frozenset({date(2024, 5, 1)}), frozenset({(12, 25)}))
+        index = SkipIndex()
+        index.store._calendars["c"] = calendar
+        config = {"calendars": ["c"]}
+
+        skipped = [d for d in (date(2024, 1, 1 + i) for i in range(14)) if index.is_skipped(1, config, d)]
+        assert skipped == [date(2024, 1, 7), date(2024, 1, 14)]
+        assert index.is_skipped(1, config, date(2024, 5, 1))
+        assert index.is_skipped(1, config, date(2024, 12, 25))
+        assert index.is_skipped(1, config, date(2025, 12, 25))
+        assert not index.is_skipped(1, config, date(2025, 5, 1))
+
+    def test_leap_day_only_in_leap_years(self):
+        """Test that a yearly Feb 29 is ignored in other years."""
+        calendar = Calendar("leap", annual=frozenset({(2, 29)}))
+        assert calendar.compile(2024) != bytes(len(calendar.compile(2024)))
+        assert calendar.compile(2023) == bytes(len(calendar.compile(2023)))
+
+    def test_round_trip(self):
+        """Test serializing a calendar."""
+        calendar = Calendar("c", frozenset({5, 6}), frozenset({date(2024, 5, 1)}), frozenset({(1, 1)}))
+        assert Calendar.from_dict("c", calendar.to_dict()) == calendar
+
+
+class TestSkipIndex:
+    """Test per-guild skip lookups."""
+
+    @pytest.mark.asyncio
+    async def test_overrides_and_invalidation(self):
+        """Test guild skip and send dates over calendar days, and cache invalidation."""
+        index = SkipIndex()
+        await index.store.define(Calendar("weekends", frozenset({5, 6})))
+        saturday, monday = date(2024, 1, 6), date(2024, 1, 8)
+        config = {"calendars": ["weekends"], "send_dates": ["2024-01-06"]}
+
+        assert not index.is_skipped(1, config, saturday)
+        assert index.is_skipped(1, config, date(2024, 1, 7))
+        assert index.next_send_date(1, config, date(2024, 1, 7)) == monday
+
+        config = {"calendars": ["weekends"], "skip_dates": ["2024-01-08"]}
+        index.invalidate_guild(1)
+        assert index.is_skipped(1, config, saturday)
+        assert index.next_send_date(1, config, date(2024, 1, 6)) == date(2024, 1, 9)
+
+        await index.store.remove("weekends")
+        assert not index.is_skipped(1, config, saturday)
+
+    def test_invalidation_is_per_guild(self):
+        """Test that invalidating a guild drops all its years and no other guild's."""
+        index = SkipIndex()
+        config = {"skip_dates": ["2024-01-01", "2025-01-01"]}
+        for guild_id in (1, 2):
+            assert index.is_skipped(guild_id, config, date(2024, 1, 1))
+            assert index.is_skipped(guild_id, config, date(2025, 1, 1))
+
+        index.invalidate_guild(1)
+
+        assert not index.is_skipped(1, {"skip_dates": ["2024-01-02"]}, date(2024, 1, 1))
+        assert not index.is_skipped(1, {"skip_dates": ["2024-01-02"]}, date(2025, 1, 1))
+        assert index.is_skipped(2, {"skip_dates": ["2024-01-02"]}, date(2025, 1, 1))
+
+    def test_guild_without_calendars(self):
+        """Test that guilds without skips are never skipped."""
+        index = SkipIndex()
+        assert not index.is_skipped(1, {}, date(2024, 1, 1))
+        assert index.next_send_date(1, {}, date(2024, 1, 1)) == date(2024, 1, 1)
+        assert index.next_send_date(1, {"skip_dates": ["2024-01-01"]}, date(2024, 1, 1), horizon_days=1) is None
+
+
+class TestCalendarStore:
+    """Test persisting calendars."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, tmp_path):
+        """Test that calendars survive a restart."""
+        path = tmp_path / "calendars.json"
+        store = CalendarStore(str(path))
+        await store.define(Calendar("holidays", annual=frozenset({(12, 25)})))
+        assert json.loads(path.read_text())["calendars"]["holidays"]["annual"] == ["12-25"]
+
+        loaded = CalendarStore(str(path))
+        await loaded.load()
+        assert loaded.names() == ["holidays"]
+        calendar = loaded.get("holidays")
+        assert calendar is not None and calendar.annual == frozenset({(12, 25)})
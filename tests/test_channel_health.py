@@ -0,0 +1,101 @@
+"""Tests for channel delivery health tracking."""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import discord
+
+from bot.utils.channel_health import ChannelHealth
+
+DAY_1 = datetime(2024, 1, 1, 7, 0)
+DAY_2 = datetime(2024, 1, 2, 7, 0)
+DAY_3 = datetime(2024, 1, 3, 7, 0)
+
+
+def make_channel(channel_id=10, guild_id=1, **permissions):
+    channel = MagicMock()
+    channel.id = channel_id
+    channel.guild.id = guild_id
+    channel.permissions_for.return_value = discord.Permissions(**permissions)
+    return channel
+
+
+class TestPermissionCache:
+    """Test cached send permission checks."""
+
+    def test_permissions_are_cached(self):
+        health = ChannelHealth()
+        channel = make_channel(view_channel=True, send_messages=True)
+
+        assert health.can_send(channel) is True
+        assert health.can_send(channel) is True
+        assert channel.permissions_for.call_count == 1
+
+    def test_requires_view_and_send(self):
+        health = ChannelHealth()
+        assert health.can_send(make_channel(10, send_messages=True)) is False
+        assert health.can_send(make_channel(11, view_channel=True)) is False
+
+    def test_guild_invalidation_recomputes(self):
+        health = ChannelHealth()
+        channel = make_channel(view_channel=True)
+        assert health.can_send(channel) is False
+
+        channel.permissions_for.return_value = discord.Permissions(
+            view_channel=True, send_messages=True
+        )
+        health.invalidate_guild(2)
+        assert health.can_send(channel) is False
+
+        health.invalidate_guild(1)
+        assert health.can_send(channel) is True
+
+    def test_mark_forbidden(self):
+        health = ChannelHealth()
+        channel = make_channel(view_channel=True, send_messages=True)
+        health.mark_forbidden(channel.id)
+        assert health.can_send(channel) is False
+
+
+class TestCircuit:
+    """Test failure counting and the circuit breaker."""
+
+    def test_one_failure_per_fire_time(self):
+        health = ChannelHealth()
+        assert health.record_failure(10, "boom", DAY_1) == 1
+        assert health.record_failure(10, "boom", DAY_1) == 1
+        assert health.record_failure(10, "boom", DAY_2) == 2
+
+    def test_circuit_opens_at_threshold(self):
+        health = ChannelHealth(circuit_threshold=2)
+        health.record_failure(10, "boom", DAY_1)
+        assert health.allow(10, DAY_1)
+
+        health.record_failure(10, "boom", DAY_2)
+        assert not health.allow(10, DAY_2 + timedelta(hours=2))
+
+    def test_open_circuit_allows_a_probe_after_the_cooldown(self):
+        health = ChannelHealth(circuit_threshold=1, cooldown=timedelta(days=1))
+        health.record_failure(10, "HTTP 503", DAY_1)
+        assert not health.allow(10, DAY_2 - timedelta(minutes=1))
+        assert health.allow(10, DAY_2)
+
+        # A failed probe waits out another cooldown
+        health.record_failure(10, "HTTP 503", DAY_2)
+        assert not health.allow(10, DAY_2 + timedelta(hours=1))
+        assert health.allow(10, DAY_3)
+
+    def test_invalidation_allows_a_probe(self):
+        health = ChannelHealth(circuit_threshold=1)
+        health.record_failure(10, "boom", DAY_1)
+
+        health.invalidate_channel(10)
+
+        assert health.allow(10, DAY_1)
+        assert health.state(10).failures == 1
+
+    def test_success_closes_circuit(self):
+        health = ChannelHealth(circuit_threshold=1)
+        health.record_failure(10, "boom", DAY_1)
+        health.record_success(10)
+        assert health.allow(10, DAY_1)
+        assert health.state(10).failures == 0
@@ -0,0 +1,63 @@
+"""Tests for the clock abstraction."""
+import asyncio
+import pytest
+from datetime import datetime, time, timedelta
+
+from bot.utils.clock import Clock, VirtualClock
+from bot.utils.time_utils import is_time_to_send
+
+START = datetime(2024, 1, 1, 6, 59)
+
+class TestVirtualClock:
+    """Test VirtualClock functionality."""
+
+    @pytest.mark.asyncio
+    async def test_sleepers_wake_in_order(self):
+        """Test that sleepers wake at their virtual deadlines, in order."""
+        clock = VirtualClock(START)
+        woken = []
+
+        async def sleeper(name, seconds):
+            await clock.sleep(seconds)
+            woken.append((name, clock.now()))
+
+        tasks = [
+            asyncio.create_task(sleeper('late', 120)),
+            asyncio.create_task(sleeper('early', 30)),
+        ]
+        await clock.run_until(START + timedelta(minutes=5))
+        await asyncio.gather(*tasks)
+
+        assert woken == [
+            ('early', START + timedelta(seconds=30)),
+            ('late', START + timedelta(seconds=120)),
+        ]
+        assert clock.now() == START + timedelta(minutes=5)
+
+    @pytest.mark.asyncio
+    async def test_sleepers_past_end_keep_waiting(self):
+        """Test that run_until does not wake sleepers scheduled after the end."""
+        clock = VirtualClock(START)
+        task = asyncio.create_task(clock.sleep(3600))
+
+        await clock.advance(60)
+        assert not task.done()
+
+        await clock.advance(3600)
+        assert task.done()
+
+    def test_is_time_to_send_uses_clock(self):
+        """Test that is_time_to_send reads the injected clock."""
+        clock = VirtualClock(datetime(2024, 1, 1, 7, 30))
+
+        assert is_time_to_send(time(7, 30), clock=clock) is True
+        assert is_time_to_send(time(7, 31), clock=clock) is False
+
+    @pytest.mark.asyncio
+    async def test_system_clock(self):
+        """Test the wall clock implementation."""
+        clock = Clock()
+        before = datetime.utcnow()
+        await clock.sleep(0)
+
+        assert clock.now() >= before
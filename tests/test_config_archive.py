@@ -0,0 +1,79 @@
+"""Tests for the config archive and guild reconciliation."""
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import pytest
+
+from bot.utils.config_archive import ConfigArchive, reconcile_configs
+from bot.utils.config_manager import ConfigManager
+
+
+@pytest.fixture
+async def config_manager(tmp_path):
+    manager = ConfigManager(str(tmp_path / "configs.json"))
+    await manager.wait_until_loaded()
+    yield manager
+    await manager.close()
+
+
+def guild_config(guild_id, message="Hi"):
+    return {"channel_id": guild_id * 10, "time": "07:00", "message": message, "enabled": True}
+
+
+class TestConfigArchive:
+    """Test archiving and looking up configurations."""
+
+    @pytest.mark.asyncio
+    async def test_latest_entry_wins(self, tmp_path):
+        archive = ConfigArchive(str(tmp_path / "archive.ndjson"))
+        await archive.add({1: guild_config(1, "Old"), 2: guild_config(2)})
+        await archive.add({1: guild_config(1, "New")})
+
+        assert await archive.find(1) == guild_config(1, "New")
+        assert await archive.find_many([2, 3]) == {2: guild_config(2)}
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self, tmp_path):
+        archive = ConfigArchive(str(tmp_path / "missing.ndjson"))
+        assert await archive.find(1) is None
+
+
+class TestReconcile:
+    """Test reconciling stored configurations with the bot's guilds."""
+
+    @pytest.mark.asyncio
+    async def test_prunes_and_creates_with_one_write(self, config_manager):
+        await config_manager.set_many({1: guild_config(1), 2: guild_config(2)})
+        notifications: List[Dict[int, Optional[Dict[str, Any]]]] = []
+        config_manager.add_listener(notifications.append)
+
+        with patch.object(config_manager, "_write_configs", wraps=config_manager._write_configs) as write:
+            result = await reconcile_configs(config_manager, [2, 3])
+
+        assert write.call_count == 1
+        assert notifications == [{1: None, 3: await config_manager.get_config(3)}]
+        assert result.removed == [1]
+        assert result.created == [3]
+        assert set(await config_manager.get_all_configs()) == {2, 3}
+
+    @pytest.mark.asyncio
+    async def test_archive_and_restore(self, config_manager, tmp_path):
+        archive = ConfigArchive(str(tmp_path / "archive.ndjson"))
+        await config_manager.set_config(1, guild_config(1, "Custom"))
+
+        await reconcile_configs(config_manager, [], archive)
+        assert await config_manager.get_all_configs() == {}
+
+        result = await reconcile_configs(config_manager, [1], archive)
+        assert result.restored == [1]
+        assert await config_manager.get_config(1) == guild_config(1, "Custom")
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_do_does_not_write(self, config_manager):
+        await config_manager.set_config(1, guild_config(1))
+
+        with patch.object(config_manager, "_write_configs") as write:
+            result = await reconcile_configs(config_manager, [1])
+
+        write.assert_not_called()
+        assert result == ([], [], [])
@@ -0,0 +1,165 @@
+"""Tests for the configuration cog."""
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.cogs.config_cog import ConfigCog, SettingsModal
+from bot.utils.config_manager import ConfigManager
+from bot.utils.delivery_history import DeliveryHistory
+from bot.utils.templates import TemplateCache
+
+
+@pytest.fixture
+async def bot(tmp_path):
+    bot = MagicMock()
+    bot.config_manager = ConfigManager(str(tmp_path / "configs.json"))
+    await bot.config_manager.wait_until_loaded()
+    bot.templates = TemplateCache()
+    bot.delivery_history = DeliveryHistory()
+    bot.scheduler.next_send_time.return_value = datetime(2024, 1, 2, 7, 0)
+    yield bot
+    await bot.config_manager.close()
+
+
+def make_interaction(guild_id=1):
+    interaction = MagicMock()
+    interaction.guild_id = guild_id
+    interaction.guild.name = "Test Guild"
+    interaction.guild.roles = []
+    interaction.response.send_message = AsyncMock()
+    return interaction
+
+
+async def submit(bot, channel_id="10", time="08:30", message="Hello {guild}"):
+    modal = SettingsModal(bot, 1)
+    await modal.setup_form_fields()
+    modal.channel_id_input._value = channel_id
+    modal.time_input._value = time
+    modal.message_input._value = message
+
+    interaction = make_interaction()
+    await modal.on_submit(interaction)
+    return interaction.response.send_message.await_args.args[0]
+
+
+async def show_status(cog, interaction):
+    # Command.callback is typed without the cog it is bound to
+    callback: Any = cog.show_status.callback
+    await callback(cog, interaction)
+
+
+class TestConfigCog:
+    """Test the cog's command registration."""
+
+    @pytest.mark.asyncio
+    async def test_context_menu_is_added_and_removed(self, bot):
+        cog = ConfigCog(bot)
+        bot.tree.add_command.assert_called_once_with(cog.configure_bot_menu)
+        assert cog.configure_bot_menu.name == "Configure Bot"
+
+        await cog.cog_unload()
+        bot.tree.remove_command.assert_called_once_with(
+            "Configure Bot", type=cog.configure_bot_menu.type
+        )
+
+    def test_commands_are_not_available_in_dms(self, bot):
+        cog = ConfigCog(bot)
+        assert cog.configure_bot_menu.guild_only
+        assert cog.toggle_daily.guild_only
+        assert cog.show_status.guild_only
+
+
+class TestSettingsModal:
+    """Test saving settings from the modal."""
+
+    @pytest.mark.asyncio
+    async def test_valid_settings_are_saved(self, bot):
+        reply = await submit(bot)
+
+        assert reply.startswith("✅")
+        config = await bot.config_manager.get_config(1)
+        assert config["channel_id"] == 10
+        assert config["time"] == "08:30"
+        assert config["message"] == "Hello {guild}"
+        assert config["enabled"] is True
+        assert config["start_date"]
+
+    @pytest.mark.asyncio
+    async def test_start_date_is_kept_across_edits(self, bot):
+        await bot.config_manager.set_config(1, {"start_date": "2023-05-01"})
+
+        await submit(bot)
+
+        assert (await bot.config_manager.get_config(1))["start_date"] == "2023-05-01"
+
+    @pytest.mark.asyncio
+    async def test_calendar_settings_are_kept_across_edits(self, bot):
+        await bot.config_manager.set_config(1, {
+            "calendars": ["weekends"],
+            "skip_dates": ["2024-12-25"],
+            "send_dates": ["2024-12-28"],
+        })
+
+        await submit(bot)
+
+        config = await bot.config_manager.get_config(1)
+        assert config["calendars"] == ["weekends"]
+        assert config["skip_dates"] == ["2024-12-25"]
+        assert config["send_dates"] == ["2024-12-28"]
+
+    @pytest.mark.asyncio
+    async def test_attachments_are_kept_across_edits(self, bot):
+        digest = "a" * 64
+        await bot.config_manager.set_config(1, {"attachments": [digest]})
+
+        await submit(bot)
+
+        assert (await bot.config_manager.get_config(1))["attachments"] == [digest]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("fields", [
+        {"channel_id": "general"},
+        {"time": "25:00"},
+        {"message": "Hi {unknown}"},
+    ])
+    async def test_invalid_settings_are_rejected(self, bot, fields):
+        reply = await submit(bot, **fields)
+
+        assert reply.startswith("❌")
+        assert await bot.config_manager.get_config(1) == {}
+
+
+class TestStatus:
+    """Test the /status command."""
+
+    @pytest.mark.asyncio
+    async def test_status_embed(self, bot):
+        cog = ConfigCog(bot)
+        await bot.config_manager.set_config(1, {
+            "channel_id": 10, "time": "07:00", "message": "Hello {guild}", "enabled": True,
+        })
+        bot.delivery_history.record(
+            1, datetime(2024, 1, 1, 7, 0), datetime(2024, 1, 1, 7, 0, 2), sent=True
+        )
+
+        interaction = make_interaction()
+        await show_status(cog, interaction)
+
+        embed = interaction.response.send_message.await_args.kwargs["embed"]
+        fields = {field.name: field.value for field in embed.fields}
+        assert fields["Status"] == "✅ Enabled"
+        assert fields["Channel"] == "<#10>"
+        assert fields["Next Send"] == "2024-01-02 07:00 UTC"
+        assert fields["Last 1 Deliveries"].endswith("0 failed")
+        assert fields["Message Preview"] == "Hello Test Guild"
+
+    @pytest.mark.asyncio
+    async def test_status_without_config(self, bot):
+        cog = ConfigCog(bot)
+        interaction = make_interaction()
+
+        await show_status(cog, interaction)
+
+        assert interaction.response.send_message.await_args.args[0].startswith("❌ No configuration")
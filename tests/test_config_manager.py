@@ -4,6 +4,7 @@ import json
 import pytest
 import tempfile
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 from unittest.mock import AsyncMock, patch
 
 from bot.utils.config_manager import ConfigManager
@@ -157,3 +158,276 @@ class TestConfigManager:
         assert all_configs == {}
         
         await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_identical_messages_stored_once(self, temp_config_file):
+        """Test that guilds sharing a message store its body once."""
+        manager = ConfigManager(str(temp_config_file))
+        await asyncio.sleep(0.1)  # Allow initial load
+        for guild_id in (1, 2, 3):
+            await manager.create_default_config(guild_id)
+        await manager.set_config(4, {'channel_id': 4, 'message': 'Custom', 'enabled': True})
+        await manager.close()
+
+        with open(temp_config_file) as f:
+            saved = json.load(f)
+
+        assert len(saved['bodies']) == 2
+        assert 'message' not in saved['guilds']['1']
+        assert saved['guilds']['1']['message_ref'] == saved['guilds']['2']['message_ref']
+
+        manager2 = ConfigManager(str(temp_config_file))
+        await asyncio.sleep(0.1)  # Allow initial load
+        first = await manager2.get_config(1)
+        second = await manager2.get_config(2)
+        custom = await manager2.get_config(4)
+        await manager2.close()
+
+        assert first['message'] == 'This is a default message. Please configure me!'
+        assert first['message'] is second['message']
+        assert custom['message'] == 'Custom'
+
+    @pytest.mark.asyncio
+    async def test_unreferenced_message_is_dropped(self, temp_config_file):
+        """Test that replaced messages no longer persist."""
+        manager = ConfigManager(str(temp_config_file))
+        await asyncio.sleep(0.1)  # Allow initial load
+        await manager.set_config(1, {'channel_id': 1, 'message': 'Old', 'enabled': True})
+        await manager.update_config(1, {'message': 'New'})
+        await manager.close()
+
+        with open(temp_config_file) as f:
+            saved = json.load(f)
+
+        assert list(saved['bodies'].values()) == ['New']
+
+    @pytest.mark.asyncio
+    async def test_load_legacy_file(self, temp_config_file):
+        """Test loading the flat guild ID -> config layout."""
+        with open(temp_config_file, 'w') as f:
+            json.dump({'12345': {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True}}, f)
+
+        manager = ConfigManager(str(temp_config_file))
+        await asyncio.sleep(0.1)  # Allow initial load
+        config = await manager.get_config(12345)
+        await manager.close()
+
+        assert config['message'] == 'Hi'
+
+    @pytest.mark.asyncio
+    async def test_binary_format_round_trip(self, temp_config_file):
+        """Test persisting configurations as a binary snapshot."""
+        manager = ConfigManager(str(temp_config_file), file_format='binary')
+        await asyncio.sleep(0.1)  # Allow initial load
+        await manager.set_config(1, {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True})
+        await manager.create_default_config(2)
+        await manager.close()
+
+        assert temp_config_file.read_bytes().startswith(b'ANTNSNAP')
+
+        manager2 = ConfigManager(str(temp_config_file), file_format='binary')
+        await asyncio.sleep(0.1)  # Allow initial load
+        config = await manager2.get_config(1)
+        all_configs = await manager2.get_all_configs()
+        await manager2.close()
+
+        assert config == {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True}
+        assert set(all_configs) == {1, 2}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_lookups_while_loading(self, temp_config_file):
+        """Test that guilds are read from the mapped snapshot before the load finishes."""
+        manager = ConfigManager(str(temp_config_file), file_format='binary')
+        await manager.wait_until_loaded()
+        await manager.set_many({
+            guild_id: {'channel_id': guild_id, 'time': '07:00', 'message': f'Hi {guild_id}', 'enabled': True}
+            for guild_id in range(1, 6)
+        })
+        await manager.close()
+
+        with patch.object(ConfigManager, 'LOAD_CHUNK_SIZE', 2):
+            manager2 = ConfigManager(str(temp_config_file), file_format='binary')
+            await asyncio.sleep(0)  # Decode the first chunk only
+
+            snapshot = manager2._snapshot
+            assert snapshot is not None
+            assert (await manager2.get_config(5))['message'] == 'Hi 5'
+            assert await manager2.get_config(6) == {}
+
+            await manager2.wait_until_loaded()
+        assert manager2._snapshot is None
+        assert len(await manager2.get_all_configs()) == 5
+        await manager2.close()
+
+    @pytest.mark.asyncio
+    async def test_changes_while_loading_are_kept(self, temp_config_file):
+        """Test that changes made before a chunked load finishes survive it."""
+        manager = ConfigManager(str(temp_config_file), file_format='binary')
+        await manager.set_many({
+            guild_id: {'channel_id': guild_id, 'time': '07:00', 'message': f'Hi {guild_id}', 'enabled': True}
+            for guild_id in range(1, 6)
+        })
+        await manager.close()
+
+        with patch.object(ConfigManager, 'LOAD_CHUNK_SIZE', 2):
+            manager2 = ConfigManager(str(temp_config_file), file_format='binary')
+            await asyncio.sleep(0)  # Decode the first chunk only
+            assert manager2._snapshot is not None
+
+            await manager2.update_config(5, {'enabled': False})
+            await manager2.create_default_config(6)
+        assert (await manager2.get_config(5))['enabled'] is False
+        assert (await manager2.get_config(5))['message'] == 'Hi 5'
+        assert set(await manager2.get_all_configs()) == {1, 2, 3, 4, 5, 6}
+        await manager2.close()
+
+        manager3 = ConfigManager(str(temp_config_file), file_format='binary')
+        await manager3.wait_until_loaded()
+        assert (await manager3.get_config(5))['enabled'] is False
+        assert 6 in await manager3.get_all_configs()
+        await manager3.close()
+
+    @pytest.mark.asyncio
+    async def test_json_file_is_upgraded_on_load(self, temp_config_file):
+        """Test that a JSON file is rewritten as a snapshot on first load."""
+        with open(temp_config_file, 'w') as f:
+            json.dump({'12345': {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True}}, f)
+
+        manager = ConfigManager(str(temp_config_file), file_format='binary')
+        await manager.wait_until_loaded()
+
+        assert temp_config_file.read_bytes().startswith(b'ANTNSNAP')
+        assert (await manager.get_config(12345))['message'] == 'Hi'
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_update_many_writes_once(self, config_manager):
+        """Test that bulk updates are persisted and announced once."""
+        await config_manager.create_default_config(1)
+        notifications: List[Dict[int, Optional[Dict[str, Any]]]] = []
+        config_manager.add_listener(notifications.append)
+
+        with patch.object(config_manager, '_write_configs', wraps=config_manager._write_configs) as write:
+            await config_manager.update_many({1: {'enabled': True}, 2: {'channel_id': 20}})
+
+        assert write.call_count == 1
+        assert len(notifications) == 1 and set(notifications[0]) == {1, 2}
+        assert (await config_manager.get_config(1))['enabled'] is True
+        created = await config_manager.get_config(2)
+        assert created['channel_id'] == 20
+        assert created['time'] == '07:00'
+
+    @pytest.mark.asyncio
+    async def test_batch_defers_writes(self, config_manager):
+        """Test that changes inside a batch are saved when it exits."""
+        with patch.object(config_manager, '_write_configs', wraps=config_manager._write_configs) as write:
+            async with config_manager.batch():
+                await config_manager.create_default_config(1)
+                await config_manager.update_config(1, {'enabled': True})
+                await config_manager.set_config(2, {'channel_id': 2, 'enabled': False})
+                assert write.call_count == 0
+
+        assert write.call_count == 1
+        assert set(await config_manager.get_all_configs()) == {1, 2}
+
+class TestReload:
+    """Test applying external edits of the configuration file."""
+
+    @staticmethod
+    def write_external(path, guilds, revision):
+        path.write_text(json.dumps({'revision': revision, **guilds}))
+
+    @pytest.mark.asyncio
+    async def test_reload_applies_changed_guilds_only(self, config_manager, temp_config_file):
+        """Test that only guilds differing from memory are announced."""
+        await config_manager.set_many({
+            1: {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True},
+            2: {'channel_id': 2, 'time': '08:00', 'message': 'Hi', 'enabled': True},
+            3: {'channel_id': 3, 'time': '09:00', 'message': 'Hi', 'enabled': True},
+        })
+        notifications: List[Dict[int, Optional[Dict[str, Any]]]] = []
+        config_manager.add_listener(notifications.append)
+
+        self.write_external(temp_config_file, {
+            '1': {'channel_id': 1, 'time': '07:00', 'message': 'Hi', 'enabled': True},
+            '2': {'channel_id': 2, 'time': '10:00', 'message': 'Hi', 'enabled': True},
+        }, config_manager.revision)
+        changes = await config_manager.reload()
+
+        assert set(changes) == {2, 3}
+        assert changes[3] is None
+        assert notifications == [changes]
+        assert (await config_manager.get_config(2))['time'] == '10:00'
+        assert await config_manager.get_config(3) == {}
+
+    @pytest.mark.asyncio
+    async def test_own_writes_are_ignored(self, config_manager):
+        """Test that reloading a file the manager wrote changes nothing."""
+        await config_manager.create_default_config(1)
+        assert await config_manager.reload() == {}
+
+    @pytest.mark.asyncio
+    async def test_stale_edit_is_rejected(self, config_manager, temp_config_file):
+        """Test that an edit based on an old revision cannot undo newer changes."""
+        await config_manager.set_config(1, {'channel_id': 1, 'message': 'A', 'enabled': True})
+        await config_manager.set_config(2, {'channel_id': 2, 'message': 'B', 'enabled': True})
+        base = config_manager.revision
+        await config_manager.update_config(1, {'message': 'Changed by the bot'})
+
+        # Edited from the file as it was at `base`: guild 1 is stale, guild 2 is new
+        self.write_external(temp_config_file, {
+            '1': {'channel_id': 1, 'message': 'A', 'enabled': True},
+            '2': {'channel_id': 2, 'message': 'Edited', 'enabled': True},
+        }, base)
+        changes = await config_manager.reload()
+
+        assert set(changes) == {2}
+        assert (await config_manager.get_config(1))['message'] == 'Changed by the bot'
+        assert (await config_manager.get_config(2))['message'] == 'Edited'
+
+        # The rejected edit is replaced on disk by the kept state
+        assert await config_manager.reload() == {}
+        manager2 = ConfigManager(str(temp_config_file))
+        await manager2.wait_until_loaded()
+        assert (await manager2.get_config(1))['message'] == 'Changed by the bot'
+        await manager2.close()
+
+    @pytest.mark.asyncio
+    async def test_unreadable_edit_is_not_overwritten(self, config_manager, temp_config_file):
+        """Test that a save keeps an external edit that failed to load."""
+        await config_manager.set_config(1, {'channel_id': 1, 'message': 'A', 'enabled': True})
+        temp_config_file.write_text('{"1": {"channel_id": 1, ')
+        assert await config_manager.reload() == {}
+
+        await config_manager.update_config(1, {'enabled': False})
+        assert temp_config_file.read_text() == '{"1": {"channel_id": 1, '
+
+        # Once the file is fixed, the pending change is saved on top of it
+        self.write_external(temp_config_file, {
+            '1': {'channel_id': 1, 'message': 'A', 'enabled': True},
+            '2': {'channel_id': 2, 'message': 'Fixed', 'enabled': True},
+        }, config_manager.revision - 1)
+        await config_manager.update_config(1, {'time': '09:00'})
+        manager2 = ConfigManager(str(temp_config_file))
+        await manager2.wait_until_loaded()
+        assert (await manager2.get_config(1))['enabled'] is False
+        assert (await manager2.get_config(2))['message'] == 'Fixed'
+        await manager2.close()
+
+    @pytest.mark.asyncio
+    async def test_save_merges_unseen_external_edit(self, config_manager, temp_config_file):
+        """Test that a save does not overwrite an edit the watcher has not applied yet."""
+        await config_manager.set_config(1, {'channel_id': 1, 'message': 'A', 'enabled': True})
+        self.write_external(temp_config_file, {
+            '1': {'channel_id': 1, 'message': 'A', 'enabled': True},
+            '2': {'channel_id': 2, 'message': 'External', 'enabled': True},
+        }, config_manager.revision)
+
+        await config_manager.update_config(1, {'enabled': False})
+
+        assert (await config_manager.get_config(2))['message'] == 'External'
+        manager2 = ConfigManager(str(temp_config_file))
+        await manager2.wait_until_loaded()
+        assert set(await manager2.get_all_configs()) == {1, 2}
+        assert (await manager2.get_config(1))['enabled'] is False
+        await manager2.close()
@@ -0,0 +1,94 @@
+"""Tests for configuration import and export."""
+import json
+
+import pytest
+
+from bot.utils.config_transfer import (
+    ConfigImportError,
+    export_line,
+    parse_import_line,
+    read_import,
+    write_export,
+)
+from bot.utils.templates import compile_template
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
+
+
+class TestParseImportLine:
+    """Test validation of single import lines."""
+
+    def test_round_trip(self):
+        config = {
+            "channel_id": 42,
+            "time": "08:30",
+            "message": "Day {day}",
+            "enabled": True,
+            "start_date": "2024-01-01",
+        }
+        guild_id, updates = parse_import_line(export_line(123, config))
+        assert guild_id == 123
+        assert updates == config
+
+    def test_round_trip_of_legacy_message(self):
+        message = "Price: {5} or {{date}} }"
+        _, updates = parse_import_line(export_line(123, {"message": message}))
+        assert updates == {"message": "Price: {{5}} or {{{{date}}}} }}"}
+        assert compile_template(updates["message"]).render({}) == message
+
+    def test_partial_update(self):
+        assert parse_import_line('{"guild_id": "5", "enabled": false}') == (
+            5,
+            {"enabled": False},
+        )
+
+    def test_numeric_string_channel_id(self):
+        _, updates = parse_import_line('{"guild_id": 5, "channel_id": "77"}')
+        assert updates == {"channel_id": 77}
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "not json",
+            "[1, 2]",
+            '{"enabled": true}',
+            '{"guild_id": "abc"}',
+            '{"guild_id": 1, "time": "25:00"}',
+            '{"guild_id": 1, "enabled": "yes"}',
+            '{"guild_id": 1, "message": "{unknown}"}',
+            '{"guild_id": 1, "start_date": "soon"}',
+            '{"guild_id": 1, "colour": "red"}',
+        ],
+    )
+    def test_invalid_lines(self, line):
+        with pytest.raises(ConfigImportError):
+            parse_import_line(line)
+
+
+class TestStreams:
+    """Test reading and writing whole files."""
+
+    @pytest.mark.asyncio
+    async def test_read_import_collects_errors(self):
+        updates, errors = await read_import(
+            _lines(
+                b'{"guild_id": 1, "time": "09:00"}\n',
+                b"\n",
+                b"broken\n",
+                b'{"guild_id": 1, "enabled": true}\n',
+            )
+        )
+        assert updates == {1: {"time": "09:00", "enabled": True}}
+        assert [line for line, _ in errors] == [3]
+
+    @pytest.mark.asyncio
+    async def test_write_export(self, tmp_path):
+        path = tmp_path / "configs.ndjson"
+        count = await write_export([(1, {"enabled": True}), (2, {"enabled": False})], path)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert count == 2
+        assert json.loads(lines[1]) == {"guild_id": "2", "enabled": False}
@@ -0,0 +1,111 @@
+"""Tests for the per-guild delivery history."""
+import pytest
+from datetime import datetime, timedelta
+
+from bot.utils.delivery_history import DeliveryHistory, format_latencies, summarize
+
+FIRE_TIME = datetime(2024, 1, 1, 7, 0)
+
+
+def scheduled(n: int) -> datetime:
+    return FIRE_TIME + timedelta(days=n)
+
+
+def sent_at(n: int, latency_ms: int = 0) -> datetime:
+    return scheduled(n) + timedelta(milliseconds=latency_ms)
+
+
+class TestRingBuffer:
+    """Test recording deliveries."""
+
+    def test_keeps_last_records_in_order(self):
+        """Test that the oldest records are overwritten once the ring is full."""
+        history = DeliveryHistory(size=3)
+        for n in range(5):
+            history.record(1, scheduled(n), sent_at(n, 100 * n), sent=n != 3)
+
+        records = history.records(1)
+        assert [r.scheduled for r in records] == [scheduled(n) for n in (2, 3, 4)]
+        assert [r.outcome for r in records] == ["sent", "failed", "sent"]
+        assert records[2].latency == 0.4
+        assert records[2].sent_at == sent_at(4, 400)
+
+    def test_same_minute_is_replaced(self):
+        """Test that a repeated attempt for a minute replaces its record."""
+        history = DeliveryHistory(size=3)
+        history.record(1, scheduled(0), sent_at(0), sent=False)
+        history.record(1, scheduled(0), sent_at(0, 500), sent=False)
+        assert len(history.records(1)) == 1
+        assert history.records(1)[0].latency == 0.5
+
+    def test_forget_reuses_slot(self):
+        """Test that a forgotten guild's slot is reused without its records."""
+        history = DeliveryHistory(size=2)
+        history.record(1, scheduled(0), sent_at(0), sent=True)
+        history.forget(1)
+        history.record(2, scheduled(0), sent_at(0), sent=True)
+
+        assert history.records(1) == []
+        assert len(history.records(2)) == 1
+        assert len(history._heads) == 1
+
+
+class TestStatistics:
+    """Test latency percentiles and summaries."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles in seconds."""
+        stats = summarize(list(range(1, 101)), failures=2)
+        assert (stats.count, stats.failures) == (102, 2)
+        assert (stats.p50, stats.p90, stats.p99, stats.max) == (0.05, 0.09, 0.099, 0.1)
+        assert summarize([], 1).p50 is None
+        assert format_latencies(stats) == "p50 50 ms · p90 90 ms · p99 99 ms · max 100 ms"
+
+    def test_summary_ranks_failing_guilds(self):
+        """Test the bot-wide summary and the guilds with the most failures."""
+        history = DeliveryHistory(size=4)
+        for n in range(4):
+            history.record(1, scheduled(n), sent_at(n, 1000), sent=True)
+            history.record(2, scheduled(n), sent_at(n, 2000), sent=n < 2)
+            history.record(3, scheduled(n), sent_at(n, 3000), sent=n < 3)
+
+        stats, failing = history.summary(top=5)
+        assert (stats.count, stats.failures) == (12, 3)
+        assert stats.max == 3.0
+        assert failing == [(2, 2), (3, 1)]
+        assert history.stats(1).failures == 0
+        assert history.stats(99).count == 0
+
+
+class TestPersistence:
+    """Test saving the history in batches."""
+
+    @pytest.mark.asyncio
+    async def test_flush_and_load(self, tmp_path):
+        """Test that flushed records and forgotten guilds survive a restart."""
+        path = tmp_path / "history.bin"
+        history = DeliveryHistory(str(path), size=3)
+        history.record(1, scheduled(0), sent_at(0, 250), sent=True)
+        history.record(2, scheduled(0), sent_at(0), sent=False)
+        await history.flush()
+        history.forget(2)
+        await history.flush()
+
+        loaded = DeliveryHistory(str(path), size=3)
+        await loaded.load()
+        assert loaded.records(1) == history.records(1)
+        assert loaded.records(2) == []
+
+    @pytest.mark.asyncio
+    async def test_log_is_compacted(self, tmp_path):
+        """Test that the log is rewritten once it outgrows the live records."""
+        path = tmp_path / "history.bin"
+        history = DeliveryHistory(str(path), size=2)
+        for n in range(10):
+            history.record(1, scheduled(n), sent_at(n), sent=True)
+            await history.flush()
+
+        assert path.stat().st_size <= 2 * 2 * 17
+        loaded = DeliveryHistory(str(path), size=2)
+        await loaded.load()
+        assert [r.scheduled for r in loaded.records(1)] == [scheduled(8), scheduled(9)]
@@ -0,0 +1,71 @@
+"""Tests for the fake Discord REST server used by the benchmarks."""
+import aiohttp
+import pytest
+
+from benchmarks.fake_discord import API_PREFIX, FakeDiscordOptions, FakeDiscordServer
+
+CHANNEL_ID = 555
+GUILD_ID = 777
+
+
+@pytest.fixture
+async def fake_server():
+    """Start a fake server with one known channel and a tight route bucket."""
+    server = FakeDiscordServer(
+        {CHANNEL_ID: GUILD_ID},
+        FakeDiscordOptions(route_limit=2, route_window=60.0, forbidden_channels={999}),
+    )
+    server.channels[999] = GUILD_ID
+    base_url = await server.start()
+    yield server, base_url + API_PREFIX
+    await server.stop()
+
+
+class TestFakeDiscordServer:
+    """Test the fake server's REST behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_create_message_records_and_sends_ratelimit_headers(self, fake_server):
+        """Test that accepted messages are recorded with rate-limit headers."""
+        server, api = fake_server
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{api}/channels/{CHANNEL_ID}/messages", json={"content": "hi"}
+            ) as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"] == "application/json"
+                assert response.headers["X-RateLimit-Limit"] == "2"
+                assert response.headers["X-RateLimit-Remaining"] == "1"
+                assert "X-RateLimit-Reset-After" in response.headers
+
+        assert [m.content for m in server.messages] == ["hi"]
+
+    @pytest.mark.asyncio
+    async def test_route_bucket_exhaustion_returns_429(self, fake_server):
+        """Test that exceeding the per-channel bucket answers 429."""
+        server, api = fake_server
+        async with aiohttp.ClientSession() as session:
+            statuses = []
+            for _ in range(3):
+                async with session.post(
+                    f"{api}/channels/{CHANNEL_ID}/messages", json={"content": "x"}
+                ) as response:
+                    statuses.append(response.status)
+                    body = await response.json()
+
+        assert statuses == [200, 200, 429]
+        assert body["global"] is False
+        assert body["retry_after"] > 0
+        assert server.rate_limited_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_forbidden_channels(self, fake_server):
+        """Test 404 for unknown channels and 403 for forbidden ones."""
+        _, api = fake_server
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{api}/channels/1") as response:
+                assert response.status == 404
+            async with session.post(
+                f"{api}/channels/999/messages", json={"content": "x"}
+            ) as response:
+                assert response.status == 403
@@ -0,0 +1,62 @@
+"""Tests for the configuration file watcher."""
+import asyncio
+import os
+
+import pytest
+
+from bot.utils.file_watcher import FileWatcher
+
+
+async def wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_detects_atomic_replace(tmp_path, use_inotify):
+    """Test that a file replaced by rename triggers one callback."""
+    path = tmp_path / "configs.json"
+    path.write_text("{}")
+    calls = []
+
+    async def on_change():
+        calls.append(path.read_text())
+
+    watcher = FileWatcher(path, on_change, poll_interval=0.05, debounce=0.05, use_inotify=use_inotify)
+    await watcher.start()
+    try:
+        # Make sure the polled mtime changes even on coarse filesystems
+        await asyncio.sleep(0.05)
+        temp = tmp_path / "configs.json.tmp"
+        temp.write_text('{"1": {}}')
+        os.replace(temp, path)
+
+        await wait_for(lambda: calls)
+        await asyncio.sleep(0.2)
+        assert calls == ['{"1": {}}']
+    finally:
+        await watcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_ignores_other_files(tmp_path):
+    """Test that changes to neighbouring files are ignored."""
+    path = tmp_path / "configs.json"
+    path.write_text("{}")
+    calls = []
+
+    async def on_change():
+        calls.append(True)
+
+    watcher = FileWatcher(path, on_change, debounce=0.05)
+    await watcher.start()
+    try:
+        (tmp_path / "other.json").write_text("{}")
+        await asyncio.sleep(0.2)
+        assert calls == []
+    finally:
+        await watcher.stop()
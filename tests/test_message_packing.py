@@ -0,0 +1,42 @@
+"""Tests for packing messages into Discord's length limit."""
+from bot.utils.message_packing import pack_messages, split_message
+
+
+class TestSplitMessage:
+    """Test splitting long contents."""
+
+    def test_short_content_is_kept(self):
+        """Test that content within the limit is a single piece."""
+        assert split_message("hello", 10) == ["hello"]
+        assert split_message("", 10) == [""]
+
+    def test_prefers_paragraph_then_line_breaks(self):
+        """Test that pieces end at the best available break."""
+        assert split_message("aaaa\n\nbbbb\ncccc", 12) == ["aaaa", "bbbb\ncccc"]
+        assert split_message("aaaa\nbbbb cccc", 10) == ["aaaa", "bbbb cccc"]
+        assert split_message("aaaa bbbb cccc", 10) == ["aaaa bbbb", "cccc"]
+
+    def test_hard_cut_without_breaks(self):
+        """Test that text without breaks is cut at the limit."""
+        assert split_message("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+class TestPackMessages:
+    """Test combining messages."""
+
+    def test_merges_within_limit(self):
+        """Test that messages that fit are joined with a blank line."""
+        assert pack_messages(["one", "two", "three"], 20) == [("one\n\ntwo\n\nthree", [0, 1, 2])]
+
+    def test_starts_new_message_when_full(self):
+        """Test that a message that does not fit starts the next send."""
+        assert pack_messages(["aaaaaa", "bbbbbb", "cc"], 10) == [
+            ("aaaaaa", [0]),
+            ("bbbbbb\n\ncc", [1, 2]),
+        ]
+
+    def test_long_message_spans_sends(self):
+        """Test that a message over the limit is split and tracked in each piece."""
+        packed = pack_messages(["x" * 15, "y"], 10)
+        assert packed == [("x" * 10, [0]), ("xxxxx\n\ny", [0, 1])]
+        assert all(len(content) <= 10 for content, _ in packed)
@@ -0,0 +1,66 @@
+"""Tests for runtime profiles and JSON codecs."""
+import asyncio
+
+import pytest
+
+from bot.core import runtime
+from bot.utils import json_codec
+from bot.utils.config_manager import ConfigManager
+from bot.utils.json_codec import STDLIB_CODEC, get_codec
+
+CONFIG = {"channel_id": 1, "time": "07:00", "message": "Grüße", "enabled": True, "note": "x"}
+
+
+@pytest.fixture(autouse=True)
+def restore_event_loop_policy():
+    yield
+    asyncio.set_event_loop_policy(None)
+
+
+class TestJsonCodec:
+    """Test codec selection and round trips."""
+
+    @pytest.mark.parametrize("fast", [False, True])
+    @pytest.mark.parametrize("indent", [False, True])
+    def test_round_trip(self, fast, indent):
+        codec = get_codec(fast)
+        assert codec.loads(codec.dumps({"1": CONFIG}, indent=indent)) == {"1": CONFIG}
+
+    def test_falls_back_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(json_codec, "orjson", None)
+        assert get_codec(fast=True) is STDLIB_CODEC
+
+
+class TestRuntimeProfile:
+    """Test profile application."""
+
+    def test_standard_profile(self):
+        assert runtime.install_event_loop("standard") == "asyncio"
+        assert runtime.get_json_codec("standard") is STDLIB_CODEC
+
+    def test_performance_profile_without_speedups(self, monkeypatch):
+        monkeypatch.setattr(runtime, "uvloop", None)
+        monkeypatch.setattr(json_codec, "orjson", None)
+
+        assert runtime.install_event_loop("performance") == "asyncio"
+        assert runtime.get_json_codec("performance") is STDLIB_CODEC
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            runtime.install_event_loop("turbo")
+        with pytest.raises(ValueError):
+            runtime.get_json_codec("turbo")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_format", ConfigManager.FILE_FORMATS)
+async def test_config_files_are_codec_independent(tmp_path, file_format):
+    """Test that a file written with one codec loads with the other."""
+    path = tmp_path / "configs.json"
+    writer = ConfigManager(str(path), file_format=file_format, json_codec=get_codec(True))
+    await writer.wait_until_loaded()
+    await writer.set_config(1, dict(CONFIG))
+
+    reader = ConfigManager(str(path), file_format=file_format, json_codec=STDLIB_CODEC)
+    await reader.wait_until_loaded()
+    assert await reader.get_config(1) == CONFIG
@@ -0,0 +1,392 @@
+"""Tests for the message scheduler."""
+import discord
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.core.scheduler import MessageScheduler
+from bot.utils.attachments import AttachmentCache, AttachmentStore
+from bot.utils.clock import VirtualClock
+from bot.utils.config_manager import ConfigManager
+from bot.utils.templates import TemplateCache
+
+FIRE_TIME = datetime(2024, 1, 1, 7, 0)
+
+@pytest.fixture
+async def scheduler(tmp_path):
+    """Create a scheduler backed by a real ConfigManager and fake channels."""
+    bot = MagicMock()
+    bot.config_manager = ConfigManager(str(tmp_path / "configs.json"))
+    await bot.config_manager.wait_until_loaded()
+    bot.templates = TemplateCache()
+
+    channels = {}
+
+    def get_channel(channel_id):
+        if channel_id not in channels:
+            channel = MagicMock()
+            channel.id = channel_id
+            channel.guild.name = f"Guild {channel_id}"
+            channel.send = AsyncMock()
+            channels[channel_id] = channel
+        return channels[channel_id]
+
+    bot.get_channel.side_effect = get_channel
+    bot.channels = channels
+
+    scheduler = MessageScheduler(bot)
+    yield scheduler
+    await bot.config_manager.close()
+
+async def add_guild(scheduler, guild_id, time_str='07:00', enabled=True, message='Hi'):
+    await scheduler.bot.config_manager.set_config(guild_id, {
+        'channel_id': guild_id * 10,
+        'time': time_str,
+        'message': message,
+        'enabled': enabled,
+    })
+
+class TestScheduleIndex:
+    """Test the per-minute schedule index."""
+
+    @pytest.mark.asyncio
+    async def test_only_due_guilds_are_indexed(self, scheduler):
+        """Test that enabled guilds are indexed by their scheduled minute."""
+        await add_guild(scheduler, 1)
+        await add_guild(scheduler, 2, time_str='08:15')
+        await add_guild(scheduler, 3, enabled=False)
+
+        assert scheduler._due_guilds(FIRE_TIME) == {1}
+        assert scheduler._due_guilds(datetime(2024, 1, 1, 8, 15)) == {2}
+
+    @pytest.mark.asyncio
+    async def test_index_follows_config_changes(self, scheduler):
+        """Test that updates and deletions move guilds between slots."""
+        await add_guild(scheduler, 1)
+        await scheduler.bot.config_manager.update_config(1, {'time': '09:30'})
+
+        assert scheduler._due_guilds(FIRE_TIME) == set()
+        assert scheduler._due_guilds(datetime(2024, 1, 1, 9, 30)) == {1}
+
+        await scheduler.bot.config_manager.delete_config(1)
+        assert scheduler._due_guilds(datetime(2024, 1, 1, 9, 30)) == set()
+
+class TestDelivery:
+    """Test pre-warming and sending."""
+
+    @pytest.mark.asyncio
+    async def test_prewarm_stages_rendered_messages(self, scheduler):
+        """Test that pre-warm resolves channels and renders ahead of time."""
+        await add_guild(scheduler, 1, message='Hello {guild} on {date}')
+
+        await scheduler._prewarm(FIRE_TIME)
+
+        staged = scheduler._ready[1]
+        assert staged.content == 'Hello Guild 10 on 2024-01-01'
+        scheduler.bot.channels[10].send.assert_not_called()
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        scheduler.bot.channels[10].send.assert_awaited_once_with('Hello Guild 10 on 2024-01-01')
+        assert scheduler.last_sent_dates[1] == FIRE_TIME.date()
+        assert scheduler._ready == {}
+
+    @pytest.mark.asyncio
+    async def test_config_change_discards_staged_message(self, scheduler):
+        """Test that a change after pre-warm is picked up at send time."""
+        await add_guild(scheduler, 1, message='Old')
+        await scheduler._prewarm(FIRE_TIME)
+
+        await scheduler.bot.config_manager.update_config(1, {'message': 'New'})
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        scheduler.bot.channels[10].send.assert_awaited_once_with('New')
+
+    @pytest.mark.asyncio
+    async def test_sends_once_per_day(self, scheduler):
+        """Test that a guild is not sent to twice on the same date."""
+        await add_guild(scheduler, 1)
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        assert scheduler.bot.channels[10].send.await_count == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('coalesce', [True, False])
+    async def test_error_in_one_channel_does_not_stop_the_burst(self, scheduler, coalesce):
+        """Test that an unexpected delivery error only affects its own channel."""
+        scheduler.coalesce = coalesce
+        scheduler.history.flush = AsyncMock()
+        await add_guild(scheduler, 1)
+        await add_guild(scheduler, 2)
+        deliver_channel = scheduler._deliver_channel
+
+        async def failing_first(batch, current_time):
+            if batch[0].guild_id == 1:
+                raise RuntimeError('boom')
+            await deliver_channel(batch, current_time)
+
+        scheduler._deliver_channel = failing_first
+        await scheduler._prewarm(FIRE_TIME)
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        scheduler.bot.channels[20].send.assert_awaited_once_with('Hi')
+        scheduler.history.flush.assert_awaited_once()
+
+class TestChannelHealth:
+    """Test permission pre-checks and auto-disabling."""
+
+    @pytest.mark.asyncio
+    async def test_missing_permission_skips_send(self, scheduler):
+        """Test that a channel without Send Messages is never called."""
+        await add_guild(scheduler, 1)
+        channel = scheduler.bot.get_channel(10)
+        channel.permissions_for.return_value = discord.Permissions(view_channel=True)
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        channel.send.assert_not_called()
+        assert scheduler.health.state(10).failures == 1
+
+    @pytest.mark.asyncio
+    async def test_channel_rejected_at_prewarm_is_not_fetched_again(self, scheduler):
+        """Test that a missing channel costs one fetch per day, not two."""
+        await add_guild(scheduler, 1)
+        scheduler.bot.get_channel.side_effect = lambda channel_id: None
+        scheduler.bot.fetch_channel = AsyncMock(
+            side_effect=discord.NotFound(MagicMock(status=404), 'gone')
+        )
+
+        await scheduler._prewarm(FIRE_TIME)
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        scheduler.bot.fetch_channel.assert_awaited_once_with(10)
+        assert scheduler.health.state(10).failures == 1
+        assert [r.outcome for r in scheduler.history.records(1)] == ['failed']
+
+    @pytest.mark.asyncio
+    async def test_repeated_failures_disable_guild(self, scheduler):
+        """Test that a guild is disabled and its owner told after the threshold."""
+        await add_guild(scheduler, 1)
+        channel = scheduler.bot.get_channel(10)
+        channel.send.side_effect = RuntimeError('boom')
+        owner = scheduler.bot.get_guild.return_value.owner
+        owner.send = AsyncMock()
+
+        for day in range(1, 6):
+            await scheduler._check_and_send_messages(datetime(2024, 1, day, 7, 0))
+
+        # The open circuit still lets one attempt through each day
+        assert channel.send.await_count == 5
+        assert (await scheduler.bot.config_manager.get_config(1))['enabled'] is False
+        assert scheduler._due_guilds(FIRE_TIME) == set()
+        owner.send.assert_awaited_once()
+        assert '<#10>' in owner.send.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_every_guild_of_a_failing_shared_channel_is_disabled(self, scheduler):
+        """Test that disabling one guild does not reset the count of the others."""
+        await add_guild(scheduler, 1)
+        await scheduler.bot.config_manager.set_config(2, {
+            'channel_id': 10, 'time': '07:00', 'message': 'Hi', 'enabled': True,
+        })
+        scheduler.bot.get_channel(10).send.side_effect = RuntimeError('boom')
+        owner = scheduler.bot.get_guild.return_value.owner
+        owner.send = AsyncMock()
+
+        for day in range(1, 6):
+            await scheduler._check_and_send_messages(datetime(2024, 1, day, 7, 0))
+
+        for guild_id in (1, 2):
+            assert (await scheduler.bot.config_manager.get_config(guild_id))['enabled'] is False
+        assert owner.send.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_retries_a_recovered_channel(self, scheduler):
+        """Test that transient errors do not keep a healthy channel paused."""
+        await add_guild(scheduler, 1)
+        channel = scheduler.bot.get_channel(10)
+        channel.send.side_effect = [RuntimeError('503 Service Unavailable')] * 3 + [None]
+
+        for day in range(1, 5):
+            await scheduler._check_and_send_messages(datetime(2024, 1, day, 7, 0))
+
+        assert channel.send.await_count == 4
+        assert scheduler.health.allow(10, datetime(2024, 1, 4, 8, 0))
+        assert (await scheduler.bot.config_manager.get_config(1))['enabled'] is True
+
+    @pytest.mark.asyncio
+    async def test_circuit_open_skips_do_not_count_as_failures(self, scheduler):
+        """Test that a guild skipped by an open circuit is not pushed towards auto-disabling."""
+        scheduler.health.circuit_threshold = 1
+        await add_guild(scheduler, 1)
+        await scheduler.bot.config_manager.set_config(2, {
+            'channel_id': 10, 'time': '09:00', 'message': 'Hi', 'enabled': True,
+        })
+        channel = scheduler.bot.get_channel(10)
+        channel.send.side_effect = RuntimeError('boom')
+
+        await scheduler._check_and_send_messages(datetime(2024, 1, 1, 7, 0))
+        await scheduler._check_and_send_messages(datetime(2024, 1, 1, 9, 0))
+
+        assert channel.send.await_count == 1
+        assert scheduler.health.state(10).failures == 1
+        assert [r.outcome for r in scheduler.history.records(2)] == ['failed']
+
+    @pytest.mark.asyncio
+    async def test_success_resets_failures(self, scheduler):
+        """Test that one delivered message clears earlier failures."""
+        await add_guild(scheduler, 1)
+        channel = scheduler.bot.get_channel(10)
+        channel.send.side_effect = [RuntimeError('boom'), None]
+
+        await scheduler._check_and_send_messages(datetime(2024, 1, 1, 7, 0))
+        await scheduler._check_and_send_messages(datetime(2024, 1, 2, 7, 0))
+
+        assert scheduler.health.state(10).failures == 0
+
+class TestSkipCalendars:
+    """Test skipping days excluded by calendars."""
+
+    @pytest.mark.asyncio
+    async def test_skipped_day_is_not_sent(self, scheduler):
+        """Test that a guild's skip date suppresses that day's send only."""
+        await add_guild(scheduler, 1)
+        await scheduler.bot.config_manager.update_config(1, {'skip_dates': ['2024-01-01']})
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+        # Skipped before the channel is even resolved
+        assert 10 not in scheduler.bot.channels
+
+        await scheduler._check_and_send_messages(datetime(2024, 1, 2, 7, 0))
+        scheduler.bot.channels[10].send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_next_send_time_skips_days(self, scheduler):
+        """Test that the next send time moves past sent and skipped days."""
+        await add_guild(scheduler, 1)
+        config_manager = scheduler.bot.config_manager
+        await config_manager.update_config(1, {'skip_dates': ['2024-01-02']})
+        config = await config_manager.get_config(1)
+
+        assert scheduler.next_send_time(1, config, datetime(2024, 1, 1, 6, 0)) == FIRE_TIME
+        assert scheduler.next_send_time(1, config, datetime(2024, 1, 1, 8, 0)) == datetime(2024, 1, 3, 7, 0)
+
+        await config_manager.update_config(1, {'enabled': False})
+        assert scheduler.next_send_time(1, await config_manager.get_config(1), FIRE_TIME) is None
+
+class TestCoalescing:
+    """Test merging messages bound for the same channel."""
+
+    @pytest.mark.asyncio
+    async def test_same_channel_messages_share_a_send(self, scheduler):
+        """Test that guilds posting to one channel are merged into one send."""
+        await add_guild(scheduler, 1, message='First')
+        await add_guild(scheduler, 2, message='Second')
+        await scheduler.bot.config_manager.update_config(2, {'channel_id': 10})
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        scheduler.bot.channels[10].send.assert_awaited_once_with('First\n\nSecond')
+        assert scheduler.last_sent_dates == {1: FIRE_TIME.date(), 2: FIRE_TIME.date()}
+
+    @pytest.mark.asyncio
+    async def test_oversized_batch_is_split(self, scheduler):
+        """Test that messages over the length limit go out in several sends."""
+        await add_guild(scheduler, 1, message='a' * 1500)
+        await add_guild(scheduler, 2, message='b' * 1500)
+        await scheduler.bot.config_manager.update_config(2, {'channel_id': 10})
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        sent = [call.args[0] for call in scheduler.bot.channels[10].send.await_args_list]
+        assert sent == ['a' * 1500, 'b' * 1500]
+
+    @pytest.mark.asyncio
+    async def test_failed_send_fails_every_merged_guild(self, scheduler):
+        """Test that a failed merged send counts against each guild in it."""
+        await add_guild(scheduler, 1)
+        await add_guild(scheduler, 2)
+        await scheduler.bot.config_manager.update_config(2, {'channel_id': 10})
+        channel = scheduler.bot.get_channel(10)
+        channel.send.side_effect = discord.NotFound(MagicMock(status=404), 'gone')
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        channel.send.assert_awaited_once()
+        assert scheduler.last_sent_dates == {}
+        assert scheduler.health.state(10).failures == 1
+
+    @pytest.mark.asyncio
+    async def test_messages_with_attachments_are_sent_alone(self, scheduler, tmp_path):
+        """Test that a message with files is not merged with other messages."""
+        store = AttachmentStore(str(tmp_path / "attachments"))
+
+        async def body():
+            yield b"png"
+
+        stored = await store.add(body(), "cat.png")
+        scheduler.attachments = AttachmentCache(store)
+        await add_guild(scheduler, 1, message='First')
+        await add_guild(scheduler, 2, message='Second')
+        await scheduler.bot.config_manager.update_config(
+            2, {'channel_id': 10, 'attachments': [stored.digest]}
+        )
+
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        calls = scheduler.bot.channels[10].send.await_args_list
+        assert [call.args[0] for call in calls[:1]] == ['First']
+        assert calls[1].kwargs['content'] == 'Second'
+        assert calls[1].kwargs['files'][0].filename == 'cat.png'
+
+class TestDeliveryHistory:
+    """Test recording deliveries in the history."""
+
+    @pytest.mark.asyncio
+    async def test_sends_and_failures_are_recorded(self, scheduler):
+        """Test that each guild gets one record per delivery attempt."""
+        await add_guild(scheduler, 1)
+        await add_guild(scheduler, 2)
+        scheduler.bot.get_channel(20).send.side_effect = discord.NotFound(MagicMock(status=404), 'gone')
+
+        await scheduler._prewarm(FIRE_TIME)
+        await scheduler._check_and_send_messages(FIRE_TIME)
+
+        assert [r.outcome for r in scheduler.history.records(1)] == ['sent']
+        assert [r.outcome for r in scheduler.history.records(2)] == ['failed']
+
+        await scheduler.bot.config_manager.delete_config(1)
+        assert scheduler.history.records(1) == []
+
+class TestSchedulerLoop:
+    """Test the minute loop in virtual time."""
+
+    @pytest.mark.asyncio
+    async def test_minute_passed_during_slow_burst_is_caught_up(self, scheduler):
+        """Test that a burst longer than a minute does not skip the next minute."""
+        clock = VirtualClock(datetime(2024, 1, 1, 6, 59, 30))
+        scheduler.clock = clock
+        scheduler.bot.wait_until_ready = AsyncMock()
+        scheduler.bot.is_closed = MagicMock(return_value=False)
+
+        for guild_id in range(1, 91):
+            await add_guild(scheduler, guild_id)
+        await add_guild(scheduler, 9999, time_str='07:01')
+
+        sent_at = {}
+        for guild_id in [*range(1, 91), 9999]:
+            async def send(content, guild_id=guild_id):
+                # Each send takes a second, so the 07:00 burst lasts 90 seconds
+                await clock.sleep(1)
+                sent_at[guild_id] = clock.now()
+            scheduler.bot.get_channel(guild_id * 10).send.side_effect = send
+
+        await scheduler.start()
+        await clock.run_until(datetime(2024, 1, 1, 7, 5))
+        await scheduler.stop()
+
+        assert len(sent_at) == 91
+        assert sent_at[9999] - datetime(2024, 1, 1, 7, 1) < timedelta(minutes=1)
+        assert scheduler.last_sent_dates[9999] == FIRE_TIME.date()
@@ -0,0 +1,88 @@
+"""Tests for the virtual-time scheduling simulation."""
+import json
+import pytest
+from datetime import datetime
+
+from benchmarks.simulate import run_simulation, synthetic_configs
+
+class TestSimulation:
+    """Test the simulation runner against the real scheduler loop."""
+
+    @pytest.mark.asyncio
+    async def test_every_guild_sent_once_per_day(self, tmp_path):
+        """Test a two-day replay has no duplicate or missed sends."""
+        config_path = tmp_path / "configs.json"
+        config_path.write_text(json.dumps({
+            '1': {'channel_id': 10, 'time': '07:00', 'message': 'a', 'enabled': True},
+            '2': {'channel_id': 20, 'time': '07:00', 'message': 'b', 'enabled': True},
+            '3': {'channel_id': 30, 'time': '23:59', 'message': 'c', 'enabled': True},
+            '4': {'channel_id': 40, 'time': '12:00', 'message': 'd', 'enabled': False},
+        }))
+
+        report = await run_simulation(str(config_path), days=2, start=datetime(2024, 1, 1))
+
+        assert report.total_sends == 6
+        assert report.sends_per_minute[datetime(2024, 1, 1, 7, 0)] == 2
+        assert report.peak_queue_depth == 2
+        assert report.duplicates == []
+        assert report.missed == []
+
+    @pytest.mark.asyncio
+    async def test_synthetic_configs(self, tmp_path):
+        """Test a synthetic day matches the number of enabled guilds."""
+        configs = synthetic_configs(200, seed=7)
+        config_path = tmp_path / "configs.json"
+        config_path.write_text(json.dumps(configs))
+
+        report = await run_simulation(str(config_path), days=1, start=datetime(2024, 1, 1))
+
+        enabled = sum(1 for config in configs.values() if config['enabled'])
+        assert report.total_sends == enabled
+        assert report.missed == []
+        assert report.duplicates == []
+
+    @pytest.mark.asyncio
+    async def test_source_file_is_not_modified(self, tmp_path):
+        """Test that the replayed configuration file is left untouched."""
+        config_path = tmp_path / "configs.json"
+        original = json.dumps({'1': {'channel_id': 10, 'time': '07:00', 'message': 'a', 'enabled': True}})
+        config_path.write_text(original)
+
+        await run_simulation(str(config_path), days=1, start=datetime(2024, 1, 1))
+
+        assert config_path.read_text() == original
+
+    @pytest.mark.asyncio
+    async def test_shared_channel_sends_count_every_guild(self, tmp_path):
+        """Test that a coalesced send counts for each guild it carries."""
+        config_path = tmp_path / "configs.json"
+        config_path.write_text(json.dumps({
+            '1': {'channel_id': 10, 'time': '07:00', 'message': 'a', 'enabled': True},
+            '2': {'channel_id': 10, 'time': '07:00', 'message': 'b', 'enabled': True},
+        }))
+
+        report = await run_simulation(str(config_path), days=1, start=datetime(2024, 1, 1))
+
+        assert report.total_sends == 1
+        assert report.missed == []
+        assert report.duplicates == []
+
+    @pytest.mark.asyncio
+    async def test_send_latency_overrunning_a_minute(self, tmp_path):
+        """Test that a burst longer than a minute still reaches the next minute's guilds."""
+        configs = {
+            str(i): {'channel_id': 100 + i, 'time': '07:00', 'message': 'a', 'enabled': True}
+            for i in range(1, 91)
+        }
+        configs['9999'] = {'channel_id': 9999, 'time': '07:01', 'message': 'b', 'enabled': True}
+        config_path = tmp_path / "configs.json"
+        config_path.write_text(json.dumps(configs))
+
+        report = await run_simulation(
+            str(config_path), days=1, start=datetime(2024, 1, 1), send_latency=1
+        )
+
+        assert report.total_sends == 91
+        assert report.sends_per_minute[datetime(2024, 1, 1, 7, 0)] == 59
+        assert report.missed == []
+        assert report.duplicates == []
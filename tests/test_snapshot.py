@@ -0,0 +1,100 @@
+"""Tests for the binary configuration snapshot format."""
+import struct
+import zlib
+
+import pytest
+
+from bot.utils.body_store import body_digest
+from bot.utils.snapshot import (
+    SnapshotError,
+    SnapshotReader,
+    decode_record,
+    encode_record,
+    encode_snapshot,
+    is_snapshot,
+)
+
+LONG_BODY = "Good morning! " * 200
+
+@pytest.fixture
+def snapshot_bytes():
+    """Encode a snapshot with three guilds sharing two bodies."""
+    short_ref = body_digest("Hi")
+    long_ref = body_digest(LONG_BODY)
+    guilds = {
+        30: {'channel_id': 3, 'time': '07:00', 'message_ref': short_ref, 'enabled': True},
+        10: {'channel_id': 1, 'time': '08:00', 'message_ref': long_ref, 'enabled': False},
+        20: {'channel_id': 2, 'time': '09:00', 'message_ref': short_ref, 'enabled': True},
+    }
+    bodies = {
+        short_ref: ("Hi".encode(), False),
+        long_ref: (zlib.compress(LONG_BODY.encode()), True),
+    }
+    return encode_snapshot(guilds, bodies)
+
+class TestSnapshot:
+    """Test snapshot encoding and random access."""
+
+    def test_round_trip(self, snapshot_bytes):
+        """Test reading every record and body back."""
+        reader = SnapshotReader(snapshot_bytes)
+
+        assert is_snapshot(snapshot_bytes)
+        assert len(reader) == 3
+        assert list(reader.guild_ids()) == [10, 20, 30]
+        assert set(reader.bodies().values()) == {"Hi", LONG_BODY}
+        assert dict(reader.records())[20]['time'] == '09:00'
+
+    def test_single_guild_lookup(self, snapshot_bytes):
+        """Test resolving one guild with its message."""
+        reader = SnapshotReader(snapshot_bytes)
+
+        config = reader.get(10)
+        assert config is not None and config['message'] == LONG_BODY
+        assert reader.get(30) == {'channel_id': 3, 'time': '07:00', 'message': 'Hi', 'enabled': True}
+        assert reader.get(99) is None
+
+    def test_memory_mapped_file(self, snapshot_bytes, tmp_path):
+        """Test opening a snapshot file through mmap."""
+        path = tmp_path / "configs.bin"
+        path.write_bytes(snapshot_bytes)
+
+        with SnapshotReader.open(path) as reader:
+            config = reader.get(20)
+            assert config is not None and config['message'] == 'Hi'
+
+    def test_rejects_other_data(self, snapshot_bytes, tmp_path):
+        """Test that JSON and truncated snapshots are rejected."""
+        with pytest.raises(SnapshotError):
+            SnapshotReader(b'{"1": {}}')
+        with pytest.raises(SnapshotError):
+            SnapshotReader(snapshot_bytes[:40])
+
+        path = tmp_path / "empty.json"
+        path.write_bytes(b"")
+        with pytest.raises(SnapshotError):
+            SnapshotReader.open(path)
+
+    def test_revision(self):
+        """Test that the revision is stored, and reads as 0 from version 1."""
+        guilds = {1: {'channel_id': 1, 'enabled': True}}
+        snapshot = encode_snapshot(guilds, {}, revision=42)
+        assert SnapshotReader(snapshot).revision == 42
+
+        # Version 1 headers end before the revision field
+        version_1 = struct.pack("<8sHHIIQQ", b"ANTNSNAP", 1, 0, 0, 0, 36, 36)
+        reader = SnapshotReader(version_1)
+        assert reader.revision == 0
+        assert len(reader) == 0
+
+    def test_unpacked_fields_fall_back_to_extras(self):
+        """Test records whose values do not fit the packed fields."""
+        record = {
+            'channel_id': None,
+            'time': '7:00',
+            'enabled': True,
+            'start_date': '2024-01-01',
+        }
+
+        assert decode_record(encode_record(record)) == record
+        assert decode_record(encode_record({})) == {}
@@ -0,0 +1,113 @@
+"""Tests for message templates."""
+import pytest
+from datetime import datetime
+
+from bot.utils.templates import (
+    CompiledTemplate,
+    TemplateCache,
+    TemplateError,
+    build_context,
+    compile_template,
+)
+
+class TestCompileTemplate:
+    """Test template compilation and rendering."""
+
+    def test_render_placeholders(self):
+        """Test rendering all supported placeholders."""
+        template = compile_template("Day {day} in {guild}: {weekday}, {date}")
+        context = build_context(datetime(2024, 1, 3, 7, 0), "Test Guild", "2024-01-01")
+
+        assert template.render(context) == "Day 3 in Test Guild: Wednesday, 2024-01-03"
+
+    def test_static_message(self):
+        """Test that messages without placeholders render verbatim."""
+        template = compile_template("Good morning!")
+
+        assert template.fields == frozenset()
+        assert template.render({}) == "Good morning!"
+
+    def test_escaped_braces(self):
+        """Test that doubled braces render as literal braces."""
+        template = compile_template("{{literal}} {date}")
+        context = build_context(datetime(2024, 1, 1), "G")
+
+        assert template.render(context) == "{literal} 2024-01-01"
+        assert template.source == "{{literal}} {date}"
+
+    def test_role_mentions_are_resolved_at_compile_time(self):
+        """Test that role names are normalized to role IDs."""
+        template = compile_template("Hi {role:Members} and {role:42}", {"Members": 7})
+
+        assert template.source == "Hi {role:7} and {role:42}"
+        assert template.render({}) == "Hi <@&7> and <@&42>"
+
+    def test_invalid_templates(self):
+        """Test that malformed templates are rejected."""
+        invalid_templates = ["{unknown}", "{date", "oops }", "{role:Nobody}"]
+
+        for source in invalid_templates:
+            with pytest.raises(TemplateError):
+                compile_template(source)
+
+    def test_invalid_start_date_counts_from_one(self):
+        """Test the day counter with a missing or broken start date."""
+        assert build_context(datetime(2024, 1, 1), "G")["day"] == "1"
+        assert build_context(datetime(2024, 1, 1), "G", "garbage")["day"] == "1"
+
+class TestTemplateCache:
+    """Test the per-guild template cache."""
+
+    def test_compiles_once_per_source(self):
+        """Test that the cached template is reused for the same source."""
+        cache = TemplateCache()
+        first = cache.get(1, "Hello {guild}")
+
+        assert cache.get(1, "Hello {guild}") is first
+        assert cache.get(1, "Bye {guild}") is not first
+
+    def test_guilds_with_the_same_message_share_a_template(self):
+        """Test that templates are keyed by source, not by guild."""
+        cache = TemplateCache()
+        first = cache.get(1, "Hello {guild}")
+
+        assert cache.get(2, "Hello " + "{guild}") is first
+        cache.put(3, compile_template("Hello {guild}"))
+        assert cache.get(3, "Hello {guild}") is first
+
+    def test_unused_templates_are_dropped(self):
+        """Test that a template goes once no guild uses it."""
+        cache = TemplateCache()
+        cache.get(1, "Hello {guild}")
+        cache.get(2, "Hello {guild}")
+
+        cache.invalidate(1)
+        assert len(cache._by_source) == 1
+        cache.get(2, "Bye {guild}")
+        assert list(cache._by_source) == ["Bye {guild}"]
+
+    def test_source_text_is_not_copied(self):
+        """Test that a template reuses its source string instead of rebuilding it."""
+        source = "".join(["Good ", "morning"])
+        template = compile_template(source)
+        assert template.source is source
+        assert template.render({}) is source
+
+        source = "".join(["Day ", "{day}"])
+        assert compile_template(source).source is source
+
+    def test_put_is_used_for_matching_source(self):
+        """Test that templates stored at save time are reused."""
+        cache = TemplateCache()
+        template = compile_template("{date}")
+        cache.put(1, template)
+
+        assert cache.get(1, "{date}") is template
+
+    def test_invalid_source_is_sent_verbatim(self):
+        """Test that legacy messages that are not templates render verbatim."""
+        cache = TemplateCache()
+        template = cache.get(1, "Use {curly} braces")
+
+        assert isinstance(template, CompiledTemplate)
+        assert template.render({}) == "Use {curly} braces"